@@ -1,27 +1,28 @@
 import streamlit as st
-import pandas as pd 
+import pandas as pd
 from PO.po_handler import POHandler
 from io import BytesIO
 
 po_handler = POHandler()
 
+# Purchase orders rendered per page of each archive section
+ARCHIVE_PAGE_SIZE = 20
+
 def archived_po_tab():
     """Tab displaying archived (completed and rejected) purchase orders."""
     st.header("📦 Archived Purchase Orders")
 
-    # Fetch all archived purchase orders
-    archived_orders = po_handler.get_archived_purchase_orders()
+    # ✅ Counted in SQL; each section then fetches only the page it shows
+    completed_total = po_handler.count_archived_purchase_orders("Completed")
+    rejected_total = po_handler.count_archived_purchase_orders("Rejected")
 
-    if archived_orders.empty:
+    if not completed_total and not rejected_total:
         st.info("ℹ️ No archived purchase orders found.")
         return
 
-    completed_orders = archived_orders[archived_orders["status"] == "Completed"]
-    rejected_orders = archived_orders[archived_orders["status"] == "Rejected"]
-
     st.subheader("✅ Completed Orders")
-    if not completed_orders.empty:
-        for poid, group in completed_orders.groupby("poid"):
+    if completed_total:
+        for poid, group, pictures in archived_page("Completed", completed_total, "archived_completed"):
             order_info = group.iloc[0]
             with st.expander(f"📦 PO #{poid} - {order_info['suppliername']}"):
                 st.write(f"**Order Date:** {order_info['orderdate']}")
@@ -35,8 +36,8 @@ def archived_po_tab():
 
                 for idx, item in group.iterrows():
                     cols = st.columns([1, 3, 2])
-                    if item['itempicture']:
-                        cols[0].image(BytesIO(item['itempicture']), width=50)
+                    if pictures.get(item['imagehash']):
+                        cols[0].image(BytesIO(pictures[item['imagehash']]), width=50)
                     else:
                         cols[0].write("No Image")
                     cols[1].write(f"{item['itemnameenglish']}")
@@ -45,19 +46,47 @@ def archived_po_tab():
         st.info("No completed orders available.")
 
     st.subheader("❌ Rejected Orders")
-    if not rejected_orders.empty:
-        for poid, group in rejected_orders.groupby("poid"):
+    if rejected_total:
+        for poid, group, pictures in archived_page("Rejected", rejected_total, "archived_rejected"):
             order_info = group.iloc[0]
             with st.expander(f"📦 PO #{poid} - {order_info['suppliername']}"):
                 st.write(f"**Order Date:** {order_info['orderdate']}")
                 st.write(f"**Rejected on:** {order_info['respondedat']}")
                 for idx, item in group.iterrows():
                     cols = st.columns([1, 3, 2])
-                    if item['itempicture']:
-                        cols[0].image(BytesIO(item['itempicture']), width=50)
+                    if pictures.get(item['imagehash']):
+                        cols[0].image(BytesIO(pictures[item['imagehash']]), width=50)
                     else:
                         cols[0].write("No Image")
                     cols[1].write(f"{item['itemnameenglish']}")
                     cols[2].write(f"Ordered: {item['orderedquantity']}")
     else:
         st.info("No rejected orders available.")
+
+def archived_page(status, total, key):
+    """
+    Yield (poid, lines, pictures) for one page of the `total` archived orders with `status`,
+    newest first. Pages are fetched in SQL with keyset cursors kept in the session (as on Home),
+    and thumbnails are fetched in one batch for the lines on that page only.
+    """
+    cursors = st.session_state.setdefault(f"{key}_cursors", [None])
+    pages = max(-(-total // ARCHIVE_PAGE_SIZE), 1)
+    if len(cursors) > pages:  # the archive shrank since the cursors were taken
+        del cursors[1:]
+
+    lines, last_poid = po_handler.get_archived_po_page(status, ARCHIVE_PAGE_SIZE, after=cursors[-1])
+    if pages > 1:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        if col_prev.button("⬅️ Newer", key=f"{key}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        col_page.caption(f"Page {len(cursors)} of {pages} · {total} orders")
+        if col_next.button("Older ➡️", key=f"{key}_next", disabled=len(cursors) >= pages or last_poid is None):
+            cursors.append(last_poid)
+            st.rerun()
+    if lines.empty:
+        return
+
+    pictures = po_handler.get_item_pictures(lines["imagehash"], "thumb")
+    for poid, group in lines.groupby("poid", sort=False):
+        yield poid, group, pictures
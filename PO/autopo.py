@@ -1,5 +1,4 @@
 import streamlit as st
-import pandas as pd
 import datetime
 from PO.po_handler import POHandler
 
@@ -14,6 +13,29 @@ def auto_po_tab():
         st.success("✅ All stock levels are sufficient. No purchase orders needed.")
         return
 
+    # ✅ Batch mode: one PO per supplier, all created in a single transaction
+    st.write("### 🚀 Generate All Supplier POs")
+    col_date, col_time = st.columns(2)
+    batch_date = col_date.date_input("Select Date", key="date_all", min_value=datetime.date.today())
+    batch_time = col_time.time_input("Select Time", key="time_all", value=datetime.time(9, 0))
+
+    if st.button(f"Accept & Send Orders to All {low_stock_df['supplierid'].nunique()} Suppliers"):
+        created_by = st.session_state.get("user_email", "Unknown")
+        created = po_handler.create_auto_pos(datetime.datetime.combine(batch_date, batch_time), created_by)
+        if created.empty:
+            st.warning("⚠️ No purchase orders were created.")
+        else:
+            st.success(f"✅ {len(created)} Purchase Orders created successfully by {created_by}!")
+            st.dataframe(
+                created[["poid", "suppliername", "itemcount"]].rename(columns={
+                    "poid": "PO ID", "suppliername": "Supplier", "itemcount": "Items"
+                }),
+                use_container_width=True,
+                hide_index=True
+            )
+        st.stop()
+
+    st.write("---")
     st.write("Below are items grouped by supplier. Generate POs as needed.")
     grouped = low_stock_df.groupby("supplierid")
 
@@ -47,48 +69,5 @@ def auto_po_tab():
                 st.stop()
 
 def get_low_stock_items():
-    query = """
-    SELECT 
-        i.ItemID AS itemid,
-        i.ItemNameEnglish AS itemnameenglish,
-        i.Threshold AS threshold,
-        i.AverageRequired AS averagerequired,
-        COALESCE(SUM(inv.Quantity), 0) AS currentquantity
-    FROM Item i
-    LEFT JOIN Inventory inv ON i.ItemID = inv.ItemID
-    GROUP BY i.ItemID, i.ItemNameEnglish, i.Threshold, i.AverageRequired
-    """
-    df = po_handler.fetch_data(query)
-    if df.empty:
-        return pd.DataFrame()
-
-    df = df[df["currentquantity"] < df["threshold"]].copy()
-    if df.empty:
-        return df
-
-    df["neededquantity"] = df["averagerequired"] - df["currentquantity"]
-    df = df[df["neededquantity"] > 0].copy()
-    if df.empty:
-        return df
-
-    supplier_map = get_first_supplier_for_items()
-    df["supplierid"] = df["itemid"].map(supplier_map)
-    df.dropna(subset=["supplierid"], inplace=True)
-    df["supplierid"] = df["supplierid"].astype(int)
-
-    sup_df = po_handler.get_suppliers()
-    sup_lookup = dict(zip(sup_df["supplierid"], sup_df["suppliername"]))
-    df["suppliername"] = df["supplierid"].map(sup_lookup).fillna("No Supplier")
-
-    return df
-
-def get_first_supplier_for_items():
-    mapping_df = po_handler.get_item_supplier_mapping()
-    first_map = {}
-    if not mapping_df.empty:
-        for row in mapping_df.itertuples():
-            item_id = getattr(row, "itemid")
-            sup_id = getattr(row, "supplierid")
-            if item_id not in first_map:
-                first_map[item_id] = sup_id
-    return first_map
+    """Low-stock items with their supplier assignment, computed in SQL."""
+    return po_handler.get_auto_po_candidates()
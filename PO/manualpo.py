@@ -8,9 +8,13 @@ def manual_po_tab():
     """Tab for creating manual purchase orders."""
     st.header("📝 Create Manual Purchase Order")
 
-    suppliers_df = po_handler.get_suppliers()
-    items_df = po_handler.get_items()
-    item_supplier_df = po_handler.get_item_supplier_mapping()
+    # ✅ Independent reads run concurrently
+    data = po_handler.fetch_many({
+        "suppliers": po_handler.get_suppliers,
+        "items": po_handler.get_items,
+        "item_suppliers": po_handler.get_item_supplier_mapping,
+    })
+    suppliers_df, items_df, item_supplier_df = data["suppliers"], data["items"], data["item_suppliers"]
 
     if suppliers_df.empty or items_df.empty or item_supplier_df.empty:
         st.warning("⚠️ No suppliers or items available.")
@@ -49,7 +53,7 @@ def manual_po_tab():
         estimated_price = col_price.number_input(f"Estimated Price ({item_name})", min_value=0.0, step=0.01, key=f"price_{item_id}")
 
         po_items.append({
-            "item_id": item_id,
+            "item_id": int(item_id),
             "quantity": quantity,
             "estimated_price": estimated_price if estimated_price > 0 else None
         })
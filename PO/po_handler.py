@@ -2,10 +2,31 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 from db_handler import DatabaseManager
+from image_handler import ImageHandler
+from tracing import trace_methods
 
+@trace_methods
 class POHandler(DatabaseManager):
     """Handles all database interactions related to purchase orders."""
 
+    def __init__(self):
+        super().__init__()
+        # Built with this handler's settings, so both talk to the same database/schema
+        self.image_handler = ImageHandler()
+
+    ARCHIVED_PO_SCHEMA = {
+        "poid": "int32", "orderdate": "timestamp", "expecteddelivery": "timestamp",
+        "status": "category", "respondedat": "timestamp", "actualdelivery": "timestamp",
+        "createdby": "category", "suppliername": "category", "itemid": "int32",
+        "orderedquantity": "int32", "estimatedprice": "decimal", "receivedquantity": "int32",
+    }
+
+    ACTIVE_PO_SCHEMA = {
+        **ARCHIVED_PO_SCHEMA,
+        "supproposeddeliver": "timestamp", "proposedstatus": "category", "originalpoid": "int32",
+        "supproposedquantity": "int32", "supproposedprice": "decimal",
+    }
+
     def get_all_purchase_orders(self):
         query = """
         SELECT 
@@ -16,7 +37,7 @@ class POHandler(DatabaseManager):
             poi.ItemID, i.ItemNameEnglish, poi.OrderedQuantity, poi.EstimatedPrice,
             poi.ReceivedQuantity, 
             poi.SupProposedQuantity, poi.SupProposedPrice, 
-            i.ItemPicture
+            i.ImageHash
         FROM PurchaseOrders po
         JOIN Supplier s ON po.SupplierID = s.SupplierID
         JOIN PurchaseOrderItems poi ON po.POID = poi.POID
@@ -24,37 +45,73 @@ class POHandler(DatabaseManager):
         WHERE po.Status NOT IN ('Completed', 'Declined')
         ORDER BY po.OrderDate DESC
         """
-        return self.fetch_data(query)
+        return self.fetch_data(query, schema=self.ACTIVE_PO_SCHEMA)
 
-    def get_archived_purchase_orders(self):
-        query = """
+    def get_archived_po_page(self, status, page_size=20, after=None):
+        """
+        Every line of one page of archived POs with `status`, newest POID first, using keyset
+        pagination: `after` is the POID returned with the previous page. The page's POIDs are
+        picked in SQL, so only their lines are copied. Returns (lines, last POID or None).
+        """
+        keyset_clause, params = "", [status]
+        if after is not None:
+            keyset_clause = "AND POID < %s"
+            params.append(int(after))
+        query = f"""
+        WITH page AS (
+            SELECT POID
+            FROM PurchaseOrders
+            WHERE Status = %s {keyset_clause}
+            ORDER BY POID DESC
+            LIMIT %s
+        )
         SELECT 
             po.POID, po.OrderDate, po.ExpectedDelivery, po.Status, po.RespondedAt, 
             po.ActualDelivery, po.CreatedBy,
             s.SupplierName,
             poi.ItemID, i.ItemNameEnglish, poi.OrderedQuantity, poi.EstimatedPrice,
             poi.ReceivedQuantity, 
-            i.ItemPicture
-        FROM PurchaseOrders po
+            i.ImageHash
+        FROM page
+        JOIN PurchaseOrders po ON po.POID = page.POID
         JOIN Supplier s ON po.SupplierID = s.SupplierID
         JOIN PurchaseOrderItems poi ON po.POID = poi.POID
         JOIN Item i ON poi.ItemID = i.ItemID
-        WHERE po.Status IN ('Completed', 'Declined')
-        ORDER BY po.OrderDate DESC
+        ORDER BY po.POID DESC
         """
-        return self.fetch_data(query)
+        df = self.fetch_copy(query, params + [int(page_size)], schema=self.ARCHIVED_PO_SCHEMA)
+        if df.empty:
+            return df, None
+        return df, int(df["poid"].iloc[-1])
+
+    def count_archived_purchase_orders(self, status):
+        """Number of POs with `status`, for the archive's page count."""
+        df = self.fetch_data("SELECT COUNT(*) AS total FROM PurchaseOrders WHERE Status = %s", (status,))
+        return int(df.iloc[0]["total"]) if not df.empty else 0
 
     def get_items(self):
         """Fetch basic item info for manual PO creation."""
         query = """
-        SELECT ItemID, ItemNameEnglish, ItemPicture, AverageRequired
+        SELECT ItemID, ItemNameEnglish, ImageHash, AverageRequired
         FROM Item
         """
-        return self.fetch_data(query)
+        return self.fetch_data(query, schema={"itemid": "int32", "averagerequired": "int32"})
+
+    def get_item_pictures(self, image_hashes, rendition="full"):
+        """Batch-load picture bytes for the PO lines being rendered. Returns {hash: bytes}."""
+        return self.image_handler.get_images(image_hashes, rendition)
 
     def create_manual_po(self, supplier_id, expected_delivery, items, created_by, original_poid=None):
         """
         Creates a manual PO, optionally linking it to an OriginalPOID.
+        Header and line items are written in one transaction.
+        """
+        with self.transaction() as tx:
+            return self._insert_po(tx, supplier_id, expected_delivery, items, created_by, original_poid)
+
+    def _insert_po(self, tx, supplier_id, expected_delivery, items, created_by, original_poid=None):
+        """
+        Inserts a PO header and its line items inside an open transaction.
         Converts any NumPy types to native Python to avoid psycopg2 errors.
         """
         # Convert supplier_id to int
@@ -72,7 +129,7 @@ class POHandler(DatabaseManager):
         VALUES (%s, %s, %s, %s)
         RETURNING POID
         """
-        po_id_result = self.execute_command_returning(
+        po_id_result = tx.execute_returning(
             query_po, (supplier_id, expected_delivery, created_by, original_poid)
         )
         if not po_id_result:
@@ -80,20 +137,20 @@ class POHandler(DatabaseManager):
         
         po_id = po_id_result[0]
 
-        query_poi = """
-        INSERT INTO PurchaseOrderItems 
-            (POID, ItemID, OrderedQuantity, EstimatedPrice, ReceivedQuantity)
-        VALUES 
-            (%s, %s, %s, %s, 0)
-        """
-        for item in items:
-            item_id = int(item["item_id"])
-            quantity = int(item["quantity"])
-            estimated_price = item.get("estimated_price", None)
-
-            self.execute_command(query_poi, (
-                po_id, item_id, quantity, estimated_price
-            ))
+        tx.bulk_insert(
+            "PurchaseOrderItems",
+            ["POID", "ItemID", "OrderedQuantity", "EstimatedPrice", "ReceivedQuantity"],
+            [
+                (
+                    po_id,
+                    int(item["item_id"]),
+                    int(item["quantity"]),
+                    item.get("estimated_price", None),
+                    0
+                )
+                for item in items
+            ]
+        )
 
         return po_id
 
@@ -121,7 +178,61 @@ class POHandler(DatabaseManager):
     def get_item_supplier_mapping(self):
         """Fetches item-supplier relationships for autoPO usage."""
         query = "SELECT ItemID, SupplierID FROM ItemSupplier"
-        return self.fetch_data(query)
+        return self.cached_fetch(["ItemSupplier"], query)
+
+    # Low-stock items with the supplier each one is reordered from (lowest linked SupplierID)
+    AUTO_PO_CANDIDATES = """
+    SELECT DISTINCT ON (s.ItemID)
+        s.ItemID AS itemid,
+        i.ItemNameEnglish AS itemnameenglish,
+        s.Quantity AS currentquantity,
+        s.Threshold AS threshold,
+        s.AverageRequired AS averagerequired,
+        s.Shortfall AS neededquantity,
+        isup.SupplierID AS supplierid,
+        COALESCE(sup.SupplierName, 'No Supplier') AS suppliername
+    FROM ItemStock s
+    JOIN Item i ON i.ItemID = s.ItemID
+    JOIN ItemSupplier isup ON isup.ItemID = s.ItemID
+    LEFT JOIN Supplier sup ON sup.SupplierID = isup.SupplierID
+    WHERE s.Quantity < s.Threshold AND s.Shortfall > 0
+    ORDER BY s.ItemID, isup.SupplierID
+    """
+
+    def get_auto_po_candidates(self):
+        """Low-stock items and their assigned supplier, computed in one query."""
+        return self.fetch_data(self.AUTO_PO_CANDIDATES)
+
+    def create_auto_pos(self, expected_delivery, created_by):
+        """
+        Create one PO per supplier for every low-stock item in a single statement
+        (and transaction). Returns the created POs: poid, supplierid, suppliername, itemcount.
+        """
+        if pd.notnull(expected_delivery) and not isinstance(expected_delivery, datetime):
+            expected_delivery = pd.to_datetime(expected_delivery).to_pydatetime()
+
+        with self.transaction() as tx:
+            return tx.fetch_data(f"""
+            WITH candidates AS ({self.AUTO_PO_CANDIDATES}),
+            new_pos AS (
+                INSERT INTO PurchaseOrders (SupplierID, ExpectedDelivery, CreatedBy)
+                SELECT DISTINCT supplierid, %s::timestamp, %s FROM candidates
+                RETURNING POID, SupplierID
+            ),
+            lines AS (
+                INSERT INTO PurchaseOrderItems (POID, ItemID, OrderedQuantity, EstimatedPrice, ReceivedQuantity)
+                SELECT p.POID, c.itemid, c.neededquantity, NULL, 0
+                FROM candidates c
+                JOIN new_pos p ON p.SupplierID = c.supplierid
+                RETURNING POID
+            )
+            SELECT p.POID AS poid, p.SupplierID AS supplierid,
+                   COALESCE(sup.SupplierName, 'No Supplier') AS suppliername,
+                   (SELECT COUNT(*) FROM lines l WHERE l.POID = p.POID) AS itemcount
+            FROM new_pos p
+            LEFT JOIN Supplier sup ON sup.SupplierID = p.SupplierID
+            ORDER BY p.POID
+            """, (expected_delivery, created_by))
 
     def get_proposed_pos(self):
         """Fetch all POs with ProposedStatus = 'Proposed'."""
@@ -132,39 +243,41 @@ class POHandler(DatabaseManager):
         """Accept a proposed PO, create a new normal PO from the proposed data, mark original as 'Accepted'."""
         proposed_po_id = int(proposed_po_id)
 
-        po_info = self.fetch_data(
-            "SELECT * FROM PurchaseOrders WHERE POID = %s", (proposed_po_id,)
-        ).iloc[0]
-        items_info = self.fetch_data(
-            "SELECT * FROM PurchaseOrderItems WHERE POID = %s", (proposed_po_id,)
-        )
+        with self.transaction() as tx:
+            po_info = tx.fetch_data(
+                "SELECT * FROM PurchaseOrders WHERE POID = %s", (proposed_po_id,)
+            ).iloc[0]
+            items_info = tx.fetch_data(
+                "SELECT * FROM PurchaseOrderItems WHERE POID = %s", (proposed_po_id,)
+            )
 
-        supplier_id = int(po_info['supplierid']) if pd.notnull(po_info['supplierid']) else None
-        sup_proposed_date = None
-        if pd.notnull(po_info['supproposeddeliver']):
-            sup_proposed_date = pd.to_datetime(po_info['supproposeddeliver']).to_pydatetime()
+            supplier_id = int(po_info['supplierid']) if pd.notnull(po_info['supplierid']) else None
+            sup_proposed_date = None
+            if pd.notnull(po_info['supproposeddeliver']):
+                sup_proposed_date = pd.to_datetime(po_info['supproposeddeliver']).to_pydatetime()
 
-        # Create new normal PO from the proposed fields
-        new_poid = self.create_manual_po(
-            supplier_id,
-            sup_proposed_date,  # Proposed date
-            [
-                {
-                    "item_id": int(it["itemid"]),
-                    "quantity": int(it["supproposedquantity"]),
-                    "estimated_price": it["supproposedprice"]
-                }
-                for _, it in items_info.iterrows()
-            ],
-            created_by=po_info['createdby'],
-            original_poid=proposed_po_id
-        )
+            # Create new normal PO from the proposed fields
+            new_poid = self._insert_po(
+                tx,
+                supplier_id,
+                sup_proposed_date,  # Proposed date
+                [
+                    {
+                        "item_id": int(it["itemid"]),
+                        "quantity": int(it["supproposedquantity"]),
+                        "estimated_price": it["supproposedprice"]
+                    }
+                    for _, it in items_info.iterrows()
+                ],
+                created_by=po_info['createdby'],
+                original_poid=proposed_po_id
+            )
 
-        # Mark original PO as 'Accepted'
-        self.execute_command(
-            "UPDATE PurchaseOrders SET ProposedStatus = 'Accepted' WHERE POID = %s",
-            (proposed_po_id,)
-        )
+            # Mark original PO as 'Accepted'
+            tx.execute(
+                "UPDATE PurchaseOrders SET ProposedStatus = 'Accepted' WHERE POID = %s",
+                (proposed_po_id,)
+            )
         return new_poid
 
     def decline_proposed_po(self, proposed_po_id):
@@ -183,26 +296,28 @@ class POHandler(DatabaseManager):
         """
         proposed_po_id = int(proposed_po_id)
 
-        # 1) fetch existing PO info (e.g. for SupplierID, CreatedBy, etc.)
-        po_info = self.fetch_data(
-            "SELECT * FROM PurchaseOrders WHERE POID = %s", (proposed_po_id,)
-        ).iloc[0]
+        with self.transaction() as tx:
+            # 1) fetch existing PO info (e.g. for SupplierID, CreatedBy, etc.)
+            po_info = tx.fetch_data(
+                "SELECT SupplierID FROM PurchaseOrders WHERE POID = %s", (proposed_po_id,)
+            ).iloc[0]
 
-        supplier_id = int(po_info['supplierid']) if pd.notnull(po_info['supplierid']) else None
+            supplier_id = int(po_info['supplierid']) if pd.notnull(po_info['supplierid']) else None
 
-        # 2) create a new normal PO from user-chosen modifications
-        new_poid = self.create_manual_po(
-            supplier_id,
-            new_delivery_date,   # user-chosen new date
-            new_items,           # user-chosen item lines
-            created_by=user_email, 
-            original_poid=proposed_po_id
-        )
+            # 2) create a new normal PO from user-chosen modifications
+            new_poid = self._insert_po(
+                tx,
+                supplier_id,
+                new_delivery_date,   # user-chosen new date
+                new_items,           # user-chosen item lines
+                created_by=user_email, 
+                original_poid=proposed_po_id
+            )
 
-        # 3) mark original PO as 'Modified'
-        self.execute_command(
-            "UPDATE PurchaseOrders SET ProposedStatus = 'Modified' WHERE POID = %s",
-            (proposed_po_id,)
-        )
+            # 3) mark original PO as 'Modified'
+            tx.execute(
+                "UPDATE PurchaseOrders SET ProposedStatus = 'Modified' WHERE POID = %s",
+                (proposed_po_id,)
+            )
 
         return new_poid
@@ -18,7 +18,7 @@ def proposed_po_tab(po_handler):
         st.success("✅ No supplier proposals awaiting review.")
         return
 
-    for poid in proposed_po_df["poid"].unique():
+    for poid in proposed_po_df["poid"].unique().tolist():  # ✅ Python ints for psycopg2
         po_data = proposed_po_df[proposed_po_df["poid"] == poid]
         po_info = po_data.iloc[0]
 
@@ -30,7 +30,7 @@ def proposed_po_tab(po_handler):
         orig_date = po_info["expecteddelivery"]
 
         if pd.notnull(sup_date):
-            orig_str = orig_date.date().isoformat() if pd.notnull(orig_date) else "N/A"
+            orig_str = pd.to_datetime(orig_date).date().isoformat() if pd.notnull(orig_date) else "N/A"
             prop_str = pd.to_datetime(sup_date).date().isoformat()
             st.markdown(
                 f"**Original Delivery:** {orig_str} → "
@@ -91,7 +91,7 @@ def proposed_po_tab(po_handler):
                 c1, c2 = st.columns(2)
 
                 # Proposed quantity
-                default_qty = row["supproposedquantity"] or row["orderedquantity"]
+                default_qty = row["supproposedquantity"] if pd.notnull(row["supproposedquantity"]) else row["orderedquantity"]
                 user_qty = c1.number_input(
                     f"Qty (PO{poid}, Item {row['itemid']})", 
                     min_value=1, 
@@ -101,7 +101,9 @@ def proposed_po_tab(po_handler):
                 )
 
                 # Proposed price
-                default_price = row["supproposedprice"] or row["estimatedprice"] or 0.0
+                default_price = next(
+                    (price for price in (row["supproposedprice"], row["estimatedprice"]) if pd.notnull(price)), 0.0
+                )
                 user_price = c2.number_input(
                     f"Price (PO{poid}, Item {row['itemid']})", 
                     value=float(default_price), 
@@ -110,7 +112,7 @@ def proposed_po_tab(po_handler):
                 )
 
                 mod_items.append({
-                    "item_id": row["itemid"],
+                    "item_id": int(row["itemid"]),
                     "quantity": user_qty,
                     "estimated_price": user_price
                 })
@@ -0,0 +1,64 @@
+import streamlit as st
+import pandas as pd
+from image_handler import ImageHandler
+
+db = ImageHandler()
+
+def query_stats():
+    """Admin page with per-page query statistics, slow queries and cache/pool health."""
+    st.title("🐢 Query Performance")
+
+    monitor = db.query_monitor
+    st.caption(
+        f"Slow-query threshold: {monitor.slow_ms:.0f} ms · "
+        f"EXPLAIN for slow queries: {'on' if monitor.explain_slow else 'off'}"
+    )
+
+    stats = db.query_stats()
+    if stats.empty:
+        st.info("No queries recorded yet in this process.")
+    else:
+        pages = ["All pages"] + sorted(stats["page"].unique().tolist())
+        page = st.selectbox("Page", pages)
+        if page != "All pages":
+            stats = stats[stats["page"] == page]
+
+        st.subheader("⏱️ Slowest Queries (p95)")
+        st.dataframe(stats.sort_values("p95_ms", ascending=False).head(25),
+                     use_container_width=True, hide_index=True)
+
+        st.subheader("🔁 Most Frequent Queries")
+        st.dataframe(stats.sort_values("count", ascending=False).head(25),
+                     use_container_width=True, hide_index=True)
+
+        st.subheader("📄 Time per Page")
+        per_page = stats.groupby("page", as_index=False).agg(
+            queries=("count", "sum"), total_ms=("total_ms", "sum"), slow=("slow", "sum")
+        ).sort_values("total_ms", ascending=False)
+        st.dataframe(per_page, use_container_width=True, hide_index=True)
+
+    st.subheader("🚨 Recent Slow Queries")
+    slow = monitor.slow_queries()
+    if not slow:
+        st.success("No slow queries recorded.")
+    for event in slow:
+        with st.expander(f"{event['ms']:.0f} ms · {event['page']} · {event['fingerprint'][:80]}"):
+            st.code(event["fingerprint"], language="sql")
+            st.write(f"Rows: {event['rows']} · Bytes: {event['bytes']} · Acquire: {event['acquire_ms']} ms")
+            if event.get("params"):
+                st.text(f"Params: {event['params']}")
+            if event.get("plan"):
+                st.code(event["plan"])
+
+    st.subheader("🧰 Pool & Caches")
+    col_pool, col_ref, col_img = st.columns(3)
+    col_pool.write("Connection pool")
+    col_pool.dataframe(pd.Series(db.pool_stats(), name="value"), use_container_width=True)
+    col_ref.write("Reference cache")
+    col_ref.dataframe(pd.Series(db.reference_cache.stats(), name="value"), use_container_width=True)
+    col_img.write("Image data-URI cache")
+    col_img.dataframe(pd.Series(db.data_uri_stats(), name="value"), use_container_width=True)
+
+    if st.button("🧹 Reset Query Statistics"):
+        monitor.reset()
+        st.rerun()
@@ -42,5 +42,6 @@ def user_management():
         """
         params = list(updated_permissions.values()) + [selected_user_id]
         db.execute_command(query, params)
+        db.invalidate_cache("Users")  # ✅ Every session re-reads its permissions on the next rerun
         st.success("✅ User permissions updated successfully!")
         st.rerun()
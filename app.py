@@ -1,37 +1,73 @@
+import logging
+
 import streamlit as st
 import home
 from item import mainitem
 import PO.mainpo as mainpo
 from receive_items.main_receive import main_receive_page
 import reports.main_reports as main_reports
-from sidebar import sidebar
+from sidebar import sidebar, trace_sidebar
 from inv_signin import authenticate  # ✅ Corrected import name
+from db_handler import DatabaseManager
+from migrations import check_schema
+from tracing import start_trace, finish_trace, span
 
 st.set_page_config(page_title="Inventory Management System", layout="wide")
 
+logger = logging.getLogger(__name__)
+
 def main():
     """Main function handling authentication and user access."""
-    authenticate()  # ✅ Correct function call
+    start_trace("rerun", page=st.session_state.get("selected_page"))
+    try:
+        render()
+    finally:
+        # ✅ Traces are only written to disk when [tracing] trace_file is set in secrets
+        tracing = st.secrets.get("tracing", {})
+        trace = finish_trace(tracing.get("trace_file"), int(tracing.get("trace_file_max_mb", 50)) * 2**20)
+    if trace is not None and st.session_state.get("user_role") == "Admin":
+        trace_sidebar(trace)
+
+def render():
+    """Authenticate, then draw the page selected in the sidebar."""
+    db = DatabaseManager()
+    # ✅ Migrations are a deploy step (python migrations.py); only apply them here when opted in
+    pending = check_schema(db, db.auto_migrate)
+    if pending:
+        # ✅ Deploy details go to the log; visitors (not yet signed in) only see a generic notice
+        logger.error(
+            "Database schema is out of date, run `python migrations.py`; pending: %s",
+            ", ".join(f"{version} {name}" for version, name in pending)
+        )
+        st.error("🛠️ The system is under maintenance. Please try again shortly.")
+        st.stop()
+    with span("authenticate"):
+        authenticate()  # ✅ Correct function call
 
     page = sidebar()  # ✅ Get selected page from sidebar
+    db.query_monitor.set_page(page)  # ✅ Tag this run's queries with the page
 
     permissions = st.session_state.get("permissions", {})
 
-    if page == "Home" and permissions.get("CanAccessHome", False):
-        home.home()
-    elif page == "Item" and permissions.get("CanAccessItems", False):
-        mainitem.item_page()
-    elif page == "Receive Items" and permissions.get("CanAccessReceive", False):
-        main_receive_page()
-    elif page == "Purchase Order" and permissions.get("CanAccessPO", False):
-        mainpo.po_page()
-    elif page == "Reports" and permissions.get("CanAccessReports", False):
-        main_reports.reports_page()
-    elif page == "User Management" and st.session_state.get("user_role") == "Admin":
-        from admin.user_management import user_management  # ✅ Dynamic import
-        user_management()
-    else:
-        st.error("❌ You do not have permission to access this page.")
+    with span(f"page:{page}"):
+        if page == "Home" and permissions.get("CanAccessHome", False):
+            home.home()
+        elif page == "Item" and permissions.get("CanAccessItems", False):
+            mainitem.item_page()
+        elif page == "Receive Items" and permissions.get("CanAccessReceive", False):
+            main_receive_page()
+        elif page == "Purchase Order" and permissions.get("CanAccessPO", False):
+            mainpo.po_page()
+        elif page == "Reports" and permissions.get("CanAccessReports", False):
+            main_reports.reports_page()
+        elif page == "User Management" and st.session_state.get("user_role") == "Admin":
+            from admin.user_management import user_management  # ✅ Dynamic import
+            user_management()
+        elif page == "Query Performance" and st.session_state.get("user_role") == "Admin":
+            from admin.query_stats import query_stats
+            query_stats()
+        else:
+            st.error("❌ You do not have permission to access this page.")
 
 if __name__ == "__main__":
     main()
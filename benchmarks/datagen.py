@@ -0,0 +1,331 @@
+"""
+Deterministic synthetic data for scale testing.
+
+    python -m benchmarks.datagen --dsn postgresql://localhost/amas --items 100000 --lots 1000000 \\
+        --suppliers 3000 --years 3 --image-kb 40 --today 2025-01-01 --truncate
+
+The same seed and --today always produce the same rows (dates are laid out relative to
+--today, which defaults to the current date). Every table is loaded with COPY in chunks
+bounded by row count, and image chunks also by size, so memory stays flat even for
+millions of inventory lots or large image blobs.
+"""
+import io
+import os
+import sys
+import time
+import random
+import hashlib
+import argparse
+from itertools import accumulate
+from datetime import date, datetime, timedelta
+
+CATEGORY_LEVELS = ["ClassCat", "DepartmentCat", "SectionCat", "FamilyCat", "SubFamilyCat"]
+# Children per node at each level of the category tree (6 * 4 * 4 * 5 * 5 = 2400 leaves)
+CATEGORY_FANOUT = [6, 4, 4, 5, 5]
+PO_STATUSES = ["Pending", "Accepted", "Shipped", "Received", "Completed", "Declined"]
+# Completed/declined orders dominate the history, open ones are recent
+PO_STATUS_WEIGHTS = [4, 3, 3, 3, 80, 7]
+PROPOSED_STATUSES = ["Proposed", "Accepted", "Declined", "Modified"]
+LOCATIONS = [f"{aisle}-{shelf:02d}" for aisle in "ABCDEFGH" for shelf in range(1, 21)]
+COUNTRIES = ["Iraq", "Turkey", "Iran", "China", "Germany", "India", "UAE"]
+
+CHUNK_ROWS = 50000
+# Image blobs are chunked by size as well, so --image-kb cannot inflate a chunk to GBs
+CHUNK_BYTES = 64 * 2**20
+
+ITEM_COLUMNS = ["ItemID", "ItemNameEnglish", "ItemNameKurdish", *CATEGORY_LEVELS,
+                "ShelfLife", "Threshold", "AverageRequired", "OriginCountry",
+                "Manufacturer", "Brand", "Barcode", "UnitType", "Packaging", "ImageHash"]
+LOT_COLUMNS = ["ItemID", "Quantity", "ExpirationDate", "StorageLocation", "DateReceived"]
+PO_COLUMNS = ["POID", "SupplierID", "OrderDate", "ExpectedDelivery", "Status", "RespondedAt",
+              "ActualDelivery", "CreatedBy", "SupProposedDeliver", "ProposedStatus", "SupplierNote"]
+PO_ITEM_COLUMNS = ["POID", "ItemID", "OrderedQuantity", "EstimatedPrice", "ReceivedQuantity",
+                   "SupProposedQuantity", "SupProposedPrice"]
+
+TABLES = ["PurchaseOrderItems", "PurchaseOrders", "Inventory", "ItemSupplier", "Item",
+          "ItemImageRendition", "ItemImage", "Supplier", "Dropdowns", "Users"]
+
+
+def dataset_sizes(items):
+    """Row counts derived from the number of items, roughly in production proportions."""
+    return {
+        "items": items,
+        "lots": items * 5,
+        "suppliers": max(10, items // 50),
+        "purchase_orders": max(20, items // 5),
+        "years": 2,
+        "proposed_fraction": 0.05,
+        "images": 0,
+        "image_bytes": 0,
+    }
+
+
+def category_tree(rng):
+    """
+    Leaf paths (class, department, section, family, sub-family) of a fixed-shape hierarchy;
+    names carry their position, e.g. ("Class 2", "Department 2.1", "Section 2.1.3", ...).
+    """
+    positions = [()]
+    for fanout in CATEGORY_FANOUT:
+        positions = [pos + (i,) for pos in positions for i in range(1, fanout + 1)]
+    paths = [
+        tuple(f"{level[:-3]} {'.'.join(map(str, pos[:depth + 1]))}" for depth, level in enumerate(CATEGORY_LEVELS))
+        for pos in positions
+    ]
+    rng.shuffle(paths)
+    return paths
+
+
+def image_blob(rng, size):
+    """
+    A valid PNG padded to roughly `size` bytes. Decoders stop at IEND, so the padding
+    only adds weight; every blob is distinct, so content hashes do not collide.
+    """
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    colour = tuple(rng.randrange(256) for _ in range(3))
+    Image.new("RGB", (64, 64), colour).save(buffer, format="PNG")
+    png = buffer.getvalue()
+    return png + rng.randbytes(max(16, size - len(png)))
+
+
+def chunked(rows, size=CHUNK_ROWS, max_bytes=None, row_bytes=None):
+    """
+    Group an iterator of rows into lists of at most `size` rows and, with `max_bytes`,
+    of about `max_bytes` as measured by `row_bytes(row)`.
+    """
+    chunk, nbytes = [], 0
+    for row in rows:
+        chunk.append(row)
+        if max_bytes:
+            nbytes += row_bytes(row)
+        if len(chunk) >= size or (max_bytes and nbytes >= max_bytes):
+            yield chunk
+            chunk, nbytes = [], 0
+    if chunk:
+        yield chunk
+
+
+def load(tx, table, columns, rows, max_bytes=None, row_bytes=None):
+    """COPY an iterator of rows into `table` chunk by chunk; returns the row count."""
+    total = 0
+    for chunk in chunked(rows, max_bytes=max_bytes, row_bytes=row_bytes):
+        tx.bulk_insert(table, columns, chunk, use_copy=True)
+        total += len(chunk)
+    return total
+
+
+def generate(tx, sizes, seed=42, today=None):
+    """
+    Fill every table inside an open transaction according to `sizes` (see dataset_sizes).
+    Each table draws from its own seeded generator, so changing one size leaves the
+    other tables' rows unchanged. Returns the row counts per table.
+    """
+    today = today or date.today()
+    now = datetime.combine(today, datetime.min.time())
+    items, suppliers = sizes["items"], sizes["suppliers"]
+    counts = {}
+
+    def rng_for(table):
+        return random.Random(f"{seed}:{table}")
+
+    counts["Supplier"] = load(tx, "Supplier", ["SupplierID", "SupplierName", "ContactName", "ContactPhone",
+                                               "ContactEmail", "Address"], (
+        (sid, f"Supplier {sid:05d}", f"Contact {sid}", f"+964 750 {sid:07d}",
+         f"supplier{sid}@example.com", f"Street {sid % 400}, Erbil")
+        for sid in range(1, suppliers + 1)
+    ))
+
+    # Distinct images shared by several items, as when one photo is reused across variants
+    image_hashes = []
+    if sizes["images"] and sizes["image_bytes"]:
+        rng = rng_for("ItemImage")
+
+        def images():
+            for _ in range(sizes["images"]):
+                blob = image_blob(rng, sizes["image_bytes"])
+                digest = hashlib.sha256(blob).hexdigest()
+                image_hashes.append(digest)
+                yield digest, blob, len(blob)
+        counts["ItemImage"] = load(tx, "ItemImage", ["ImageHash", "ImageData", "ByteSize"], images(),
+                                   max_bytes=CHUNK_BYTES, row_bytes=lambda row: row[2])
+
+    rng = rng_for("Item")
+    leaves = category_tree(rng)
+    # Skewed leaf popularity: a few sub-families hold most items
+    leaf_weights = list(accumulate(1 / (rank + 1) for rank in range(len(leaves))))
+    used_paths = set()
+
+    def item_rows():
+        for item_id in range(1, items + 1):
+            path = rng.choices(leaves, cum_weights=leaf_weights)[0]
+            used_paths.add(path)
+            threshold = rng.randint(5, 200)
+            yield (
+                item_id, f"Item {item_id:07d}", f"کاڵا {item_id}", *path,
+                rng.choice([30, 90, 180, 365, 730]), threshold, int(threshold * rng.uniform(1.2, 3)),
+                rng.choice(COUNTRIES), f"Manufacturer {rng.randint(1, 500)}", f"Brand {rng.randint(1, 1000)}",
+                f"{rng.randint(10**12, 10**13 - 1)}", rng.choice(["Piece", "Box", "Kg", "Litre"]),
+                rng.choice(["Single", "Pack", "Carton"]),
+                rng.choice(image_hashes) if image_hashes and rng.random() < 0.8 else None,
+            )
+    counts["Item"] = load(tx, "Item", ITEM_COLUMNS, item_rows())
+
+    rng = rng_for("ItemSupplier")
+    counts["ItemSupplier"] = load(tx, "ItemSupplier", ["ItemID", "SupplierID"], (
+        (item_id, supplier_id)
+        for item_id in range(1, items + 1)
+        for supplier_id in rng.sample(range(1, suppliers + 1), min(suppliers, rng.randint(1, 3)))
+    ))
+
+    rng = rng_for("Inventory")
+
+    def lot_rows():
+        for _ in range(sizes["lots"]):
+            received = today - timedelta(days=rng.randint(0, 365 * sizes["years"]))
+            expiry = received + timedelta(days=rng.choice([30, 90, 180, 365, 730]))
+            yield (
+                rng.randint(1, items), rng.randint(0, 120),
+                expiry if rng.random() < 0.9 else None,
+                rng.choice(LOCATIONS) if rng.random() < 0.95 else None,
+                received,
+            )
+    counts["Inventory"] = load(tx, "Inventory", LOT_COLUMNS, lot_rows())
+
+    rng = rng_for("PurchaseOrders")
+    history_days = 365 * sizes["years"]
+
+    def purchase_orders():
+        """(header row, line rows) per PO."""
+        for poid in range(1, sizes["purchase_orders"] + 1):
+            # Later POIDs are more recent, like a real sequence
+            ordered = now - timedelta(days=history_days * (1 - poid / sizes["purchase_orders"]),
+                                      hours=rng.randint(0, 23))
+            expected = ordered + timedelta(days=rng.randint(3, 21))
+            status = rng.choices(PO_STATUSES, PO_STATUS_WEIGHTS)[0]
+            responded = ordered + timedelta(hours=rng.randint(1, 72)) if status != "Pending" else None
+            delivered = (expected + timedelta(hours=rng.randint(-72, 120))
+                         if status in ("Received", "Completed") else None)
+            proposed = rng.random() < sizes["proposed_fraction"]
+            proposed_status = rng.choice(PROPOSED_STATUSES) if proposed else None
+            if proposed_status == "Proposed":
+                status = "Pending"
+            proposed_date = expected + timedelta(days=rng.randint(1, 10)) if proposed else None
+
+            lines = []
+            for item_id in rng.sample(range(1, items + 1), min(items, rng.randint(1, 12))):
+                quantity = rng.randint(1, 200)
+                price = round(rng.uniform(0.25, 250), 2)
+                received_qty = 0
+                if status == "Completed":
+                    received_qty = quantity if rng.random() < 0.85 else rng.randint(0, quantity)
+                lines.append((
+                    poid, item_id, quantity, price, received_qty,
+                    max(1, int(quantity * rng.uniform(0.5, 1))) if proposed else None,
+                    round(price * rng.uniform(0.9, 1.2), 2) if proposed else None,
+                ))
+            header = (poid, rng.randint(1, suppliers), ordered, expected, status, responded, delivered,
+                      f"user{rng.randint(1, 25)}@example.com", proposed_date, proposed_status,
+                      "Partial stock, new date proposed" if proposed else None)
+            yield header, lines
+
+    # Headers and their lines are loaded chunk by chunk so years of history never sit in memory
+    counts["PurchaseOrders"] = counts["PurchaseOrderItems"] = 0
+    for chunk in chunked(purchase_orders(), CHUNK_ROWS // 10):
+        counts["PurchaseOrders"] += load(tx, "PurchaseOrders", PO_COLUMNS, (header for header, _ in chunk))
+        counts["PurchaseOrderItems"] += load(tx, "PurchaseOrderItems", PO_ITEM_COLUMNS,
+                                             (line for _, lines in chunk for line in lines))
+
+    # Each category value is linked to its parent, the value one level up on its path
+    dropdowns = sorted({
+        (level, value, path[depth - 1] if depth else None)
+        for path in used_paths for depth, (level, value) in enumerate(zip(CATEGORY_LEVELS, path))
+    })
+    dropdowns += [("OriginCountry", c, None) for c in COUNTRIES]
+    counts["Dropdowns"] = load(tx, "Dropdowns", ["section", "value", "ParentValue"], dropdowns)
+    counts["Users"] = load(tx, "Users", ["Name", "Email", "Role"],
+                           [("Bench Admin", "admin@example.com", "Admin")] +
+                           [(f"User {i}", f"user{i}@example.com", "User") for i in range(1, 26)])
+
+    # Explicit IDs were loaded, so move the sequences past them
+    for table, column in [("Supplier", "SupplierID"), ("Item", "ItemID"), ("PurchaseOrders", "POID")]:
+        tx.execute(f"SELECT setval(pg_get_serial_sequence('{table.lower()}', '{column.lower()}'), "
+                   f"GREATEST((SELECT MAX({column}) FROM {table}), 1))")
+    return counts
+
+
+def seed_dataset(tx, items, seed=42, today=None):
+    """Load the default proportions for `items` items; returns the row counts per table."""
+    return generate(tx, dataset_sizes(items), seed, today)
+
+
+def prepare_database(db, truncate=False):
+    """Apply the schema migrations; empty the tables first when `truncate` is set."""
+    from migrations import migrate
+
+    migrate(db)
+    with db.transaction() as tx:
+        if truncate:
+            tx.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        elif not tx.fetch_data("SELECT 1 FROM Item LIMIT 1").empty:
+            sys.exit("Item already has rows: pass --truncate to replace the existing data")
+
+
+def finish_database(db):
+    """Rebuild the stock levels from the loaded lots and refresh planner statistics."""
+    from stock_handler import REBUILD_STOCK
+
+    with db.transaction() as tx:
+        tx.execute(REBUILD_STOCK)
+    db.execute_command("ANALYZE")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("AMAS_DSN"), help="target database (or AMAS_DSN)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--lots", type=int, help="inventory lots (default: 5 per item)")
+    parser.add_argument("--suppliers", type=int, help="default: one per 50 items")
+    parser.add_argument("--purchase-orders", type=int, help="default: one per 5 items")
+    parser.add_argument("--years", type=int, default=2, help="history covered by POs and lots")
+    parser.add_argument("--proposed-fraction", type=float, default=0.05,
+                        help="share of POs carrying a supplier proposal")
+    parser.add_argument("--images", type=int, help="distinct images (default: one per 20 items)")
+    parser.add_argument("--image-kb", type=int, default=0, help="size of each image blob; 0 disables images")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="YYYY-MM-DD the generated dates are relative to (default: the current date)")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables before loading")
+    args = parser.parse_args(argv)
+    if not args.dsn:
+        parser.error("--dsn or AMAS_DSN is required")
+    os.environ["AMAS_DSN"] = args.dsn
+
+    sizes = dataset_sizes(args.items)
+    sizes.update({
+        "lots": args.lots if args.lots is not None else sizes["lots"],
+        "suppliers": args.suppliers or sizes["suppliers"],
+        "purchase_orders": args.purchase_orders or sizes["purchase_orders"],
+        "years": args.years,
+        "proposed_fraction": args.proposed_fraction,
+        "images": (args.images or max(1, args.items // 20)) if args.image_kb else 0,
+        "image_bytes": args.image_kb * 1024,
+    })
+
+    from db_handler import DatabaseManager
+    db = DatabaseManager()
+    start = time.perf_counter()
+    prepare_database(db, args.truncate)
+    with db.transaction() as tx:
+        counts = generate(tx, sizes, args.seed, args.today)
+    finish_database(db)
+
+    for table, count in counts.items():
+        print(f"{table:<20} {count:>12,}")
+    print(f"Loaded in {time.perf_counter() - start:.1f}s (seed {args.seed}, today {args.today})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
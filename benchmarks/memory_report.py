@@ -0,0 +1,106 @@
+"""
+Report how much memory the handler reads hold with and without declared result schemas.
+
+    python -m benchmarks.memory_report --dsn postgresql://localhost/amas --items 25000 --output memory.json
+
+Each read runs twice against the same seeded schema: once with `typed_results` off (object
+columns, as psycopg2 returns them) and once with it on. The per-session total is the sum of
+the reads a user touching Home, Items, Purchase Orders, Receive and Reports keeps around.
+"""
+import os
+import sys
+import json
+import argparse
+
+from benchmarks.run import local_postgres, prepare_schema
+
+
+def reads():
+    """Named handler reads; handlers read AMAS_DSN when built."""
+    from home_handler import HomeHandler
+    from PO.po_handler import POHandler
+    from receive_items.receive_handler import ReceiveHandler
+    from item.item_handler import ItemHandler
+    from reports.report_handler import ReportHandler
+
+    home_handler, po_handler = HomeHandler(), POHandler()
+    receive_handler, item_handler, report_handler = ReceiveHandler(), ItemHandler(), ReportHandler()
+    return {
+        "home_inventory_page": (home_handler, lambda: home_handler.get_inventory_page({}, page_size=250)[0]),
+        "home_items_near_reorder": (home_handler, home_handler.get_items_near_reorder),
+        "category_tree": (home_handler, home_handler.get_category_tree),
+        "item_catalog": (item_handler, item_handler.get_items),
+        "po_items": (po_handler, po_handler.get_items),
+        "active_purchase_orders": (po_handler, po_handler.get_all_purchase_orders),
+        "item_locations": (receive_handler, receive_handler.get_items_with_locations_and_expirations),
+        "near_expiry_preview": (report_handler, lambda: report_handler.get_near_expiry_items(365, limit=1000)),
+    }
+
+
+def frame_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+
+def run(dsn, items, seed):
+    from db_handler import DatabaseManager
+
+    prepare_schema(dsn, "amas_bench_memory", items, seed)
+    db = DatabaseManager()
+    results = []
+    try:
+        for name, (handler, read) in reads().items():
+            sizes = {}
+            for typed in (False, True):
+                handler.typed_results = typed
+                df = read()
+                sizes[typed] = (len(df), frame_mb(df))
+            handler.typed_results = db.typed_results
+            (rows, object_mb), (_, typed_mb) = sizes[False], sizes[True]
+            results.append({
+                "read": name,
+                "rows": rows,
+                "object_mb": round(object_mb, 3),
+                "typed_mb": round(typed_mb, 3),
+                "reduction": round(1 - typed_mb / object_mb, 3) if object_mb else None,
+            })
+            print(f"{name:<26} {rows:>8} rows  {object_mb:>9.2f} MB -> {typed_mb:>9.2f} MB", file=sys.stderr)
+    finally:
+        db.pool.closeall()
+        db.execute_command("DROP SCHEMA amas_bench_memory CASCADE")
+
+    object_total = sum(r["object_mb"] for r in results)
+    typed_total = sum(r["typed_mb"] for r in results)
+    session = {
+        "object_mb": round(object_total, 3),
+        "typed_mb": round(typed_total, 3),
+        "reduction": round(1 - typed_total / object_total, 3) if object_total else None,
+    }
+    print(f"{'per session':<26} {'':>13}  {object_total:>9.2f} MB -> {typed_total:>9.2f} MB", file=sys.stderr)
+    return results, session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("AMAS_BENCH_DSN"))
+    parser.add_argument("--items", type=int, default=25000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.dsn:
+        results, session = run(args.dsn, args.items, args.seed)
+    else:
+        with local_postgres() as dsn:
+            results, session = run(dsn, args.items, args.seed)
+
+    text = json.dumps({"items": args.items, "seed": args.seed, "results": results, "session": session}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
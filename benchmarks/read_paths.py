@@ -0,0 +1,112 @@
+"""
+Compare the row-tuple read path (fetch_data) with the COPY columnar path (fetch_copy).
+
+    python -m benchmarks.read_paths --dsn postgresql://localhost/amas --items 25000 --output reads.json
+
+The default 25 000 items seed about 125 000 inventory lots; each query is timed on both paths.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from benchmarks.run import local_postgres, prepare_schema
+
+QUERIES = {
+    "inventory_join": ("""
+        SELECT inv.ItemID AS itemid, i.ItemNameEnglish AS itemnameenglish,
+               i.ClassCat AS classcat, i.DepartmentCat AS departmentcat, i.SectionCat AS sectioncat,
+               i.FamilyCat AS familycat, i.SubFamilyCat AS subfamilycat,
+               inv.Quantity AS quantity, inv.ExpirationDate AS expirationdate,
+               inv.StorageLocation AS storagelocation, i.Threshold AS threshold
+        FROM Inventory inv
+        JOIN Item i ON i.ItemID = inv.ItemID
+    """, {
+        "itemid": "int32", "classcat": "category", "departmentcat": "category",
+        "sectioncat": "category", "familycat": "category", "subfamilycat": "category",
+        "quantity": "int32", "expirationdate": "date", "storagelocation": "category",
+        "threshold": "int32",
+    }),
+    "archived_po_lines": ("""
+        SELECT po.POID AS poid, po.OrderDate AS orderdate, po.Status AS status,
+               s.SupplierName AS suppliername, poi.ItemID AS itemid,
+               poi.OrderedQuantity AS orderedquantity, poi.EstimatedPrice AS estimatedprice,
+               poi.ReceivedQuantity AS receivedquantity
+        FROM PurchaseOrders po
+        JOIN Supplier s ON po.SupplierID = s.SupplierID
+        JOIN PurchaseOrderItems poi ON po.POID = poi.POID
+        WHERE po.Status IN ('Completed', 'Declined')
+    """, {
+        "poid": "int32", "orderdate": "timestamp", "status": "category", "suppliername": "category",
+        "itemid": "int32", "orderedquantity": "int32", "estimatedprice": "decimal",
+        "receivedquantity": "int32",
+    }),
+}
+
+
+def timed(func, repeat):
+    func()  # warm-up
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def run(dsn, items, repeat, seed):
+    from db_handler import DatabaseManager
+
+    prepare_schema(dsn, "amas_bench_reads", items, seed)
+    db = DatabaseManager()
+    results = []
+    try:
+        for name, (query, schema) in QUERIES.items():
+            tuples_ms, df_tuples = timed(lambda: db.fetch_data(query), repeat)
+            copy_ms, df_copy = timed(lambda: db.fetch_copy(query, schema=schema), repeat)
+            results.append({
+                "query": name,
+                "rows": len(df_copy),
+                "fetch_data_median_ms": round(tuples_ms, 2),
+                "fetch_copy_median_ms": round(copy_ms, 2),
+                "speedup": round(tuples_ms / copy_ms, 2) if copy_ms else None,
+                "fetch_data_mb": round(df_tuples.memory_usage(deep=True).sum() / 2**20, 2),
+                "fetch_copy_mb": round(df_copy.memory_usage(deep=True).sum() / 2**20, 2),
+            })
+            print(f"{name:<20} {len(df_copy):>9} rows  fetch_data {tuples_ms:>9.1f} ms  "
+                  f"fetch_copy {copy_ms:>9.1f} ms  x{results[-1]['speedup']}", file=sys.stderr)
+    finally:
+        db.pool.closeall()
+        db.execute_command("DROP SCHEMA amas_bench_reads CASCADE")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("AMAS_BENCH_DSN"))
+    parser.add_argument("--items", type=int, default=25000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.dsn:
+        results = run(args.dsn, args.items, args.repeat, args.seed)
+    else:
+        with local_postgres() as dsn:
+            results = run(dsn, args.items, args.repeat, args.seed)
+
+    text = json.dumps({"items": args.items, "seed": args.seed, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""
+Benchmark the core handler operations against a throwaway PostgreSQL schema.
+
+    python -m benchmarks.run --dsn postgresql://localhost/amas --scales 1000,10000 --output bench.json
+    python -m benchmarks.run --compare bench.json          # exit 1 on a regression
+
+Without --dsn (or AMAS_BENCH_DSN) a temporary local cluster is started with initdb/pg_ctl.
+Each scale gets its own schema, which is dropped afterwards unless --keep is given.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pandas as pd
+import psycopg2
+from psycopg2.extensions import make_dsn
+
+from benchmarks.datagen import seed_dataset, prepare_database, finish_database
+
+
+def _pg_binary(name):
+    found = shutil.which(name)
+    if found:
+        return found
+    candidates = sorted(glob.glob(f"/usr/lib/postgresql/*/bin/{name}"))
+    if not candidates:
+        sys.exit(f"{name} not found: install PostgreSQL or pass --dsn")
+    return candidates[-1]
+
+
+@contextmanager
+def local_postgres():
+    """Start a disposable PostgreSQL cluster (fsync off) and yield its DSN."""
+    workdir = tempfile.mkdtemp(prefix="amas-bench-")
+    data_dir = os.path.join(workdir, "data")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    pg_ctl = _pg_binary("pg_ctl")
+    subprocess.run([_pg_binary("initdb"), "-D", data_dir, "-U", "postgres", "-A", "trust", "--no-sync"],
+                   check=True, stdout=subprocess.DEVNULL)
+    subprocess.run([pg_ctl, "-D", data_dir, "-l", os.path.join(workdir, "postgres.log"), "-w",
+                    "-o", f"-p {port} -k {workdir} -c fsync=off -c synchronous_commit=off", "start"],
+                   check=True, stdout=subprocess.DEVNULL)
+    try:
+        yield f"host={workdir} port={port} user=postgres dbname=postgres"
+    finally:
+        subprocess.run([pg_ctl, "-D", data_dir, "-m", "fast", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def prepare_schema(dsn, schema, items, seed):
+    """Create `schema`, load the base tables, seed data and apply the app's own schemas."""
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        cur.execute(f"CREATE SCHEMA {schema}")
+    conn.close()
+
+    scoped_dsn = make_dsn(dsn, options=f"-c search_path={schema}")
+    os.environ["AMAS_DSN"] = scoped_dsn
+
+    from db_handler import DatabaseManager
+    db = DatabaseManager()
+    prepare_database(db)
+    with db.transaction() as tx:
+        counts = seed_dataset(tx, items, seed)
+    finish_database(db)
+    return scoped_dsn, counts
+
+
+def operations(scale):
+    """
+    Named callables for the operations under test. Handlers read AMAS_DSN when built, so
+    this is called once per scale, after prepare_schema has pointed AMAS_DSN at its schema.
+    """
+    from home_handler import HomeHandler
+    from PO.po_handler import POHandler
+    from receive_items.receive_handler import ReceiveHandler
+    from item.item_handler import ItemHandler
+    from reports.report_handler import ReportHandler
+
+    home_handler, po_handler = HomeHandler(), POHandler()
+    receive_handler, item_handler, report_handler = ReceiveHandler(), ItemHandler(), ReportHandler()
+    item_ids = po_handler.get_items()["itemid"].head(20).tolist()
+    supplier_name = item_handler.get_suppliers()["suppliername"].iloc[0]
+    runs = {"import": 0}
+
+    def home():
+        # The queries and aggregation behind home.home(), first page of the inventory grid
+        home_handler.get_inventory_summary()
+        home_handler.get_items_near_reorder()
+        home_handler.get_inventory_page({}, "Item Name", False, 50)
+        home_handler.count_inventory_rows({})
+
+    def create_manual_po():
+        po_handler.create_manual_po(
+            1, date.today() + timedelta(days=7),
+            [{"item_id": item_id, "quantity": 10, "estimated_price": 2.5} for item_id in item_ids],
+            "bench@example.com"
+        )
+
+    def add_items_to_inventory():
+        expiry = date.today() + timedelta(days=180)
+        receive_handler.add_items_to_inventory([
+            {"item_id": item_id, "quantity": 5, "expiration_date": expiry, "storage_location": "A-01"}
+            for item_id in item_ids * 25
+        ])
+
+    def bulk_import():
+        runs["import"] += 1
+        sheet = pd.DataFrame({
+            "itemnameenglish": [f"Bench Import {scale}-{runs['import']}-{i}" for i in range(500)],
+            "classcat": "Class 1", "departmentcat": "Department 1", "sectioncat": "Section 1",
+            "familycat": "Family 1", "subfamilycat": "SubFamily 1",
+            "threshold": 10, "averagerequired": 20, "suppliername": supplier_name,
+        })
+        item_handler.import_items(sheet)
+
+    return {
+        "home": home,
+        "get_low_stock_items": po_handler.get_auto_po_candidates,
+        "create_manual_po": create_manual_po,
+        "add_items_to_inventory": add_items_to_inventory,
+        "bulk_import": bulk_import,
+        "get_supplier_performance": report_handler.get_supplier_performance,
+    }
+
+
+def time_operation(func, repeat, monitor):
+    """Run `func` once to warm up, then `repeat` times; latency stats in milliseconds."""
+    func()
+    monitor.reset()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    statements = sum(row["count"] for row in monitor.summary())
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))], 3),
+        "max_ms": round(samples[-1], 3),
+        "statements_per_run": round(statements / repeat, 2),
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """Print median ratios against a previous results file; returns the regressions."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["operation"], r["scale"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get((result["operation"], result["scale"]))
+        if not old or not old["median_ms"]:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"{result['operation']:<26} {result['scale']:>8} {old['median_ms']:>10.2f} -> "
+              f"{result['median_ms']:>10.2f} ms  x{ratio:.2f} {flag}", file=sys.stderr)
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def run(dsn, scales, repeat, seed, keep):
+    from db_handler import DatabaseManager
+
+    results, meta = [], {}
+    for scale in scales:
+        schema = f"amas_bench_{scale}"
+        print(f"Loading scale {scale} into schema {schema}…", file=sys.stderr)
+        start = time.perf_counter()
+        _, counts = prepare_schema(dsn, schema, scale, seed)
+        load_seconds = time.perf_counter() - start
+        # The reference cache is process-wide and keyed by query text, not by schema
+        DatabaseManager().reference_cache.clear()
+        monitor = DatabaseManager().query_monitor
+        meta.setdefault("server_version", DatabaseManager().fetch_data("SHOW server_version").iloc[0, 0])
+
+        for name, func in operations(scale).items():
+            stats = time_operation(func, repeat, monitor)
+            results.append({"operation": name, "scale": scale, "rows": counts,
+                            "load_seconds": round(load_seconds, 2), **stats})
+            print(f"  {name:<26} median {stats['median_ms']:>10.2f} ms", file=sys.stderr)
+
+        DatabaseManager().pool.closeall()
+        if not keep:
+            conn = psycopg2.connect(dsn)
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA {schema} CASCADE")
+            conn.close()
+    return results, meta
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("AMAS_BENCH_DSN"),
+                        help="PostgreSQL DSN to benchmark against (default: start a local cluster)")
+    parser.add_argument("--scales", default="1000,10000", help="comma-separated item counts")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="previous results file to compare medians against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="median ratio counted as a regression")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark schemas")
+    args = parser.parse_args(argv)
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+
+    if args.dsn:
+        results, meta = run(args.dsn, scales, args.repeat, args.seed, args.keep)
+    else:
+        with local_postgres() as dsn:
+            results, meta = run(dsn, scales, args.repeat, args.seed, args.keep)
+
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    report = {
+        "meta": {
+            **meta,
+            "commit": commit.stdout.strip() or None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare and compare(results, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
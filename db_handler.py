@@ -1,64 +1,867 @@
+import io
+import os
+import time
+import itertools
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import psycopg2
+from psycopg2 import extensions, extras, sql, pool as pg_pool
 import pandas as pd
 
+from query_monitor import QueryMonitor, approx_bytes
+from tracing import span, trace_context, attach_trace
+
+# Errors that mean the server side of a connection is gone (e.g. Neon closed an idle connection)
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+# An OperationalError raised by a statement timeout or cancel: the connection is fine and
+# re-running the statement would only time out again
+QUERY_CANCELED = extensions.QueryCanceledError
+
+# Bulk writes at or above this many rows are streamed with COPY instead of multi-row VALUES
+COPY_THRESHOLD = 5000
+
+# table name -> {column: SQL type}, filled lazily by Transaction.column_types
+_column_type_cache = {}
+
+# Rows per round trip for server-side cursors unless the caller says otherwise
+DEFAULT_ITERSIZE = 2000
+
+# Unique names for server-side cursors opened in this process
+_cursor_ids = itertools.count(1)
+
+# Set on fetch_many worker threads, so nested fetch_many calls run inline instead of
+# waiting on the (bounded, possibly saturated) executor they are running on
+_fetch_worker = threading.local()
+
+
+class ConnectionPool:
+    """Thread-safe pool of psycopg2 connections shared by every session in the process."""
+
+    def __init__(self, dsn, minconn=1, maxconn=10, idle_check_seconds=30.0, acquire_timeout=30.0):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.idle_check_seconds = idle_check_seconds
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, released_at) pairs, most recently used last
+        self._open = 0
+        self._in_use = 0
+        self._stats = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "health_check_failures": 0,
+        }
+
+        for _ in range(minconn):
+            self._open += 1
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(self.dsn)
+        # Single statements commit on their own; transactions switch this off explicitly.
+        conn.autocommit = True
+        with self._cond:
+            self._stats["created"] += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["closed"] += 1
+
+    def _is_healthy(self, conn, released_at):
+        """Cheap liveness check; only pings the server when the connection sat idle for a while."""
+        if conn.closed or conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        if time.monotonic() - released_at < self.idle_check_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        """Check out a healthy connection, waiting up to `acquire_timeout` when the pool is full."""
+        start = time.monotonic()
+        deadline = start + self.acquire_timeout
+        conn, released_at = None, None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    break
+                if self._open < self.maxconn:
+                    self._open += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise pg_pool.PoolError("connection pool exhausted")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            if waited > 0.001:
+                self._stats["waits"] += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, released_at):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                self._close(conn)
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn, close=False):
+        """Return a connection to the pool, or close it when it is broken or `close` is set."""
+        if not close and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+                if not conn.autocommit:
+                    conn.autocommit = True
+            except Exception:
+                close = True
+        close = close or bool(conn.closed)
+
+        if close:
+            self._close(conn)
+        with self._cond:
+            self._in_use -= 1
+            if close:
+                self._open -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection (used connections are closed when returned)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    def stats(self):
+        """Snapshot of pool counters for monitoring."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+            })
+        stats["wait_seconds_avg"] = (
+            stats["wait_seconds_total"] / stats["checkouts"] if stats["checkouts"] else 0.0
+        )
+        return stats
+
+
+class ReferenceCache:
+    """
+    Process-wide LRU cache for rarely changing lookup data (dropdowns, suppliers, ...).
+    Entries expire after `ttl_seconds`, the least recently used ones are evicted past
+    `max_entries`, and writers drop every entry that depends on a table they changed.
+    """
+
+    def __init__(self, ttl_seconds=300.0, max_entries=256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        self._generations = {}  # table -> number of times it was invalidated
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _copy(value):
+        # Callers get their own copy so mutating a result never corrupts the cache
+        return value.copy() if hasattr(value, "copy") else value
+
+    def get_or_load(self, tables, key, loader):
+        """Return the cached value for `key`, calling `loader()` on a miss."""
+        tables = frozenset(t.lower() for t in tables)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._copy(entry[2])
+            self._stats["misses"] += 1
+            generations = {table: self._generations.get(table, 0) for table in tables}
+
+        value = loader()
+        # Empty results are not cached: they are cheap to re-read and may come from a failed query
+        if getattr(value, "empty", False) or value is None:
+            return value
+
+        with self._lock:
+            # A table invalidated while we were loading may have changed under the load: the
+            # caller still gets the value, but it is not stored to be served to later readers
+            if any(self._generations.get(table, 0) != seen for table, seen in generations.items()):
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, tables, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return self._copy(value)
+
+    def invalidate(self, *tables):
+        """Drop every entry that was loaded from any of `tables`."""
+        tables = {t.lower() for t in tables}
+        with self._lock:
+            stale = [key for key, (_, deps, _) in self._entries.items() if deps & tables]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += len(stale)
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def generation(self, table):
+        """Counter bumped on every invalidation of `table`; lets sessions detect changes cheaply."""
+        with self._lock:
+            return self._generations.get(table.lower(), 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), max_entries=self.max_entries,
+                        ttl_seconds=self.ttl_seconds)
+
+
+def frame_from_cursor(cur, probe=None):
+    """Build a DataFrame from the result of the last statement run on `cur`."""
+    rows = cur.fetchall()
+    if probe is not None:
+        probe.set_result(rows)
+    columns = [desc[0] for desc in cur.description]
+    return pd.DataFrame(rows, columns=columns) if rows else pd.DataFrame()
+
+
+# Column kinds a caller can declare for typed reads -> pandas dtype
+SCHEMA_DTYPES = {
+    "int16": "Int16",
+    "int32": "Int32",
+    "int64": "Int64",
+    "float": "float64",
+    "decimal": "float64",
+    "bool": "boolean",
+    "text": "string",
+    "category": "category",
+    "date": "datetime64[ns]",
+    "timestamp": "datetime64[ns]",
+}
+
+
+# NULL marker for COPY ... CSV output; the default (an unquoted empty field) reads back like ''
+COPY_NULL = "\\N"
+
+
+def read_copy_csv(buffer, schema=None):
+    """
+    Parse `COPY ... TO STDOUT (FORMAT csv, HEADER, NULL '\\N')` output with pandas' C reader.
+    `schema` maps column names to SCHEMA_DTYPES kinds; other columns are read as str, never
+    re-inferred. NULL comes back as missing and '' stays ''; only a text value of exactly
+    `\\N` is indistinguishable from NULL.
+    """
+    dtypes, dates = {}, []
+    schema = schema or {}
+    for column, kind in schema.items():
+        if kind in ("date", "timestamp"):
+            dates.append(column)
+        else:
+            dtypes[column] = SCHEMA_DTYPES[kind]
+    header = pd.read_csv(buffer, nrows=0).columns
+    buffer.seek(0)
+    dtypes.update({column: str for column in header if column not in schema})
+    return pd.read_csv(
+        buffer,
+        dtype=dtypes,
+        parse_dates=dates,
+        true_values=["t"],
+        false_values=["f"],
+        keep_default_na=False,
+        na_values=[COPY_NULL],
+    )
+
+
+def apply_schema(df, schema):
+    """
+    Give the declared columns of a row-tuple result compact dtypes instead of object:
+    `schema` maps column names to SCHEMA_DTYPES kinds. Columns the result does not
+    have are skipped, so one schema can serve several SELECT variants.
+    """
+    for column, kind in (schema or {}).items():
+        if column not in df.columns:
+            continue
+        if kind in ("date", "timestamp"):
+            df[column] = pd.to_datetime(df[column])
+        elif kind in ("int16", "int32", "int64", "float", "decimal"):
+            # Decimal/None cells -> numbers first; NULLs stay missing in the nullable ints
+            df[column] = pd.to_numeric(df[column]).astype(SCHEMA_DTYPES[kind])
+        else:
+            df[column] = df[column].astype(SCHEMA_DTYPES[kind])
+    return df
+
+
+def identifier(name):
+    """Quote a table/column name the way the unquoted names in our SQL resolve (lower case)."""
+    return sql.Identifier(name.lower())
+
+
+def copy_buffer(rows):
+    """
+    Serialise rows as COPY CSV. Every value is quoted so that only missing values (None,
+    NaN, NaT, pd.NA) stay an unquoted empty field (NULL); bytes are written in bytea hex
+    form, and whole-number floats (integers that went through a float column) as integers.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        fields = []
+        for value in row:
+            if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+                fields.append("")
+                continue
+            if isinstance(value, (bytes, memoryview)):
+                value = "\\x" + bytes(value).hex()
+            elif pd.api.types.is_float(value) and float(value).is_integer():
+                value = int(value)
+            fields.append('"' + str(value).replace('"', '""') + '"')
+        buffer.write(",".join(fields) + "\n")
+    buffer.seek(0)
+    return buffer
+
+
+class Transaction:
+    """Unit of work: every statement runs on one connection and commits (or rolls back) together."""
+
+    def __init__(self, conn, monitor=None, typed=True):
+        self.conn = conn
+        self.monitor = monitor or QueryMonitor(slow_ms=float("inf"))
+        self.typed = typed
+
+    def execute(self, query, params=None):
+        """Run a statement and return the affected row count."""
+        with self.monitor.track(query, params) as probe, self.conn.cursor() as cur:
+            cur.execute(query, params or ())
+            probe.rows = max(cur.rowcount, 0)
+            return cur.rowcount
+
+    def execute_returning(self, query, params=None):
+        """Run a statement and return its first result row."""
+        with self.monitor.track(query, params) as probe, self.conn.cursor() as cur:
+            cur.execute(query, params or ())
+            row = cur.fetchone()
+            probe.set_result([row] if row else [])
+            return row
+
+    def execute_batch(self, query, params_list, page_size=100):
+        """Run one statement for many parameter sets, `page_size` statements per round trip."""
+        if not params_list:
+            return
+        with self.monitor.track(query) as probe, self.conn.cursor() as cur:
+            extras.execute_batch(cur, query, params_list, page_size=page_size)
+            probe.rows = len(params_list)
+
+    def column_types(self, table):
+        """SQL types of `table`'s columns, looked up once per process."""
+        key = table.lower()
+        if key not in _column_type_cache:
+            df = self.fetch_data("""
+            SELECT a.attname AS column_name, format_type(a.atttypid, a.atttypmod) AS column_type
+            FROM pg_attribute a
+            WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped
+            """, (key,))
+            _column_type_cache[key] = dict(zip(df["column_name"], df["column_type"])) if not df.empty else {}
+        return _column_type_cache[key]
+
+    def bulk_insert(self, table, columns, rows, returning=None, on_conflict_do_nothing=False,
+                    template=None, page_size=1000, use_copy=None):
+        """
+        Insert many rows in a constant number of round trips.
+        Uses multi-row VALUES (execute_values) and switches to COPY FROM STDIN for
+        COPY_THRESHOLD rows or more when no RETURNING/ON CONFLICT/template is needed;
+        `use_copy=True` forces COPY regardless of size.
+        Returns the RETURNING rows as a list of tuples (empty list otherwise).
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return []
+        if use_copy is None:
+            use_copy = len(rows) >= COPY_THRESHOLD
+        target = sql.SQL("{} ({})").format(
+            identifier(table), sql.SQL(", ").join(identifier(c) for c in columns)
+        )
+
+        with self.conn.cursor() as cur:
+            if use_copy and not returning and not on_conflict_do_nothing and template is None:
+                copy = sql.SQL("COPY {} FROM STDIN WITH (FORMAT csv)").format(target).as_string(cur)
+                with self.monitor.track(copy) as probe:
+                    buffer = copy_buffer(rows)
+                    cur.copy_expert(copy, buffer)
+                    probe.rows, probe.nbytes = len(rows), buffer.tell()
+                return []
+
+            query = sql.SQL("INSERT INTO {} VALUES %s").format(target)
+            if on_conflict_do_nothing:
+                query += sql.SQL(" ON CONFLICT DO NOTHING")
+            if returning:
+                query += sql.SQL(" RETURNING {}").format(
+                    sql.SQL(", ").join(identifier(c) for c in returning)
+                )
+            query = query.as_string(cur)
+            with self.monitor.track(query) as probe:
+                result = extras.execute_values(
+                    cur, query, rows,
+                    template=template, page_size=page_size, fetch=bool(returning)
+                )
+                probe.rows = len(rows)
+        return result or []
+
+    def bulk_update(self, table, key_cols, rows, page_size=1000):
+        """
+        Update many rows, matched on `key_cols`, in a constant number of round trips.
+        `rows` are dicts holding the key columns plus the columns to set.
+        Large batches are COPYed into a temp table first, small ones joined from VALUES.
+        """
+        if not rows:
+            return
+        columns = list(rows[0].keys())
+        set_cols = [c for c in columns if c not in key_cols]
+        values = [tuple(row[c] for c in columns) for row in rows]
+
+        set_clause = sql.SQL(", ").join(
+            sql.SQL("{} = v.{}").format(identifier(c), identifier(c)) for c in set_cols
+        )
+        match_clause = sql.SQL(" AND ").join(
+            sql.SQL("t.{} = v.{}").format(identifier(c), identifier(c)) for c in key_cols
+        )
+        value_cols = sql.SQL(", ").join(identifier(c) for c in columns)
+
+        with self.conn.cursor() as cur:
+            if len(values) >= COPY_THRESHOLD:
+                staging = sql.Identifier(f"_bulk_update_{table.lower()}")
+                cur.execute(sql.SQL(
+                    "CREATE TEMP TABLE {} ON COMMIT DROP AS SELECT {} FROM {} WITH NO DATA"
+                ).format(staging, value_cols, identifier(table)))
+                copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(staging, value_cols)
+                copy = copy.as_string(cur)
+                with self.monitor.track(copy) as probe:
+                    buffer = copy_buffer(values)
+                    cur.copy_expert(copy, buffer)
+                    probe.rows, probe.nbytes = len(values), buffer.tell()
+                update = sql.SQL("UPDATE {} AS t SET {} FROM {} AS v WHERE {}").format(
+                    identifier(table), set_clause, staging, match_clause
+                ).as_string(cur)
+                with self.monitor.track(update) as probe:
+                    cur.execute(update)
+                    probe.rows = max(cur.rowcount, 0)
+                cur.execute(sql.SQL("DROP TABLE {}").format(staging))
+                return
+
+            # VALUES literals carry no column types, so cast each one to the target type.
+            types = self.column_types(table)
+            template = "(" + ", ".join(
+                f"%s::{types[c.lower()]}" if c.lower() in types else "%s" for c in columns
+            ) + ")"
+            query = sql.SQL("UPDATE {} AS t SET {} FROM (VALUES %s) AS v ({}) WHERE {}").format(
+                identifier(table), set_clause, value_cols, match_clause
+            ).as_string(cur)
+            with self.monitor.track(query) as probe:
+                extras.execute_values(cur, query, values, template=template, page_size=page_size)
+                probe.rows = len(values)
+
+    def fetch_data(self, query, params=None, schema=None):
+        """Read inside the transaction, so it sees the transaction's own writes."""
+        with self.monitor.track(query, params) as probe, self.conn.cursor() as cur:
+            cur.execute(query, params or ())
+            df = frame_from_cursor(cur, probe)
+        return apply_schema(df, schema) if self.typed else df
+
+    def fetch_chunks(self, query, params=None, chunk_size=DEFAULT_ITERSIZE, as_frame=True, schema=None):
+        """
+        Stream a result through a named (server-side) cursor: yields DataFrames, or lists of
+        row tuples with `as_frame=False`, of at most `chunk_size` rows. Only one chunk is
+        held client-side at a time. The recorded query time covers the fetches only, not
+        the caller's processing between chunks. `schema` types each DataFrame chunk.
+        """
+        acquire = self.monitor.take_acquire()
+        seconds, total_rows, total_bytes = 0.0, 0, 0
+        with self.conn.cursor(name=f"amas_stream_{next(_cursor_ids)}") as cur:
+            cur.itersize = chunk_size
+            start = time.perf_counter()
+            cur.execute(query, params or ())
+            seconds += time.perf_counter() - start
+            columns = None
+            try:
+                while True:
+                    start = time.perf_counter()
+                    rows = cur.fetchmany(chunk_size)
+                    seconds += time.perf_counter() - start
+                    if not rows:
+                        break
+                    total_rows += len(rows)
+                    total_bytes += approx_bytes(rows)
+                    if not as_frame:
+                        yield rows
+                        continue
+                    columns = columns or [desc[0] for desc in cur.description]
+                    chunk = pd.DataFrame(rows, columns=columns)
+                    yield apply_schema(chunk, schema) if self.typed else chunk
+            finally:
+                self.monitor.record(query, seconds, acquire, total_rows, total_bytes, params)
+
+    def fetch_iter(self, query, params=None, itersize=DEFAULT_ITERSIZE):
+        """Yield result rows one by one, fetched from the server `itersize` rows at a time."""
+        for rows in self.fetch_chunks(query, params, itersize, as_frame=False):
+            yield from rows
+
+
+def neon_settings():
+    """
+    Connection settings: the [neon] secrets section, or just the AMAS_DSN environment
+    variable for scripts run outside Streamlit (benchmarks, data generation).
+    """
+    dsn = os.environ.get("AMAS_DSN")
+    if dsn:
+        return {"dsn": dsn}
+    return st.secrets["neon"]
+
+
+@st.cache_resource(show_spinner=False)
+def get_pool(dsn, minconn, maxconn, idle_check_seconds):
+    """One pool per process, reused across Streamlit sessions and script threads."""
+    return ConnectionPool(dsn, minconn, maxconn, idle_check_seconds)
+
+
+@st.cache_resource(show_spinner=False)
+def get_query_monitor(slow_ms, explain_slow):
+    """One statement statistics recorder per process, shared by every session."""
+    return QueryMonitor(slow_ms, explain_slow)
+
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_executor(max_workers):
+    """One bounded thread pool per process for `fetch_many`, shared by every session."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="amas-fetch")
+
+
+def _run_fetch(name, call, script_ctx, trace_ctx, monitor, page):
+    """Body of one `fetch_many` task: runs in a worker under the caller's session, trace and page."""
+    add_script_run_ctx(threading.current_thread(), script_ctx)
+    monitor.set_page(page)
+    _fetch_worker.active = True
+    try:
+        with attach_trace(trace_ctx), span(f"fetch:{name}"):
+            return call()
+    finally:
+        _fetch_worker.active = False
+
+
+@st.cache_resource(show_spinner=False)
+def get_reference_cache(ttl_seconds, max_entries):
+    """One reference-data cache per process, shared by every handler."""
+    return ReferenceCache(ttl_seconds, max_entries)
+
+
 class DatabaseManager:
     """General Database Interactions"""
 
     def __init__(self):
-        self.dsn = st.secrets["neon"]["dsn"]
+        neon = neon_settings()
+        self.dsn = neon["dsn"]
+        self.pool_min = int(neon.get("pool_min", 1))
+        self.pool_max = int(neon.get("pool_max", 10))
+        self.pool_idle_check_seconds = float(neon.get("pool_idle_check_seconds", 30))
+        self.cache_ttl_seconds = float(neon.get("cache_ttl_seconds", 300))
+        self.cache_max_entries = int(neon.get("cache_max_entries", 256))
+        self.slow_query_ms = float(neon.get("slow_query_ms", 500))
+        self.slow_query_explain = bool(neon.get("slow_query_explain", False))
+        self.itersize = int(neon.get("itersize", DEFAULT_ITERSIZE))
+        self.typed_results = bool(neon.get("typed_results", True))
+        self.fetch_workers = int(neon.get("fetch_workers", 4))
+        self.auto_migrate = bool(neon.get("auto_migrate", False))
+
+    @property
+    def pool(self):
+        return get_pool(self.dsn, self.pool_min, self.pool_max, self.pool_idle_check_seconds)
+
+    @property
+    def reference_cache(self):
+        return get_reference_cache(self.cache_ttl_seconds, self.cache_max_entries)
+
+    @property
+    def query_monitor(self):
+        return get_query_monitor(self.slow_query_ms, self.slow_query_explain)
 
     def get_connection(self):
+        start = time.perf_counter()
         try:
-            return psycopg2.connect(self.dsn)
+            conn = self.pool.getconn()
+            # Reported with the next statement this thread runs
+            self.query_monitor.note_acquire(time.perf_counter() - start)
+            return conn
         except Exception as e:
             st.error(f"Database connection failed: {e}")
             return None
 
-    def fetch_data(self, query, params=None):
+    def release_connection(self, conn, discard=False):
+        """Hand a connection obtained from `get_connection` back to the pool."""
+        self.pool.putconn(conn, close=discard)
+
+    @contextmanager
+    def pooled_connection(self):
+        """Yield a pooled connection (or None) and always give it back; broken ones are dropped."""
         conn = self.get_connection()
-        if not conn:
-            return pd.DataFrame()
+        if conn is None:
+            yield None
+            return
+        broken = False
+        try:
+            yield conn
+        except CONNECTION_ERRORS as e:
+            broken = not isinstance(e, QUERY_CANCELED)
+            raise
+        finally:
+            self.release_connection(conn, discard=broken)
 
-        with conn.cursor() as cur:
-            cur.execute(query, params or ())
-            rows = cur.fetchall()
-            columns = [desc[0] for desc in cur.description]
-        conn.close()
-        return pd.DataFrame(rows, columns=columns) if rows else pd.DataFrame()
+    def pool_stats(self):
+        """Connection pool statistics (wait time, in-use, created/closed)."""
+        return self.pool.stats()
 
-    def execute_command(self, query, params=None):
-        conn = self.get_connection()
-        if conn:
-            with conn.cursor() as cur:
-                cur.execute(query, params or ())
+    def query_stats(self):
+        """Per page and statement fingerprint: count, p50/p95/max latency, rows and bytes."""
+        return pd.DataFrame(self.query_monitor.summary())
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements as one unit of work:
+
+            with db.transaction() as tx:
+                tx.execute(...)
+
+        Commits when the block exits normally and rolls back on any exception.
+        """
+        with self.pooled_connection() as conn:
+            if conn is None:
+                raise psycopg2.OperationalError("No database connection available")
+            conn.autocommit = False
+            try:
+                yield Transaction(conn, self.query_monitor, self.typed_results)
                 conn.commit()
-            conn.close()
+            except BaseException:
+                try:
+                    conn.rollback()
+                except CONNECTION_ERRORS:
+                    pass
+                raise
+
+    def bulk_insert(self, table, columns, rows, **kwargs):
+        """Multi-row insert in its own transaction; see Transaction.bulk_insert."""
+        with self.transaction() as tx:
+            return tx.bulk_insert(table, columns, rows, **kwargs)
+
+    def bulk_update(self, table, key_cols, rows, **kwargs):
+        """Multi-row update in its own transaction; see Transaction.bulk_update."""
+        with self.transaction() as tx:
+            tx.bulk_update(table, key_cols, rows, **kwargs)
+
+    def cached_fetch(self, tables, query, params=None, schema=None):
+        """`fetch_data` through the reference cache; `tables` are the tables the result depends on."""
+        dtypes = tuple(sorted(schema.items())) if schema and self.typed_results else ()
+        # List params (ANY(%s) arrays) are frozen so the key stays hashable
+        frozen = tuple(tuple(p) if isinstance(p, list) else p for p in params) if params else ()
+        key = (" ".join(query.split()), frozen, dtypes)
+        return self.reference_cache.get_or_load(tables, key, lambda: self.fetch_data(query, params, schema))
+
+    def invalidate_cache(self, *tables):
+        """Call after writing to `tables` so later reads never see the old rows."""
+        self.reference_cache.invalidate(*tables)
+
+    def fetch_data(self, query, params=None, schema=None):
+        """
+        Run a read and return its rows as a DataFrame. `schema` maps result columns to
+        SCHEMA_DTYPES kinds (categories, nullable narrow ints, datetimes, decimal -> float);
+        undeclared columns keep pandas' inferred (mostly object) dtypes.
+        """
+        # Reads are retried once on a fresh connection if the server dropped the old one.
+        for attempt in range(2):
+            try:
+                with self.pooled_connection() as conn:
+                    if not conn:
+                        return pd.DataFrame()
+
+                    with self.query_monitor.track(query, params, explain_conn=conn) as probe, \
+                            conn.cursor() as cur:
+                        cur.execute(query, params or ())
+                        df = frame_from_cursor(cur, probe)
+                return apply_schema(df, schema) if self.typed_results else df
+            except QUERY_CANCELED:
+                raise
+            except CONNECTION_ERRORS:
+                if attempt:
+                    raise
+
+    def fetch_many(self, reads):
+        """
+        Run independent reads concurrently and return {name: result}, so a page waits
+        about as long as its slowest read instead of the sum of all of them.
+
+            data = db.fetch_many({
+                "suppliers": handler.get_suppliers,                 # any zero-argument callable
+                "items": ("SELECT ... WHERE x = %s", (x,)),         # (query, params[, schema])
+                "count": "SELECT COUNT(*) AS n FROM Item",          # plain SQL
+            })
+
+        Callables keep their handler's caching and schemas. Each read runs on the shared
+        `fetch_workers` thread pool with its own pooled connection, tagged with the
+        caller's page and traced under the caller's open span. The first failing read's
+        exception is raised once every read has finished.
+        """
+        calls = {name: self._read_call(read) for name, read in reads.items()}
+        if len(calls) < 2 or getattr(_fetch_worker, "active", False):
+            return {name: call() for name, call in calls.items()}
+
+        executor = get_fetch_executor(self.fetch_workers)
+        context = (get_script_run_ctx(), trace_context(), self.query_monitor, self.query_monitor.current_page)
+        with span("fetch_many", reads=len(calls)):
+            futures = {name: executor.submit(_run_fetch, name, call, *context) for name, call in calls.items()}
+            errors = [future.exception() for future in futures.values()]
+        for error in errors:
+            if error is not None:
+                raise error
+        return {name: future.result() for name, future in futures.items()}
+
+    def _read_call(self, read):
+        """A zero-argument callable for one `fetch_many` entry."""
+        if callable(read):
+            return read
+        if isinstance(read, str):
+            return lambda: self.fetch_data(read)
+        return lambda: self.fetch_data(*read)
+
+    def fetch_chunks(self, query, params=None, chunk_size=None, as_frame=True, schema=None):
+        """
+        Stream a large read in bounded memory: yields DataFrames (or row-tuple lists with
+        `as_frame=False`) of at most `chunk_size` rows (default: the `itersize` setting).
+
+            for chunk in db.fetch_chunks("SELECT ...", params):
+                ...
+
+        The rows come from a server-side cursor inside a read transaction, which holds its
+        pooled connection until the generator is exhausted or closed.
+        """
+        with self.transaction() as tx:
+            yield from tx.fetch_chunks(query, params, chunk_size or self.itersize, as_frame, schema)
+
+    def fetch_iter(self, query, params=None, itersize=None):
+        """Yield result rows (tuples) one by one; see `fetch_chunks`."""
+        with self.transaction() as tx:
+            yield from tx.fetch_iter(query, params, itersize or self.itersize)
+
+    def fetch_copy(self, query, params=None, schema=None):
+        """
+        Columnar read path for large results: the query runs as `COPY (...) TO STDOUT`
+        in CSV form and the text is parsed straight into typed columns (see
+        `read_copy_csv`), skipping per-row Python tuples. `schema` declares column kinds;
+        with `typed_results` off it is ignored and every column comes back as text.
+        """
+        for attempt in range(2):
+            try:
+                with self.pooled_connection() as conn:
+                    if not conn:
+                        return pd.DataFrame()
+
+                    with self.query_monitor.track(query, params) as probe, conn.cursor() as cur:
+                        # COPY takes no bind parameters, so they are inlined by psycopg2's quoting
+                        statement = cur.mogrify(query, params).decode() if params else query
+                        buffer = io.BytesIO()
+                        cur.copy_expert(
+                            f"COPY ({statement.strip().rstrip(';')}) TO STDOUT "
+                            f"WITH (FORMAT csv, HEADER, NULL '{COPY_NULL}')",
+                            buffer
+                        )
+                        probe.nbytes = buffer.tell()
+                        buffer.seek(0)
+                        df = read_copy_csv(buffer, schema if self.typed_results else None)
+                        probe.rows = len(df)
+                        return df
+            except QUERY_CANCELED:
+                raise
+            except CONNECTION_ERRORS:
+                if attempt:
+                    raise
+
+    def execute_command(self, query, params=None):
+        with self.pooled_connection() as conn:
+            if conn:
+                with self.query_monitor.track(query, params, explain_conn=conn) as probe, \
+                        conn.cursor() as cur:
+                    cur.execute(query, params or ())
+                    probe.rows = max(cur.rowcount, 0)
+                    conn.commit()
 
     def execute_command_returning(self, query, params=None):
-        conn = self.get_connection()
-        if not conn:
-            return None
-        with conn.cursor() as cur:
-            cur.execute(query, params or ())
-            result = cur.fetchone()
-            conn.commit()
-        conn.close()
+        with self.pooled_connection() as conn:
+            if not conn:
+                return None
+            with self.query_monitor.track(query, params, explain_conn=conn) as probe, \
+                    conn.cursor() as cur:
+                cur.execute(query, params or ())
+                result = cur.fetchone()
+                probe.set_result([result] if result else [])
+                conn.commit()
         return result
 
     # ─────────── Dropdown Management ───────────
     def get_all_sections(self):
-        df = self.fetch_data("SELECT DISTINCT section FROM Dropdowns")
+        df = self.cached_fetch(["Dropdowns"], "SELECT DISTINCT section FROM Dropdowns")
         return df["section"].tolist() if not df.empty else []
 
     def get_dropdown_values(self, section):
         query = "SELECT value FROM Dropdowns WHERE section = %s"
-        df = self.fetch_data(query, (section,))
+        df = self.cached_fetch(["Dropdowns"], query, (section,))
         return df["value"].tolist() if not df.empty else []
 
     # ───────────── Supplier Management ─────────────
     def get_suppliers(self):
-        return self.fetch_data("SELECT SupplierID, SupplierName FROM Supplier")
+        return self.cached_fetch(["Supplier"], "SELECT SupplierID, SupplierName FROM Supplier")
 
     # ───────────── Inventory Management ─────────────
     def add_inventory(self, inventory_data):
@@ -71,3 +874,4 @@ class DatabaseManager:
         """
 
         self.execute_command(query, list(inventory_data.values()))
+        self.invalidate_cache("Inventory")
@@ -1,102 +1,115 @@
 import streamlit as st
-import pandas as pd
-from db_handler import DatabaseManager
-from PIL import Image
-import io
-import base64
+from datetime import date, timedelta
+from home_handler import HomeHandler, CATEGORY_COLUMNS
+from image_handler import ImageHandler
 
-db = DatabaseManager()
+home_handler = HomeHandler()
+image_handler = ImageHandler()
 
-def convert_image(image_bytes):
-    """Convert image bytes to base64 for display in Streamlit data editor."""
-    if image_bytes:
-        return f'data:image/jpeg;base64,{base64.b64encode(image_bytes).decode()}'
-    return None
+CATEGORY_LABELS = ["Class Category", "Department Category", "Section Category", "Family Category", "Sub-Family Category"]
+PAGE_SIZES = [25, 50, 100, 250]
 
 def home():
     st.title("🏠 Inventory Home Page")
     st.subheader("📊 Inventory Overview")
 
-    query = """
-    SELECT i.ItemID, i.ItemNameEnglish, i.ClassCat, i.DepartmentCat, i.SectionCat, 
-           i.FamilyCat, i.SubFamilyCat, i.ItemPicture, inv.Quantity, inv.ExpirationDate, 
-           inv.StorageLocation, i.Threshold, i.AverageRequired 
-    FROM Inventory inv
-    JOIN Item i ON inv.ItemID = i.ItemID
-    """
-    df = db.fetch_data(query)
-
-    if not df.empty:
-        st.metric(label="Total Inventory Items", value=len(df))
-
-        df.columns = df.columns.str.lower()
-
-        if "quantity" in df.columns:
-            df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").astype("Int64")
-            df["itempicture"] = df["itempicture"].apply(convert_image)
-
-            df = df.groupby(["itemid", "expirationdate", "storagelocation"], as_index=False).agg({
-                "itemnameenglish": "first",
-                "classcat": "first",
-                "departmentcat": "first",
-                "sectioncat": "first",
-                "familycat": "first",
-                "subfamilycat": "first",
-                "threshold": "first",
-                "averagerequired": "first",
-                "itempicture": "first",
-                "quantity": "sum"
-            })
-
-            total_quantity = df["quantity"].sum()
-        else:
-            st.warning("⚠️ 'quantity' column not found in database. Check table schema.")
-            total_quantity = "N/A"
+    summary = home_handler.get_inventory_summary()
 
-        st.metric(label="Total Stock Quantity", value=total_quantity)
+    if summary["total_items"]:
+        st.metric(label="Total Inventory Items", value=summary["total_items"])
+        st.metric(label="Total Stock Quantity", value=summary["total_quantity"])
 
         # Items Near Reorder
         st.subheader("⚠️ Items Near Reorder")
-        required_columns = {"itemid", "quantity", "threshold", "averagerequired"}
-
-        missing_columns = required_columns - set(df.columns)
-        if missing_columns:
-            st.warning(f"⚠️ Missing columns in database: {missing_columns}")
+        low_stock_items = home_handler.get_items_near_reorder()
+
+        if not low_stock_items.empty:
+            picture_uris = image_handler.get_data_uris(low_stock_items["imagehash"], "thumb")
+            low_stock_items["itempicture"] = low_stock_items["imagehash"].map(picture_uris)
+
+            st.data_editor(
+                low_stock_items[["itempicture", "itemnameenglish", "quantity", "threshold", "reorderamount"]],
+                column_config={
+                    "itempicture": st.column_config.ImageColumn("Item Picture"),
+                    "itemnameenglish": "Item Name (English)",
+                    "quantity": "Quantity",
+                    "threshold": "Threshold",
+                    "reorderamount": "Reorder Amount"
+                },
+                use_container_width=True,
+                hide_index=True
+            )
         else:
-            grouped_reorder_df = df.groupby("itemid", as_index=False).agg({
-                "itemnameenglish": "first",
-                "quantity": "sum",
-                "threshold": "first",
-                "averagerequired": "first",
-                "itempicture": "first"
-            })
-
-            low_stock_items = grouped_reorder_df[grouped_reorder_df["quantity"] < grouped_reorder_df["threshold"]].copy()
-
-            if not low_stock_items.empty:
-                low_stock_items["quantity"].fillna(0, inplace=True)
-                low_stock_items["averagerequired"].fillna(0, inplace=True)
-                low_stock_items["reorderamount"] = low_stock_items["averagerequired"] - low_stock_items["quantity"]
-
-                st.data_editor(
-                    low_stock_items[["itempicture", "itemnameenglish", "quantity", "threshold", "reorderamount"]],
-                    column_config={
-                        "itempicture": st.column_config.ImageColumn("Item Picture"),
-                        "itemnameenglish": "Item Name (English)",
-                        "quantity": "Quantity",
-                        "threshold": "Threshold",
-                        "reorderamount": "Reorder Amount"
-                    },
-                    use_container_width=True,
-                    hide_index=True
-                )
-            else:
-                st.success("All stock levels are sufficient.")
+            st.success("All stock levels are sufficient.")
 
         # Full Inventory Data
         st.subheader("📋 Full Inventory Data")
+        inventory_browser()
+    else:
+        st.info("No inventory data available.")
+
+def inventory_filters():
+    """Filter and sort widgets for the inventory browser."""
+    filters = {}
+    with st.expander("🔎 Filters & Sorting"):
+        filters["search"] = st.text_input("Search item name or barcode", key="inv_search").strip()
+
+        # ✅ Cascading category filters: each choice narrows the options below it
+        tree = home_handler.get_category_tree()
+        category_cols = st.columns(len(CATEGORY_COLUMNS))
+        for col, label, widget_col in zip(CATEGORY_COLUMNS, CATEGORY_LABELS, category_cols):
+            options = sorted(tree[col].dropna().unique().tolist()) if not tree.empty else []
+            choice = widget_col.selectbox(label, [""] + options, key=f"inv_{col}")
+            if choice:
+                filters[col] = choice
+                tree = tree[tree[col] == choice]
+
+        filters["locations"] = st.multiselect(
+            "Storage Location", home_handler.get_storage_locations(), key="inv_locations"
+        )
+
+        if st.checkbox("Filter by expiration date", key="inv_expiry_on"):
+            expiry_range = st.date_input(
+                "Expiration between",
+                value=(date.today(), date.today() + timedelta(days=30)),
+                key="inv_expiry"
+            )
+            if len(expiry_range) == 2:
+                filters["expiry_from"], filters["expiry_to"] = expiry_range
+
+        col_sort, col_dir, col_size = st.columns(3)
+        sort_by = col_sort.selectbox("Sort by", list(HomeHandler.SORT_COLUMNS.keys()), key="inv_sort")
+        descending = col_dir.checkbox("Descending", key="inv_desc")
+        page_size = col_size.selectbox("Rows per page", PAGE_SIZES, index=1, key="inv_page_size")
+
+    return filters, sort_by, descending, page_size
+
+def inventory_browser():
+    """Paginated, server-side filtered view of the per-lot inventory rollup."""
+    filters, sort_by, descending, page_size = inventory_filters()
+
+    # ✅ Keyset cursors of the pages visited so far; reset when the query changes
+    signature = repr((sorted(filters.items()), sort_by, descending, page_size))
+    if st.session_state.get("inv_signature") != signature:
+        st.session_state["inv_signature"] = signature
+        st.session_state["inv_cursors"] = [None]
+    cursors = st.session_state["inv_cursors"]
+
+    page_df, next_keyset = home_handler.get_inventory_page(
+        filters, sort_by, descending, page_size, after=cursors[-1]
+    )
+    matching_rows = home_handler.count_inventory_rows(filters)
+    st.caption(f"Page {len(cursors)} · {matching_rows} matching inventory rows")
+
+    if page_df.empty:
+        st.info("No inventory rows match the selected filters.")
+    else:
+        picture_uris = image_handler.get_data_uris(page_df["imagehash"], "thumb")
+        page_df["itempicture"] = page_df["imagehash"].map(picture_uris)
+        page_df = page_df.drop(columns=["imagehash"])
+
         st.data_editor(
-            df,
+            page_df,
             column_config={
                 "itempicture": st.column_config.ImageColumn("Item Picture"),
                 "itemnameenglish": "Item Name (English)",
@@ -108,12 +121,19 @@ def home():
                 "quantity": "Quantity",
                 "threshold": "Threshold",
                 "averagerequired": "Average Required",
-                "expirationdate": "Expiration Date",
+                "expirationdate": st.column_config.DateColumn("Expiration Date", format="YYYY-MM-DD"),
                 "storagelocation": "Storage Location"
             },
             use_container_width=True,
             hide_index=True,
             num_rows="dynamic"
         )
-    else:
-        st.info("No inventory data available.")
+
+    col_prev, col_next = st.columns(2)
+    if col_prev.button("⬅️ Previous Page", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    if col_next.button("Next Page ➡️", disabled=next_keyset is None or len(page_df) < page_size,
+                       use_container_width=True):
+        cursors.append(next_keyset)
+        st.rerun()
@@ -0,0 +1,164 @@
+from stock_handler import StockHandler
+from tracing import trace_methods
+
+CATEGORY_COLUMNS = ["classcat", "departmentcat", "sectioncat", "familycat", "subfamilycat"]
+
+# Result dtypes of the per-lot rollup (see DatabaseManager.fetch_data)
+INVENTORY_SCHEMA = {
+    **{col: "category" for col in CATEGORY_COLUMNS},
+    "itemid": "int32",
+    "quantity": "int64",
+    "threshold": "int32",
+    "averagerequired": "int32",
+    "expirationdate": "date",
+    "storagelocation": "category",
+}
+
+# Stand-in for NULL expiry dates so they can take part in keyset comparisons; the keyset
+# also carries an is-NULL flag, so a real lot on that date never ties with a NULL one
+NO_EXPIRY = "9999-12-31"
+
+
+@trace_methods
+class HomeHandler(StockHandler):
+    """Handles the inventory queries behind the Home page."""
+
+    # Sort label -> column of the lot rollup used as the leading keyset column
+    SORT_COLUMNS = {
+        "Item Name": "itemnameenglish",
+        "Expiration Date": "sort_exp",
+        "Quantity": "quantity",
+        "Storage Location": "sort_loc",
+    }
+
+    def _inventory_filters(self, filters):
+        """WHERE clause and params for the Inventory ⋈ Item filters chosen on the page."""
+        filters = filters or {}
+        clauses, params = [], []
+        for col in CATEGORY_COLUMNS:
+            if filters.get(col):
+                clauses.append(f"i.{col} = %s")
+                params.append(filters[col])
+        if filters.get("locations"):
+            clauses.append("inv.StorageLocation = ANY(%s)")
+            params.append(list(filters["locations"]))
+        if filters.get("expiry_from"):
+            clauses.append("inv.ExpirationDate >= %s")
+            params.append(filters["expiry_from"])
+        if filters.get("expiry_to"):
+            clauses.append("inv.ExpirationDate <= %s")
+            params.append(filters["expiry_to"])
+        if filters.get("search"):
+            clauses.append("(i.ItemNameEnglish ILIKE %s OR i.Barcode ILIKE %s)")
+            pattern = f"%{filters['search'].strip()}%"
+            params.extend([pattern, pattern])
+        where = "WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def get_inventory_summary(self):
+        """Total number of inventory rows and total stock quantity, from the ItemStock rollup."""
+        return self.get_stock_summary()
+
+    def get_items_near_reorder(self):
+        """Items in stock whose total quantity is below their threshold, with the amount to reorder."""
+        df = self.get_below_threshold(in_stock_only=True)
+        return df.rename(columns={"shortfall": "reorderamount"})
+
+    def count_inventory_rows(self, filters=None):
+        """
+        Number of rows of the per-lot rollup (item / expiration date / storage location)
+        matching the filters, i.e. what the pages of `get_inventory_page` add up to.
+        Cached per filter set until Inventory or Item is written, so paging and other
+        widget reruns do not repeat the grouped count.
+        """
+        where, params = self._inventory_filters(filters)
+        df = self.cached_fetch(["Inventory", "Item"], f"""
+        SELECT COUNT(*) AS total
+        FROM (
+            SELECT 1
+            FROM Inventory inv
+            JOIN Item i ON inv.ItemID = i.ItemID
+            {where}
+            GROUP BY inv.ItemID, inv.ExpirationDate, inv.StorageLocation
+        ) lots
+        """, params)
+        return int(df.iloc[0]["total"]) if not df.empty else 0
+
+    def get_inventory_page(self, filters=None, sort_by="Item Name", descending=False,
+                           page_size=50, after=None):
+        """
+        One page of the per-lot rollup (item / expiration date / storage location),
+        using keyset pagination: `after` is the keyset returned with the previous page.
+        Returns (page DataFrame, keyset of its last row or None).
+        """
+        where, params = self._inventory_filters(filters)
+        sort_col = self.SORT_COLUMNS.get(sort_by, "itemnameenglish")
+        # Sort column, then the group key with is-NULL flags: unique per row, so pages
+        # never skip or repeat rows at a boundary
+        lead = {"sort_exp": ["no_exp", "sort_exp"], "sort_loc": ["no_loc", "sort_loc"]}.get(sort_col, [sort_col])
+        keys = ", ".join(dict.fromkeys(lead + ["itemid", "no_exp", "sort_exp", "no_loc", "sort_loc"]))
+        direction = "DESC" if descending else "ASC"
+
+        keyset_clause = ""
+        if after is not None:
+            placeholders = ", ".join(["%s"] * len(after))
+            keyset_clause = f"WHERE ({keys}) {'<' if descending else '>'} ({placeholders})"
+            params = params + list(after)
+
+        order_by = ", ".join(f"{key} {direction}" for key in keys.split(", "))
+        df = self.fetch_data(f"""
+        SELECT *
+        FROM (
+            SELECT
+                inv.ItemID AS itemid,
+                inv.ExpirationDate AS expirationdate,
+                inv.StorageLocation AS storagelocation,
+                MAX(i.ItemNameEnglish) AS itemnameenglish,
+                MAX(i.ClassCat) AS classcat,
+                MAX(i.DepartmentCat) AS departmentcat,
+                MAX(i.SectionCat) AS sectioncat,
+                MAX(i.FamilyCat) AS familycat,
+                MAX(i.SubFamilyCat) AS subfamilycat,
+                MAX(i.Threshold) AS threshold,
+                MAX(i.AverageRequired) AS averagerequired,
+                MAX(i.ImageHash) AS imagehash,
+                COALESCE(SUM(inv.Quantity), 0) AS quantity,
+                inv.ExpirationDate IS NULL AS no_exp,
+                COALESCE(inv.ExpirationDate, DATE '{NO_EXPIRY}') AS sort_exp,
+                inv.StorageLocation IS NULL AS no_loc,
+                COALESCE(inv.StorageLocation, '') AS sort_loc
+            FROM Inventory inv
+            JOIN Item i ON inv.ItemID = i.ItemID
+            {where}
+            GROUP BY inv.ItemID, inv.ExpirationDate, inv.StorageLocation
+        ) lots
+        {keyset_clause}
+        ORDER BY {order_by}
+        LIMIT %s
+        """, params + [int(page_size)], schema=INVENTORY_SCHEMA)
+
+        if df.empty:
+            return df, None
+        last = df.iloc[-1]
+        keyset = tuple(
+            value.item() if hasattr(value, "item") else value  # NumPy scalars -> Python for psycopg2
+            for value in (last[key] for key in keys.split(", "))
+        )
+        return df.drop(columns=["no_exp", "sort_exp", "no_loc", "sort_loc"]), keyset
+
+    def get_category_tree(self):
+        """Distinct category paths in use, for cascading filter options."""
+        return self.cached_fetch(["Item"], f"""
+        SELECT DISTINCT {', '.join(CATEGORY_COLUMNS)}
+        FROM Item
+        """, schema={col: "category" for col in CATEGORY_COLUMNS})
+
+    def get_storage_locations(self):
+        """Distinct storage locations currently holding inventory."""
+        df = self.cached_fetch(["Inventory"], """
+        SELECT DISTINCT StorageLocation AS storagelocation
+        FROM Inventory
+        WHERE StorageLocation IS NOT NULL AND StorageLocation <> ''
+        ORDER BY 1
+        """)
+        return df["storagelocation"].tolist() if not df.empty else []
@@ -0,0 +1,275 @@
+import io
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+from PIL import Image, ImageOps
+from db_handler import DatabaseManager, neon_settings
+from tracing import trace_methods
+
+# Longest edge in pixels for each stored rendition
+RENDITIONS = {"thumb": 64, "preview": 256, "full": 1024}
+IMAGE_FORMAT = "WEBP"
+IMAGE_QUALITY = 80
+
+def image_hash(image_bytes):
+    """Content address of stored image bytes (matches encode(sha256(...), 'hex') in SQL)."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def image_mime(image_bytes):
+    """Guess the MIME type of stored image bytes from their signature."""
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return "image/jpeg"
+
+
+def make_renditions(image_bytes):
+    """
+    Normalise an uploaded picture: apply the EXIF orientation, drop all metadata and
+    encode one downscaled copy per RENDITIONS entry.
+    Returns {rendition: (bytes, width, height)}; raises OSError for unreadable images.
+    """
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        img = ImageOps.exif_transpose(source)
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        img = img.convert("RGBA" if has_alpha else "RGB")
+
+    renditions = {}
+    for name, size in RENDITIONS.items():
+        scaled = img.copy()
+        scaled.thumbnail((size, size), Image.LANCZOS)
+        scaled.info = {}  # no EXIF/ICC/XMP carried over
+        buffer = io.BytesIO()
+        scaled.save(buffer, format=IMAGE_FORMAT, quality=IMAGE_QUALITY)
+        renditions[name] = (buffer.getvalue(), scaled.width, scaled.height)
+    return renditions
+
+
+def data_uri(image_bytes):
+    """Encode image bytes as a data URI for st.column_config.ImageColumn."""
+    return f"data:{image_mime(image_bytes)};base64,{base64.b64encode(image_bytes).decode()}"
+
+
+class DataUriCache:
+    """
+    Byte-budgeted LRU of ready-made data URIs keyed by (image hash, rendition).
+    Images are content-addressed, so an entry never goes stale.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_many(self, keys):
+        """Return {key: uri} for the cached keys and the list of missing keys."""
+        found, missing = {}, []
+        with self._lock:
+            for key in keys:
+                uri = self._entries.get(key)
+                if uri is None:
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = uri
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(missing)
+        return found, missing
+
+    def put(self, key, uri):
+        size = len(uri)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = uri
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self._stats["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_uri_cache(max_bytes):
+    """One data-URI cache per process, shared by every session."""
+    return DataUriCache(max_bytes)
+
+
+@trace_methods
+class ImageHandler(DatabaseManager):
+    """Content-addressed item image store; images are deduplicated by hash and loaded on demand."""
+
+    def __init__(self):
+        super().__init__()
+        self.data_uri_cache_bytes = int(neon_settings().get("data_uri_cache_mb", 64)) * 1024 * 1024
+
+    @property
+    def data_uri_cache(self):
+        return get_data_uri_cache(self.data_uri_cache_bytes)
+
+    def store_image(self, tx, image_bytes):
+        """
+        Normalise and store an uploaded image inside an open transaction; returns its hash
+        (None for no image). ItemImage keeps the "full" rendition, the smaller ones go to
+        ItemImageRendition. Files Pillow cannot read are stored as uploaded.
+        The hash is taken from the stored "full" bytes, so uploads that normalise to the
+        same picture share one row.
+        """
+        if not image_bytes:
+            return None
+        image_bytes = bytes(image_bytes)
+        try:
+            renditions = make_renditions(image_bytes)
+        except (OSError, ValueError):
+            renditions = {}
+
+        full = renditions["full"][0] if renditions else image_bytes
+        digest = image_hash(full)
+        tx.execute("""
+        INSERT INTO ItemImage (ImageHash, ImageData, ByteSize, NormalizedAt)
+        VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (ImageHash) DO NOTHING
+        """, (digest, full, len(full)))
+        self._store_renditions(tx, [(digest, renditions)])
+        return digest
+
+    @staticmethod
+    def _store_renditions(tx, processed):
+        """Insert the non-"full" renditions for a list of (hash, renditions) pairs."""
+        tx.bulk_insert(
+            "ItemImageRendition",
+            ["ImageHash", "Rendition", "ImageData", "Width", "Height", "ByteSize"],
+            [
+                (digest, name, data, width, height, len(data))
+                for digest, renditions in processed
+                for name, (data, width, height) in renditions.items()
+                if name != "full"
+            ],
+            on_conflict_do_nothing=True
+        )
+
+    def get_images(self, hashes, rendition="full"):
+        """
+        Fetch one rendition ("thumb", "preview" or "full") for several images in one query.
+        Falls back to the stored image when a rendition has not been generated yet.
+        Returns {hash: bytes}.
+        """
+        hashes = sorted({h for h in hashes if isinstance(h, str) and h})
+        if not hashes:
+            return {}
+        df = self.fetch_data("""
+        SELECT img.ImageHash, COALESCE(r.ImageData, img.ImageData) AS ImageData
+        FROM ItemImage img
+        LEFT JOIN ItemImageRendition r
+            ON r.ImageHash = img.ImageHash AND r.Rendition = %s
+        WHERE img.ImageHash = ANY(%s)
+        """, (rendition, hashes))
+        if df.empty:
+            return {}
+        return {h: bytes(data) for h, data in zip(df["imagehash"], df["imagedata"])}
+
+    def get_image(self, image_hash_value, rendition="full"):
+        """Fetch a single image, or None."""
+        return self.get_images([image_hash_value], rendition).get(image_hash_value)
+
+    def get_data_uris(self, hashes, rendition="thumb"):
+        """
+        Data URIs for several images: each distinct image is fetched and encoded once,
+        later calls are served from the process-wide DataUriCache. Returns {hash: uri}.
+        """
+        hashes = sorted({h for h in hashes if isinstance(h, str) and h})
+        found, missing = self.data_uri_cache.get_many([(h, rendition) for h in hashes])
+        uris = {h: uri for (h, _), uri in found.items()}
+
+        images = self.get_images([h for h, _ in missing], rendition)
+        for h, data in images.items():
+            uris[h] = data_uri(data)
+            self.data_uri_cache.put((h, rendition), uris[h])
+        return uris
+
+    def data_uri_stats(self):
+        """Hit/miss counters and size of the data-URI cache."""
+        return self.data_uri_cache.stats()
+
+    def backfill_renditions(self, batch_size=50):
+        """
+        Normalise images stored before renditions existed, one batch per transaction.
+        Those rows are keyed by the hash of the original upload, so each normalised image
+        is re-keyed by the hash of its new bytes (merging duplicates) and Item is pointed
+        at the new key. Unreadable images are marked as processed and left untouched.
+        Returns the number of images processed.
+        """
+        processed_total = 0
+        while True:
+            with self.transaction() as tx:
+                batch = tx.fetch_data("""
+                SELECT ImageHash, ImageData
+                FROM ItemImage
+                WHERE NormalizedAt IS NULL
+                ORDER BY ImageHash
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """, (batch_size,))
+                if batch.empty:
+                    return processed_total
+
+                processed, rekeyed, new_rows = {}, [], {}
+                unreadable = []
+                for old, data in zip(batch["imagehash"], batch["imagedata"]):
+                    try:
+                        renditions = make_renditions(bytes(data))
+                    except (OSError, ValueError):
+                        unreadable.append(old)
+                        continue
+                    full = renditions["full"][0]
+                    new = image_hash(full)
+                    processed[new] = renditions
+                    new_rows[new] = (new, full, len(full))
+                    rekeyed.append((old, new))
+
+                tx.bulk_insert(
+                    "ItemImage", ["ImageHash", "ImageData", "ByteSize"],
+                    list(new_rows.values()), on_conflict_do_nothing=True
+                )
+                tx.execute(
+                    "UPDATE ItemImage SET NormalizedAt = CURRENT_TIMESTAMP WHERE ImageHash = ANY(%s)",
+                    (list(new_rows) + unreadable,)
+                )
+                if rekeyed:
+                    old_hashes, new_hashes = zip(*rekeyed)
+                    tx.execute("""
+                    UPDATE Item i
+                    SET ImageHash = m.new
+                    FROM unnest(%s::text[], %s::text[]) AS m(old, new)
+                    WHERE i.ImageHash = m.old AND m.old <> m.new
+                    """, (list(old_hashes), list(new_hashes)))
+                    tx.execute(
+                        "DELETE FROM ItemImage WHERE ImageHash = ANY(%s) AND NOT (ImageHash = ANY(%s))",
+                        (list(old_hashes), list(new_hashes))
+                    )
+                self._store_renditions(tx, list(processed.items()))
+                processed_total += len(rekeyed) + len(unreadable)
+
+
+if __name__ == "__main__":
+    # Batch job: python image_handler.py
+    from migrations import migrate
+
+    handler = ImageHandler()
+    migrate(handler)
+    print(f"Normalised {handler.backfill_renditions()} images.")
@@ -19,13 +19,26 @@ def authenticate():
     user_email = st.experimental_user.email
     user_name = st.experimental_user.name
 
+    # ✅ Reruns reuse the permissions resolved earlier in this session, unless an
+    # admin changed any user since (the Users cache generation moves on every update)
+    users_generation = db.reference_cache.generation("Users")
+    if (
+        st.session_state.get("auth_email") == user_email
+        and st.session_state.get("auth_generation") == users_generation
+        and "permissions" in st.session_state
+    ):
+        return
+
     # Save user details clearly in session_state
     st.session_state["user_email"] = user_email
     st.session_state["user_name"] = user_name
 
-    # Check if user exists in the database
-    query = "SELECT * FROM Users WHERE Email = %s"
-    user_df = db.fetch_data(query, (user_email,))
+    # Check if user exists in the database (process-wide TTL cache keyed by email)
+    query = """
+    SELECT Role, CanAccessHome, CanAccessItems, CanAccessReceive, CanAccessPO, CanAccessReports
+    FROM Users WHERE Email = %s
+    """
+    user_df = db.cached_fetch(["Users"], query, (user_email,))
 
     if user_df.empty:
         # New user → Add them with default permissions
@@ -34,6 +47,8 @@ def authenticate():
         VALUES (%s, %s, 'User')
         """
         db.execute_command(insert_query, (user_name, user_email))
+        db.invalidate_cache("Users")
+        users_generation = db.reference_cache.generation("Users")
         st.session_state["permissions"] = {
             "CanAccessHome": True,
             "CanAccessItems": False,
@@ -54,6 +69,9 @@ def authenticate():
         }
         st.session_state["user_role"] = user_info["role"]
 
+    st.session_state["auth_email"] = user_email
+    st.session_state["auth_generation"] = users_generation
+
 def logout():
     """Handles user logout."""
     st.logout()
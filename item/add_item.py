@@ -22,10 +22,13 @@ def add_item_tab():
         "Brand": "Brand"
     }
 
-    dropdown_values = {
-        label: item_handler.get_dropdown_values(db_field) 
-        for label, db_field in dropdown_fields.items()
-    }
+    # ✅ Every dropdown section comes from one catalog query, fetched alongside the suppliers
+    data = item_handler.fetch_many({
+        "catalog": item_handler.get_dropdown_catalog,
+        "suppliers": item_handler.get_suppliers,
+    })
+    catalog, suppliers_df = data["catalog"], data["suppliers"]
+    dropdown_values = {label: catalog.values(section) for label, section in dropdown_fields.items()}
 
     # Input fields
     item_name_en = st.text_input("Item Name (English) *")
@@ -33,11 +36,11 @@ def add_item_tab():
 
     class_cat = st.selectbox("Class Category *", [""] + dropdown_values["Class Category"])
 
-    # Other dropdowns
-    department_cat = st.selectbox("Department Category", [""] + dropdown_values["Department Category"])
-    section_cat = st.selectbox("Section Category", [""] + dropdown_values["Section Category"])
-    family_cat = st.selectbox("Family Category", [""] + dropdown_values["Family Category"])
-    subfamily_cat = st.selectbox("Sub-Family Category", [""] + dropdown_values["Sub-Family Category"])
+    # ✅ Each category narrows the options of the next, from the catalog already in memory
+    department_cat = st.selectbox("Department Category", [""] + catalog.values("DepartmentCat", class_cat))
+    section_cat = st.selectbox("Section Category", [""] + catalog.values("SectionCat", department_cat))
+    family_cat = st.selectbox("Family Category", [""] + catalog.values("FamilyCat", section_cat))
+    subfamily_cat = st.selectbox("Sub-Family Category", [""] + catalog.values("SubFamilyCat", family_cat))
 
     shelf_life = st.number_input("Shelf Life (days) *", min_value=0)
     threshold = st.number_input("Threshold *", min_value=0)
@@ -54,7 +57,6 @@ def add_item_tab():
     item_picture = st.file_uploader("Item Picture", type=["jpg", "jpeg", "png"])
 
     # Supplier selection
-    suppliers_df = item_handler.get_suppliers()
     supplier_names = suppliers_df["suppliername"].tolist()
     selected_sup_names = st.multiselect("Select Supplier(s)", supplier_names)
     selected_sup_ids = suppliers_df[suppliers_df["suppliername"].isin(selected_sup_names)]["supplierid"].tolist()
@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import io
 from item.item_handler import ItemHandler
 
@@ -80,63 +79,40 @@ def bulk_add_tab():
             for col in ["shelflife", "threshold", "averagerequired"]:
                 df[col] = df[col].fillna(0).astype(int)  # ✅ Fill NaN with 0, then convert to int
 
-            # ✅ Fetch supplier data
-            supplier_df = item_handler.get_suppliers()
-            if supplier_df.empty or "suppliername" not in supplier_df.columns:
-                st.error("❌ 'SupplierName' column not found in supplier table. Check database structure.")
+            # ✅ Import the whole sheet in one set-based transaction
+            report = item_handler.import_items(df)
+            if report.empty:
+                st.warning("⚠️ The uploaded file contains no rows.")
                 return
 
-            # ✅ Fetch existing item names to prevent duplicates
-            existing_items_df = item_handler.get_items()
-            existing_item_names = set(existing_items_df["itemnameenglish"].str.lower()) if not existing_items_df.empty else set()
-
-            # ✅ Create a set of available supplier names (for fast lookup)
-            existing_suppliers = set(supplier_df["suppliername"].str.lower())
-
-            # ✅ Insert items into the database
-            items_added = 0
-            missing_suppliers = set()  # ✅ Track missing suppliers
-            duplicate_items = set()  # ✅ Track duplicate items
-
-            for _, row in df.iterrows():
-                item_name = row["itemnameenglish"].strip().lower()  # ✅ Normalize case & spaces
-                supplier_name = row["suppliername"].strip().lower()  # ✅ Normalize case & spaces
-
-                # ✅ Check if item already exists
-                if item_name in existing_item_names:
-                    duplicate_items.add(row["itemnameenglish"])
-                    continue  # ✅ Skip duplicate items
-
-                # ✅ Check if supplier exists
-                if supplier_name not in existing_suppliers:
-                    missing_suppliers.add(row["suppliername"])  # ✅ Track missing supplier
-                    continue  # ✅ Skip this item (DO NOT ADD)
-
-                # ✅ Convert item data (skip "suppliername" column)
-                item_data = {
-                    key: value if not isinstance(value, float) or not np.isnan(value) else None  # ✅ Handle NaN
-                    for key, value in row.items() if key != "suppliername"
-                }
-
-                # ✅ Get Supplier ID from name
-                supplier_match = supplier_df[supplier_df["suppliername"].str.lower() == supplier_name]
-                supplier_id = int(supplier_match.iloc[0]["supplierid"])  # ✅ Convert supplier_id to int
-
-                # ✅ Add the item & link to supplier
-                item_handler.add_item(item_data, [supplier_id])
-                items_added += 1
+            accepted = report[report["status"] == "accepted"]
+            rejected = report[report["status"] == "rejected"]
 
             # ✅ Success Message
-            if items_added > 0:
-                st.success(f"✅ {items_added} items added successfully!")
+            if not accepted.empty:
+                st.success(f"✅ {len(accepted)} items added successfully!")
 
             # ✅ Warning for missing suppliers
-            if missing_suppliers:
-                st.warning(f"⚠️ The following suppliers were not found in the database, so their items were not added: {', '.join(missing_suppliers)}")
+            missing_suppliers = rejected.loc[rejected["reason"] == "Supplier not found", "suppliername"].dropna().unique()
+            if len(missing_suppliers):
+                st.warning(f"⚠️ The following suppliers were not found in the database, so their items were not added: {', '.join(map(str, missing_suppliers))}")
 
             # ✅ Warning for duplicate items
-            if duplicate_items:
-                st.warning(f"⚠️ The following items already exist and were not added again: {', '.join(duplicate_items)}")
+            duplicate_items = rejected.loc[
+                rejected["reason"].isin(["Item already exists", "Duplicate name in file"]), "itemnameenglish"
+            ].dropna().unique()
+            if len(duplicate_items):
+                st.warning(f"⚠️ The following items already exist and were not added again: {', '.join(map(str, duplicate_items))}")
+
+            # ✅ Per-row accept/reject report
+            st.write("📋 Import Report")
+            st.dataframe(report, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Download Import Report",
+                data=report.to_csv(index=False),
+                file_name="Bulk_Item_Import_Report.csv",
+                mime="text/csv"
+            )
 
         except Exception as e:
             st.error(f"❌ Error processing file: {e}")
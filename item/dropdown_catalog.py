@@ -0,0 +1,50 @@
+CATEGORY_HIERARCHY = ["ClassCat", "DepartmentCat", "SectionCat", "FamilyCat", "SubFamilyCat"]
+DROPDOWN_SECTIONS = CATEGORY_HIERARCHY + ["UnitType", "Packaging", "OriginCountry", "Manufacturer", "Brand"]
+
+
+class DropdownCatalog:
+    """
+    Every dropdown value, loaded in one query and indexed in memory.
+
+    Category sections form the hierarchy ClassCat → DepartmentCat → SectionCat →
+    FamilyCat → SubFamilyCat. A value may name its parent (a value of the section
+    above); values without a parent are offered under every parent.
+    """
+
+    def __init__(self, rows):
+        # rows: (section, value, parentvalue), ordered by section and value
+        self._values = {}
+        self._parents = {}
+        for section, value, parent in rows:
+            self._values.setdefault(section, []).append(value)
+            self._parents[(section, value)] = parent or None
+
+    @staticmethod
+    def parent_section(section):
+        """The section above `section` in the category hierarchy, or None."""
+        if section in CATEGORY_HIERARCHY[1:]:
+            return CATEGORY_HIERARCHY[CATEGORY_HIERARCHY.index(section) - 1]
+        return None
+
+    @staticmethod
+    def child_section(section):
+        """The section below `section` in the category hierarchy, or None."""
+        if section in CATEGORY_HIERARCHY[:-1]:
+            return CATEGORY_HIERARCHY[CATEGORY_HIERARCHY.index(section) + 1]
+        return None
+
+    def sections(self):
+        return list(self._values)
+
+    def values(self, section, parent=None):
+        """
+        Values of `section`. With `parent` (a value of the section above), only that
+        parent's children and the values not linked to any parent are returned.
+        """
+        values = self._values.get(section, [])
+        if not parent:
+            return list(values)
+        return [value for value in values if self._parents[(section, value)] in (None, parent)]
+
+    def parent_of(self, section, value):
+        return self._parents.get((section, value))
@@ -1,42 +1,52 @@
 import streamlit as st
 from item.item_handler import ItemHandler
+from item.dropdown_catalog import DROPDOWN_SECTIONS, DropdownCatalog
 
 item_handler = ItemHandler()
 
 def manage_dropdowns_tab():
     st.subheader("🛠️ Manage Dropdown Values")
 
-    sections = [
-        "ClassCat", "DepartmentCat", "SectionCat", "FamilyCat", "SubFamilyCat",
-        "UnitType", "Packaging", "OriginCountry", "Manufacturer", "Brand"
-    ]
+    selected_section = st.selectbox("Select Dropdown Section", DROPDOWN_SECTIONS)
+    parent_section = DropdownCatalog.parent_section(selected_section)
 
-    selected_section = st.selectbox("Select Dropdown Section", sections)
+    # ✅ All sections come from one cached catalog query
+    catalog = item_handler.get_dropdown_catalog()
+    current_values = catalog.values(selected_section)
 
-    # Display current values
-    current_values = item_handler.get_dropdown_values(selected_section)
+    # Display current values (with their parent category, for the category hierarchy)
     st.write("**Current Values:**")
-    st.write(current_values)
+    if parent_section:
+        st.dataframe(
+            [{"Value": value, parent_section: catalog.parent_of(selected_section, value) or ""}
+             for value in current_values],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.write(current_values)
 
     # Bulk add new values
     st.write("---")
     st.write("**➕ Bulk Add Values:**")
     new_values_str = st.text_area(
-        "Enter values to add (one per line)", 
+        "Enter values to add (one per line)",
         key=f"bulk_add_{selected_section}"
     )
+    parent = None
+    if parent_section:
+        parent = st.selectbox(
+            f"Parent {parent_section} (optional)",
+            [""] + catalog.values(parent_section),
+            key=f"bulk_add_parent_{selected_section}"
+        ) or None
 
     if st.button("Add Values"):
         new_values = [val.strip() for val in new_values_str.splitlines() if val.strip()]
         if new_values:
-            added = []
-            skipped = []
-            for val in new_values:
-                if val not in current_values:
-                    item_handler.add_dropdown_value(selected_section, val)
-                    added.append(val)
-                else:
-                    skipped.append(val)
+            # ✅ One set-based INSERT for the whole list
+            added = item_handler.add_dropdown_values(selected_section, new_values, parent)
+            skipped = [val for val in dict.fromkeys(new_values) if val not in added]
 
             if added:
                 st.success(f"✅ Added: {', '.join(added)}")
@@ -58,8 +68,8 @@ def manage_dropdowns_tab():
 
     if st.button("Delete Selected Values"):
         if values_to_delete:
-            for val in values_to_delete:
-                item_handler.delete_dropdown_value(selected_section, val)
+            # ✅ One set-based DELETE for the whole selection
+            item_handler.delete_dropdown_values(selected_section, values_to_delete)
             st.success(f"✅ Deleted: {', '.join(values_to_delete)}")
             st.rerun()
         else:
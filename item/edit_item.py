@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 from item.item_handler import ItemHandler
 from io import BytesIO
 
@@ -8,8 +9,9 @@ def edit_item_tab():
     """Tab for editing existing item details, including suppliers and pictures."""
     st.header("✏️ Edit Item Details")
 
-    # ✅ Fetch items
-    items_df = item_handler.get_items()
+    # ✅ Fetch items and suppliers concurrently
+    data = item_handler.fetch_many({"items": item_handler.get_items, "suppliers": item_handler.get_suppliers})
+    items_df, suppliers_df = data["items"], data["suppliers"]
 
     if items_df.empty:
         st.warning("⚠️ No items available for editing.")
@@ -23,27 +25,30 @@ def edit_item_tab():
     # ✅ Fetch item details
     selected_item = items_df[items_df["itemid"] == selected_item_id].iloc[0]
 
-    # ✅ Fetch suppliers linked to this item
-    suppliers_df = item_handler.get_suppliers()
-    linked_suppliers = item_handler.get_item_suppliers(selected_item_id)
+    # ✅ Linked suppliers and the picture depend on the selection; fetched together
+    selected = item_handler.fetch_many({
+        "linked_suppliers": lambda: item_handler.get_item_suppliers(selected_item_id),
+        "pictures": lambda: item_handler.get_item_pictures([selected_item["imagehash"]], "preview"),
+    })
+    linked_suppliers = selected["linked_suppliers"]
 
     # ✅ Display editable fields
     updated_data = {}
     for col in selected_item.index:
-        if col not in ["itemid", "createdat", "updatedat", "itempicture"]:  # Exclude non-editable fields
-            updated_data[col] = st.text_input(col.replace("_", " ").title(), value=str(selected_item[col]), key=f"edit_{col}")
+        if col not in ["itemid", "createdat", "updatedat", "imagehash"]:  # Exclude non-editable fields
+            updated_data[col] = st.text_input(col.replace("_", " ").title(), value="" if pd.isna(selected_item[col]) else str(selected_item[col]), key=f"edit_{col}")
 
     # ✅ Display and update item picture
     st.subheader("🖼️ Item Picture")
-    if selected_item["itempicture"]:
-        image_data = BytesIO(selected_item["itempicture"])
+    # ✅ Only the selected item's picture is loaded
+    picture = selected["pictures"].get(selected_item["imagehash"])
+    if picture:
+        image_data = BytesIO(picture)
         st.image(image_data, width=150, caption="Current Item Picture")
     else:
         st.info("ℹ️ No image available for this item.")
 
     uploaded_image = st.file_uploader("Upload a new image (Optional)", type=["jpg", "jpeg", "png"])
-    if uploaded_image:
-        updated_data["itempicture"] = uploaded_image.getvalue()  # Convert uploaded image to binary
 
     # ✅ Supplier selection (multi-select)
     if not suppliers_df.empty:
@@ -57,6 +62,8 @@ def edit_item_tab():
     # ✅ Update Button
     if st.button("Update Item"):
         item_handler.update_item(selected_item_id, updated_data)
+        if uploaded_image:
+            item_handler.update_item_picture(selected_item_id, uploaded_image.getvalue())
         item_handler.update_item_suppliers(selected_item_id, selected_supplier_ids)
         st.success("✅ Item details and suppliers updated successfully!")
         st.rerun()  # Refresh the page to reflect updates
@@ -1,33 +1,48 @@
 import streamlit as st
 import pandas as pd
 from db_handler import DatabaseManager
+from image_handler import ImageHandler
+from item.dropdown_catalog import DropdownCatalog
+from tracing import trace_methods
 
+ITEM_COLUMNS = [
+    "itemid", "itemnameenglish", "itemnamekurdish", "classcat", "departmentcat",
+    "sectioncat", "familycat", "subfamilycat", "shelflife", "threshold",
+    "averagerequired", "origincountry", "manufacturer", "brand",
+    "barcode", "unittype", "packaging", "imagehash", "createdat", "updatedat"
+]
+
+# The category columns repeat across thousands of items; ItemID stays a plain int for psycopg2
+ITEM_SCHEMA = {col: "category" for col in ["classcat", "departmentcat", "sectioncat", "familycat", "subfamilycat"]}
+
+@trace_methods
 class ItemHandler(DatabaseManager):
     """Handles all item-related database interactions separately."""
 
+    def __init__(self):
+        super().__init__()
+        # Built with this handler's settings, so both talk to the same database/schema
+        self.image_handler = ImageHandler()
+
     # ✅ Item methods
     def get_items(self):
         """
         Fetch item data and ensure a valid DataFrame is returned even if no items exist.
+        Picture bytes are not included; use `get_item_pictures` for the rows being shown.
         """
-        query = "SELECT * FROM item"
-        df = self.fetch_data(query)
+        query = f"SELECT {', '.join(ITEM_COLUMNS)} FROM item"
+        df = self.fetch_data(query, schema=ITEM_SCHEMA)
 
         if df.empty:
             # ✅ Return an empty DataFrame with correct columns to prevent errors
-            return pd.DataFrame(columns=[
-                "itemid", "itemnameenglish", "itemnamekurdish", "classcat", "departmentcat",
-                "sectioncat", "familycat", "subfamilycat", "shelflife", "threshold",
-                "averagerequired", "origincountry", "manufacturer", "brand",
-                "barcode", "unittype", "packaging", "itempicture", "createdat", "updatedat"
-            ])
+            return pd.DataFrame(columns=ITEM_COLUMNS)
         
         return df
 
     def get_suppliers(self):
         """Fetches the list of suppliers."""
         query = "SELECT SupplierID, SupplierName FROM Supplier"
-        return self.fetch_data(query)
+        return self.cached_fetch(["Supplier"], query)
 
     def get_item_suppliers(self, item_id):
         """Fetches suppliers linked to a specific item."""
@@ -40,35 +55,40 @@ class ItemHandler(DatabaseManager):
         return df["suppliername"].tolist() if not df.empty else []
 
     def add_item(self, item_data, supplier_ids):
-        """Adds a new item and links it to suppliers."""
-        columns = ", ".join(item_data.keys())
-        placeholders = ", ".join(["%s"] * len(item_data))
-        query = f"""
-        INSERT INTO item ({columns}, createdat, updatedat)
-        VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        RETURNING itemid
-        """
-        item_id = self.execute_command_returning(query, list(item_data.values()))
-
-        if item_id:
-            self.link_item_suppliers(item_id[0], supplier_ids)
-            return item_id[0]
-        return None
+        """Adds a new item (storing its picture in the image store) and links it to suppliers."""
+        item_data = dict(item_data)
+        picture = item_data.pop("itempicture", None)
+        with self.transaction() as tx:
+            item_data["imagehash"] = self.image_handler.store_image(tx, picture)
+            columns = ", ".join(item_data.keys())
+            placeholders = ", ".join(["%s"] * len(item_data))
+            query = f"""
+            INSERT INTO item ({columns}, createdat, updatedat)
+            VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            RETURNING itemid
+            """
+            item_id = tx.execute_returning(query, list(item_data.values()))
+            if not item_id:
+                return None
+            if supplier_ids:
+                tx.bulk_insert(
+                    "ItemSupplier", ["ItemID", "SupplierID"],
+                    [(item_id[0], int(supplier_id)) for supplier_id in supplier_ids],
+                    on_conflict_do_nothing=True
+                )
+        self.invalidate_cache("Item", "ItemSupplier")
+        return item_id[0]
 
     def link_item_suppliers(self, item_id, supplier_ids):
         """Links an item with selected suppliers."""
         if not supplier_ids:
             return
-        values = ", ".join(["(%s, %s)"] * len(supplier_ids))
-        params = []
-        for supplier_id in supplier_ids:
-            params.extend([item_id, supplier_id])
-        query = f"""
-        INSERT INTO itemsupplier (itemid, supplierid) 
-        VALUES {values}
-        ON CONFLICT DO NOTHING
-        """
-        self.execute_command(query, params)
+        self.bulk_insert(
+            "ItemSupplier", ["ItemID", "SupplierID"],
+            [(int(item_id), int(supplier_id)) for supplier_id in supplier_ids],
+            on_conflict_do_nothing=True
+        )
+        self.invalidate_cache("ItemSupplier")
 
     def update_item(self, item_id, updated_data):
         """Updates item details."""
@@ -83,35 +103,179 @@ class ItemHandler(DatabaseManager):
         """
         params = list(updated_data.values()) + [item_id]
         self.execute_command(query, params)
+        self.invalidate_cache("Item")
 
     def update_item_suppliers(self, item_id, supplier_ids):
         """Updates suppliers linked to an item."""
-        delete_query = "DELETE FROM ItemSupplier WHERE ItemID = %s"
-        self.execute_command(delete_query, (item_id,))
-        for supplier_id in supplier_ids:
-            insert_query = "INSERT INTO ItemSupplier (ItemID, SupplierID) VALUES (%s, %s)"
-            self.execute_command(insert_query, (item_id, supplier_id))
+        item_id = int(item_id)
+        with self.transaction() as tx:
+            tx.execute("DELETE FROM ItemSupplier WHERE ItemID = %s", (item_id,))
+            tx.bulk_insert(
+                "ItemSupplier", ["ItemID", "SupplierID"],
+                [(item_id, int(supplier_id)) for supplier_id in supplier_ids]
+            )
+        self.invalidate_cache("ItemSupplier")
+
+    # ✅ Bulk import
+    IMPORT_COLUMNS = [
+        "itemnameenglish", "itemnamekurdish", "classcat", "departmentcat", "sectioncat",
+        "familycat", "subfamilycat", "shelflife", "threshold", "averagerequired",
+        "origincountry", "manufacturer", "brand", "barcode", "unittype", "packaging"
+    ]
+
+    def import_items(self, df):
+        """
+        Set-based bulk import of a validated item sheet.
+
+        The whole sheet is COPYed into a temp staging table, supplier names and
+        duplicate item names are resolved with joins, and Item / ItemSupplier rows are
+        inserted with INSERT ... SELECT, all in one transaction.
+        Returns a per-row report: row, itemnameenglish, suppliername, status, reason, itemid.
+        """
+        item_cols = [col for col in self.IMPORT_COLUMNS if col in df.columns]
+        staging = df[item_cols + ["suppliername"]].astype(object)
+        staging = staging.where(staging.notna(), None)
+        # Row numbers as the user sees them in Excel (header is row 1)
+        rows = [
+            (int(row_number) + 2, *values)
+            for row_number, values in zip(df.index, staging.itertuples(index=False, name=None))
+        ]
+
+        col_list = ", ".join(item_cols)
+        with self.transaction() as tx:
+            tx.execute(f"""
+            CREATE TEMP TABLE item_import ON COMMIT DROP AS
+            SELECT NULL::integer AS rownum, {col_list},
+                   NULL::text AS suppliername, NULL::integer AS supplierid,
+                   NULL::integer AS itemid, NULL::text AS status, NULL::text AS reason
+            FROM Item
+            WITH NO DATA
+            """)
+            tx.bulk_insert("item_import", ["rownum"] + item_cols + ["suppliername"], rows, use_copy=True)
+
+            # Resolve suppliers and reject rows; only the first occurrence of a name in the file is kept
+            tx.execute("""
+            WITH checked AS (
+                SELECT st.rownum,
+                       LOWER(TRIM(st.itemnameenglish)) AS name_key,
+                       s.supplierid,
+                       CASE
+                           WHEN COALESCE(TRIM(st.itemnameenglish), '') = '' THEN 'Missing item name'
+                           WHEN EXISTS (
+                               SELECT 1 FROM Item i
+                               WHERE LOWER(TRIM(i.ItemNameEnglish)) = LOWER(TRIM(st.itemnameenglish))
+                           ) THEN 'Item already exists'
+                           WHEN s.supplierid IS NULL THEN 'Supplier not found'
+                       END AS reason
+                FROM item_import st
+                LEFT JOIN (
+                    SELECT LOWER(TRIM(SupplierName)) AS name_key, MIN(SupplierID) AS supplierid
+                    FROM Supplier
+                    GROUP BY LOWER(TRIM(SupplierName))
+                ) s ON s.name_key = LOWER(TRIM(st.suppliername))
+            ),
+            resolved AS (
+                SELECT rownum, supplierid,
+                       CASE
+                           WHEN reason IS NULL AND ROW_NUMBER() OVER (
+                               PARTITION BY name_key, reason IS NULL ORDER BY rownum
+                           ) > 1 THEN 'Duplicate name in file'
+                           ELSE reason
+                       END AS reason
+                FROM checked
+            )
+            UPDATE item_import st
+            SET supplierid = r.supplierid,
+                reason = r.reason,
+                status = CASE WHEN r.reason IS NULL THEN 'accepted' ELSE 'rejected' END
+            FROM resolved r
+            WHERE st.rownum = r.rownum
+            """)
+
+            select_cols = ", ".join(
+                "TRIM(itemnameenglish)" if col == "itemnameenglish" else col for col in item_cols
+            )
+            tx.execute(f"""
+            WITH inserted AS (
+                INSERT INTO Item ({col_list}, createdat, updatedat)
+                SELECT {select_cols}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                FROM item_import
+                WHERE status = 'accepted'
+                ORDER BY rownum
+                RETURNING itemid, itemnameenglish
+            )
+            UPDATE item_import st
+            SET itemid = inserted.itemid
+            FROM inserted
+            WHERE st.status = 'accepted' AND TRIM(st.itemnameenglish) = inserted.itemnameenglish
+            """)
+
+            tx.execute("""
+            INSERT INTO ItemSupplier (ItemID, SupplierID)
+            SELECT itemid, supplierid
+            FROM item_import
+            WHERE status = 'accepted' AND itemid IS NOT NULL
+            ON CONFLICT DO NOTHING
+            """)
+
+            report = tx.fetch_data("""
+            SELECT rownum AS row, itemnameenglish, suppliername, status, reason, itemid
+            FROM item_import
+            ORDER BY rownum
+            """)
+        self.invalidate_cache("Item", "ItemSupplier")
+        return report
 
     # ✅ Dropdown methods
-    def get_dropdown_values(self, section):
-        """Fetches values from dropdown categories."""
-        query = "SELECT value FROM Dropdowns WHERE section = %s"
-        df = self.fetch_data(query, (section,))
-        return df["value"].tolist() if not df.empty else []
-
-    def add_dropdown_value(self, section, value):
-        """Adds a new value to dropdown categories."""
-        query = """
-        INSERT INTO Dropdowns (section, value)
-        VALUES (%s, %s)
-        ON CONFLICT (section, value) DO NOTHING
+    def get_dropdown_catalog(self):
+        """Every dropdown section in one (cached) query, as a DropdownCatalog."""
+        df = self.cached_fetch(["Dropdowns"], """
+        SELECT section, value, ParentValue AS parentvalue
+        FROM Dropdowns
+        ORDER BY section, value
+        """)
+        return DropdownCatalog(df.itertuples(index=False, name=None) if not df.empty else [])
+
+    def get_dropdown_values(self, section, parent=None):
+        """Values of one dropdown section (optionally under a parent category value)."""
+        return self.get_dropdown_catalog().values(section, parent)
+
+    def add_dropdown_values(self, section, values, parent=None):
         """
-        self.execute_command(query, (section, value))
+        Add several values to a section in one statement, linked to `parent` (a value of
+        the section above) if given. Returns the values that were new.
+        """
+        values = list(dict.fromkeys(values))
+        if not values:
+            return []
+        with self.transaction() as tx:
+            df = tx.fetch_data("""
+            INSERT INTO Dropdowns (section, value, ParentValue)
+            SELECT %s, v, %s FROM unnest(%s::text[]) AS v
+            ON CONFLICT (section, value) DO NOTHING
+            RETURNING value
+            """, (section, parent or None, values))
+        self.invalidate_cache("Dropdowns")
+        added = set(df["value"]) if not df.empty else set()
+        return [value for value in values if value in added]
 
-    def delete_dropdown_value(self, section, value):
-        """Deletes a value from dropdown categories."""
-        query = "DELETE FROM Dropdowns WHERE section = %s AND value = %s"
-        self.execute_command(query, (section, value))
+    def delete_dropdown_values(self, section, values):
+        """
+        Delete several values of a section in one statement; their children in the
+        section below are unlinked (offered under every parent) rather than orphaned.
+        """
+        values = list(values)
+        if not values:
+            return
+        child_section = DropdownCatalog.child_section(section)
+        with self.transaction() as tx:
+            tx.execute("DELETE FROM Dropdowns WHERE section = %s AND value = ANY(%s)", (section, values))
+            if child_section:
+                tx.execute(
+                    "UPDATE Dropdowns SET ParentValue = NULL WHERE section = %s AND ParentValue = ANY(%s)",
+                    (child_section, values)
+                )
+        self.invalidate_cache("Dropdowns")
 
     # ✅ Methods for "Add Pictures" Tab
     def get_items_without_pictures(self):
@@ -119,15 +283,20 @@ class ItemHandler(DatabaseManager):
         query = """
         SELECT ItemID, ItemNameEnglish
         FROM Item
-        WHERE ItemPicture IS NULL OR length(ItemPicture) = 0
+        WHERE ImageHash IS NULL
         """
         return self.fetch_data(query)
 
     def update_item_picture(self, item_id, picture_data):
-        """Update item picture in database."""
-        query = """
-        UPDATE Item
-        SET ItemPicture = %s, UpdatedAt = CURRENT_TIMESTAMP
-        WHERE ItemID = %s
-        """
-        self.execute_command(query, (picture_data, item_id))
+        """Store the picture in the image store and point the item at it."""
+        with self.transaction() as tx:
+            digest = self.image_handler.store_image(tx, picture_data)
+            tx.execute("""
+            UPDATE Item
+            SET ImageHash = %s, UpdatedAt = CURRENT_TIMESTAMP
+            WHERE ItemID = %s
+            """, (digest, int(item_id)))
+
+    def get_item_pictures(self, image_hashes, rendition="full"):
+        """Batch-load picture bytes for the given image hashes. Returns {hash: bytes}."""
+        return self.image_handler.get_images(image_hashes, rendition)
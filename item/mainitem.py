@@ -1,4 +1,5 @@
 import streamlit as st
+from navigation import lazy_tabs
 from item.add_item import add_item_tab
 from item.bulk_add import bulk_add_tab
 from item.edit_item import edit_item_tab
@@ -9,22 +10,11 @@ def item_page():
     """Page for managing inventory items."""
     st.title("📦 Item Management")
 
-    # ✅ Define tabs for item management
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "➕ Add Item", "📂 Bulk Add", "✏️ Edit Item", "📸 Add Pictures", "📋 Manage Dropdowns"
-    ])
-
-    with tab1:
-        add_item_tab()  # ✅ Handles adding new items
-
-    with tab2:
-        bulk_add_tab()  # ✅ Handles bulk item upload via Excel
-
-    with tab3:
-        edit_item_tab()  # ✅ Handles editing existing items
-
-    with tab4:
-        add_pictures_tab()  # ✅ New Add Pictures tab
-
-    with tab5:
-        manage_dropdowns_tab()  # ✅ Handles dropdown management
+    # ✅ Define tabs for item management (only the selected one runs)
+    lazy_tabs({
+        "➕ Add Item": add_item_tab,  # ✅ Handles adding new items
+        "📂 Bulk Add": bulk_add_tab,  # ✅ Handles bulk item upload via Excel
+        "✏️ Edit Item": edit_item_tab,  # ✅ Handles editing existing items
+        "📸 Add Pictures": add_pictures_tab,  # ✅ New Add Pictures tab
+        "📋 Manage Dropdowns": manage_dropdowns_tab  # ✅ Handles dropdown management
+    }, key="item_tab")
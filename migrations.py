@@ -0,0 +1,491 @@
+"""
+Versioned schema migrations.
+
+Each migration runs once, in its own transaction, and is recorded in SchemaMigrations.
+Migrations listed in CONCURRENT instead run statement by statement outside a transaction,
+so their indexes are built with CREATE INDEX CONCURRENTLY without blocking writes.
+An advisory lock serialises concurrent runners, and every statement is written to be
+re-runnable, so a half-known database converges.
+
+Applying migrations is a deploy step. The app only checks that the schema is current at
+start-up and refuses to run otherwise, unless `auto_migrate = true` is set under [neon].
+
+    python migrations.py            # apply pending migrations
+    python migrations.py --status   # list applied / pending versions
+"""
+import re
+import sys
+import hashlib
+import logging
+import threading
+
+from db_handler import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for pg_advisory_(xact_)lock, shared by every runner
+MIGRATION_LOCK_ID = 7_311_004
+
+MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS SchemaMigrations (
+    Version INTEGER PRIMARY KEY,
+    Name TEXT NOT NULL,
+    Checksum TEXT NOT NULL,
+    AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Tables the handlers expect, as created before migrations existed
+BASELINE = """
+CREATE TABLE IF NOT EXISTS Supplier (
+    SupplierID SERIAL PRIMARY KEY,
+    SupplierName TEXT NOT NULL,
+    ContactName TEXT,
+    ContactPhone TEXT,
+    ContactEmail TEXT,
+    Address TEXT
+);
+
+CREATE TABLE IF NOT EXISTS Item (
+    ItemID SERIAL PRIMARY KEY,
+    ItemNameEnglish TEXT NOT NULL,
+    ItemNameKurdish TEXT,
+    ClassCat TEXT,
+    DepartmentCat TEXT,
+    SectionCat TEXT,
+    FamilyCat TEXT,
+    SubFamilyCat TEXT,
+    ShelfLife INTEGER,
+    Threshold INTEGER,
+    AverageRequired INTEGER,
+    OriginCountry TEXT,
+    Manufacturer TEXT,
+    Brand TEXT,
+    Barcode TEXT,
+    UnitType TEXT,
+    Packaging TEXT,
+    ItemPicture BYTEA,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS ItemSupplier (
+    ItemID INTEGER NOT NULL REFERENCES Item (ItemID) ON DELETE CASCADE,
+    SupplierID INTEGER NOT NULL REFERENCES Supplier (SupplierID) ON DELETE CASCADE,
+    PRIMARY KEY (ItemID, SupplierID)
+);
+
+CREATE TABLE IF NOT EXISTS Inventory (
+    InventoryID SERIAL PRIMARY KEY,
+    ItemID INTEGER NOT NULL REFERENCES Item (ItemID) ON DELETE CASCADE,
+    Quantity INTEGER NOT NULL DEFAULT 0,
+    ExpirationDate DATE,
+    StorageLocation TEXT,
+    DateReceived DATE DEFAULT CURRENT_DATE
+);
+
+CREATE TABLE IF NOT EXISTS PurchaseOrders (
+    POID SERIAL PRIMARY KEY,
+    SupplierID INTEGER REFERENCES Supplier (SupplierID),
+    OrderDate TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    ExpectedDelivery TIMESTAMP,
+    Status TEXT DEFAULT 'Pending',
+    RespondedAt TIMESTAMP,
+    ActualDelivery TIMESTAMP,
+    CreatedBy TEXT,
+    SupProposedDeliver TIMESTAMP,
+    ProposedStatus TEXT,
+    OriginalPOID INTEGER REFERENCES PurchaseOrders (POID),
+    SupplierNote TEXT
+);
+
+CREATE TABLE IF NOT EXISTS PurchaseOrderItems (
+    POID INTEGER NOT NULL REFERENCES PurchaseOrders (POID) ON DELETE CASCADE,
+    ItemID INTEGER NOT NULL REFERENCES Item (ItemID),
+    OrderedQuantity INTEGER NOT NULL,
+    EstimatedPrice NUMERIC(12, 2),
+    ReceivedQuantity INTEGER DEFAULT 0,
+    SupProposedQuantity INTEGER,
+    SupProposedPrice NUMERIC(12, 2),
+    PRIMARY KEY (POID, ItemID)
+);
+
+CREATE TABLE IF NOT EXISTS Dropdowns (
+    section TEXT NOT NULL,
+    value TEXT NOT NULL,
+    UNIQUE (section, value)
+);
+
+CREATE TABLE IF NOT EXISTS Users (
+    UserID SERIAL PRIMARY KEY,
+    Name TEXT,
+    Email TEXT UNIQUE NOT NULL,
+    Role TEXT DEFAULT 'User',
+    CanAccessHome BOOLEAN DEFAULT TRUE,
+    CanAccessItems BOOLEAN DEFAULT FALSE,
+    CanAccessReceive BOOLEAN DEFAULT FALSE,
+    CanAccessPO BOOLEAN DEFAULT FALSE,
+    CanAccessReports BOOLEAN DEFAULT FALSE
+);
+"""
+
+# Content-addressed image store; pictures stored inline on Item are moved into it
+IMAGE_STORE = """
+CREATE TABLE IF NOT EXISTS ItemImage (
+    ImageHash TEXT PRIMARY KEY,
+    ImageData BYTEA NOT NULL,
+    ByteSize INTEGER NOT NULL,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE Item ADD COLUMN IF NOT EXISTS ImageHash TEXT REFERENCES ItemImage (ImageHash);
+
+-- NULL until the stored image has been normalised and its renditions generated
+ALTER TABLE ItemImage ADD COLUMN IF NOT EXISTS NormalizedAt TIMESTAMP;
+
+CREATE TABLE IF NOT EXISTS ItemImageRendition (
+    ImageHash TEXT NOT NULL REFERENCES ItemImage (ImageHash) ON DELETE CASCADE,
+    Rendition TEXT NOT NULL,
+    ImageData BYTEA NOT NULL,
+    Width INTEGER NOT NULL,
+    Height INTEGER NOT NULL,
+    ByteSize INTEGER NOT NULL,
+    PRIMARY KEY (ImageHash, Rendition)
+);
+
+-- Move any pictures still stored inline on Item into the image store
+INSERT INTO ItemImage (ImageHash, ImageData, ByteSize)
+SELECT DISTINCT ON (hash) hash, ItemPicture, length(ItemPicture)
+FROM (
+    SELECT encode(sha256(ItemPicture), 'hex') AS hash, ItemPicture
+    FROM Item
+    WHERE ItemPicture IS NOT NULL AND length(ItemPicture) > 0
+) pictures
+ON CONFLICT (ImageHash) DO NOTHING;
+
+UPDATE Item
+SET ImageHash = encode(sha256(ItemPicture), 'hex'), ItemPicture = NULL
+WHERE ItemPicture IS NOT NULL AND length(ItemPicture) > 0;
+"""
+
+# Per-item stock levels kept current by statement-level triggers on Item and Inventory,
+# so reorder decisions read O(result) rows instead of summing every inventory lot.
+STOCK_LEVELS = """
+CREATE TABLE IF NOT EXISTS ItemStock (
+    ItemID INTEGER PRIMARY KEY REFERENCES Item (ItemID) ON DELETE CASCADE,
+    Quantity BIGINT NOT NULL DEFAULT 0,
+    LotCount INTEGER NOT NULL DEFAULT 0,
+    Threshold INTEGER,
+    AverageRequired INTEGER,
+    Shortfall BIGINT GENERATED ALWAYS AS (COALESCE(AverageRequired, 0) - Quantity) STORED,
+    UpdatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_itemstock_below_threshold
+    ON ItemStock (ItemID) WHERE Quantity < Threshold;
+
+CREATE OR REPLACE FUNCTION itemstock_apply_inventory() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE ItemStock s
+        SET Quantity = s.Quantity - d.qty, LotCount = s.LotCount - d.lots, UpdatedAt = CURRENT_TIMESTAMP
+        FROM (
+            SELECT ItemID, SUM(COALESCE(Quantity, 0)) AS qty, COUNT(*) AS lots
+            FROM old_rows GROUP BY ItemID
+        ) d
+        WHERE s.ItemID = d.ItemID;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO ItemStock (ItemID, Quantity, LotCount, Threshold, AverageRequired)
+        SELECT d.ItemID, d.qty, d.lots, i.Threshold, i.AverageRequired
+        FROM (
+            SELECT ItemID, SUM(COALESCE(Quantity, 0)) AS qty, COUNT(*) AS lots
+            FROM new_rows GROUP BY ItemID
+        ) d
+        JOIN Item i ON i.ItemID = d.ItemID
+        ON CONFLICT (ItemID) DO UPDATE
+        SET Quantity = ItemStock.Quantity + EXCLUDED.Quantity,
+            LotCount = ItemStock.LotCount + EXCLUDED.LotCount,
+            UpdatedAt = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION itemstock_apply_item() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO ItemStock (ItemID, Threshold, AverageRequired)
+    SELECT ItemID, Threshold, AverageRequired FROM new_rows
+    ON CONFLICT (ItemID) DO UPDATE
+    SET Threshold = EXCLUDED.Threshold,
+        AverageRequired = EXCLUDED.AverageRequired,
+        UpdatedAt = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_itemstock_inventory_insert ON Inventory;
+CREATE TRIGGER trg_itemstock_inventory_insert AFTER INSERT ON Inventory
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION itemstock_apply_inventory();
+
+DROP TRIGGER IF EXISTS trg_itemstock_inventory_update ON Inventory;
+CREATE TRIGGER trg_itemstock_inventory_update AFTER UPDATE ON Inventory
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION itemstock_apply_inventory();
+
+DROP TRIGGER IF EXISTS trg_itemstock_inventory_delete ON Inventory;
+CREATE TRIGGER trg_itemstock_inventory_delete AFTER DELETE ON Inventory
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION itemstock_apply_inventory();
+
+DROP TRIGGER IF EXISTS trg_itemstock_item_insert ON Item;
+CREATE TRIGGER trg_itemstock_item_insert AFTER INSERT ON Item
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION itemstock_apply_item();
+
+DROP TRIGGER IF EXISTS trg_itemstock_item_update ON Item;
+CREATE TRIGGER trg_itemstock_item_update AFTER UPDATE ON Item
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION itemstock_apply_item();
+DELETE FROM ItemStock;
+INSERT INTO ItemStock (ItemID, Quantity, LotCount, Threshold, AverageRequired)
+SELECT i.ItemID,
+       COALESCE(SUM(inv.Quantity), 0),
+       COUNT(inv.ItemID),
+       i.Threshold,
+       i.AverageRequired
+FROM Item i
+LEFT JOIN Inventory inv ON inv.ItemID = i.ItemID
+GROUP BY i.ItemID, i.Threshold, i.AverageRequired;
+"""
+
+# Indexes for the hot predicates of the handlers' queries; built concurrently (see CONCURRENT)
+PERFORMANCE_INDEXES = """
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_itemid ON Inventory (ItemID);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_expirationdate ON Inventory (ExpirationDate);
+-- Lots that still hold stock (location / near-expiry views skip empty lots)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_in_stock ON Inventory (ItemID, ExpirationDate) WHERE Quantity > 0;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorders_status ON PurchaseOrders (Status);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorders_supplierid ON PurchaseOrders (SupplierID);
+-- Track PO: every order that is neither completed nor declined, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorders_open ON PurchaseOrders (OrderDate DESC)
+    WHERE Status NOT IN ('Completed', 'Declined');
+-- Proposed PO: the handful of orders awaiting a decision on a supplier proposal
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorders_proposed ON PurchaseOrders (ProposedStatus)
+    WHERE ProposedStatus = 'Proposed';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorderitems_poid ON PurchaseOrderItems (POID);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_purchaseorderitems_itemid ON PurchaseOrderItems (ItemID);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_itemsupplier_itemid ON ItemSupplier (ItemID);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email ON Users (Email);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_dropdowns_section ON Dropdowns (section);
+
+-- Case-insensitive name matching used by the bulk import
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_item_name_lower ON Item (LOWER(TRIM(ItemNameEnglish)));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_supplier_name_lower ON Supplier (LOWER(TRIM(SupplierName)));
+
+ANALYZE Inventory;
+ANALYZE PurchaseOrders;
+ANALYZE PurchaseOrderItems;
+"""
+
+# Optional parent links between category dropdown values (ClassCat → ... → SubFamilyCat),
+# backfilled from the most common parent each value has among existing items
+DROPDOWN_HIERARCHY = """
+ALTER TABLE Dropdowns ADD COLUMN IF NOT EXISTS ParentValue TEXT;
+
+UPDATE Dropdowns d
+SET ParentValue = links.parent
+FROM (
+    SELECT DISTINCT ON (section, value) section, value, parent
+    FROM (
+        SELECT 'DepartmentCat' AS section, DepartmentCat AS value, ClassCat AS parent, COUNT(*) AS uses
+        FROM Item GROUP BY DepartmentCat, ClassCat
+        UNION ALL
+        SELECT 'SectionCat', SectionCat, DepartmentCat, COUNT(*)
+        FROM Item GROUP BY SectionCat, DepartmentCat
+        UNION ALL
+        SELECT 'FamilyCat', FamilyCat, SectionCat, COUNT(*)
+        FROM Item GROUP BY FamilyCat, SectionCat
+        UNION ALL
+        SELECT 'SubFamilyCat', SubFamilyCat, FamilyCat, COUNT(*)
+        FROM Item GROUP BY SubFamilyCat, FamilyCat
+    ) paths
+    WHERE value IS NOT NULL AND parent IS NOT NULL
+    ORDER BY section, value, uses DESC, parent
+) links
+WHERE d.section = links.section AND d.value = links.value AND d.ParentValue IS NULL;
+"""
+
+# ON CONFLICT (section, value) needs a unique index on exactly those columns. The baseline
+# declares one, but databases created before migrations existed may lack it: drop duplicate
+# rows (keeping one that names a parent) and add it
+DROPDOWN_UNIQUE = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        WHERE i.indrelid = 'dropdowns'::regclass AND i.indisunique AND i.indpred IS NULL
+          AND (
+              SELECT array_agg(a.attname::text ORDER BY a.attname)
+              FROM unnest(i.indkey) AS k(attnum)
+              JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+          ) = ARRAY['section', 'value']
+    ) THEN
+        DELETE FROM Dropdowns d
+        USING (
+            SELECT ctid, ROW_NUMBER() OVER (
+                PARTITION BY section, value ORDER BY ParentValue IS NULL, ctid
+            ) AS n
+            FROM Dropdowns
+        ) dup
+        WHERE d.ctid = dup.ctid AND dup.n > 1;
+
+        CREATE UNIQUE INDEX dropdowns_section_value_key ON Dropdowns (section, value);
+    END IF;
+END
+$$;
+"""
+
+# (version, name, SQL) in the order they are applied; never edit an applied entry, add a new one
+MIGRATIONS = [
+    (1, "baseline", BASELINE),
+    (2, "image_store", IMAGE_STORE),
+    (3, "stock_levels", STOCK_LEVELS),
+    (4, "performance_indexes", PERFORMANCE_INDEXES),
+    (5, "dropdown_hierarchy", DROPDOWN_HIERARCHY),
+    (6, "dropdown_unique", DROPDOWN_UNIQUE),
+]
+
+# Versions run outside a transaction, one statement at a time (CREATE INDEX CONCURRENTLY)
+CONCURRENT = {4}
+
+_current_dsns = set()
+_current_lock = threading.Lock()
+
+
+def checksum(sql_text):
+    return hashlib.sha256(sql_text.encode()).hexdigest()
+
+
+def applied_versions(db, create=True):
+    """{version: checksum} of the migrations recorded in the database."""
+    if create:
+        db.execute_command(MIGRATIONS_TABLE)
+    elif not db.fetch_data("SELECT to_regclass('schemamigrations') IS NOT NULL AS present")["present"].iloc[0]:
+        return {}
+    df = db.fetch_data("SELECT Version, Checksum FROM SchemaMigrations")
+    return dict(zip(df["version"], df["checksum"])) if not df.empty else {}
+
+
+def migrate(db=None, target=None):
+    """Apply every pending migration up to `target` (default: all); returns the applied versions."""
+    db = db or DatabaseManager()
+    applied = applied_versions(db)
+    done = []
+    for version, name, sql_text in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        if version in applied:
+            if applied[version] != checksum(sql_text):
+                logger.warning("Migration %s (%s) changed after it was applied", version, name)
+            continue
+        if version in CONCURRENT:
+            if apply_concurrently(db, version, name, sql_text):
+                logger.info("Applied migration %s (%s)", version, name)
+                done.append(version)
+            continue
+        with db.transaction() as tx:
+            tx.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            # Another process may have applied it while we waited for the lock
+            if not tx.fetch_data("SELECT 1 FROM SchemaMigrations WHERE Version = %s", (version,)).empty:
+                continue
+            tx.execute(sql_text)
+            tx.execute(
+                "INSERT INTO SchemaMigrations (Version, Name, Checksum) VALUES (%s, %s, %s)",
+                (version, name, checksum(sql_text))
+            )
+        logger.info("Applied migration %s (%s)", version, name)
+        done.append(version)
+    return done
+
+
+def statements(sql_text):
+    """Split a migration into its statements (none of ours contain a `;` mid-line)."""
+    return [statement.strip() for statement in sql_text.split(";\n") if statement.strip()]
+
+
+def apply_concurrently(db, version, name, sql_text):
+    """
+    Run a CONCURRENT migration on one autocommit connection under the session advisory lock.
+    A concurrent build that failed earlier leaves an invalid index behind, which IF NOT EXISTS
+    would keep; those are dropped first. Returns False when another runner applied it.
+    """
+    indexes = re.findall(r"CREATE INDEX CONCURRENTLY IF NOT EXISTS (\w+)", sql_text)
+    with db.pooled_connection() as conn:
+        if conn is None:
+            raise RuntimeError("No database connection available")
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            try:
+                cur.execute("SELECT 1 FROM SchemaMigrations WHERE Version = %s", (version,))
+                if cur.fetchone():
+                    return False
+                cur.execute(
+                    """
+                    SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE NOT i.indisvalid AND c.relname = ANY(%s)
+                    """,
+                    ([index.lower() for index in indexes],)
+                )
+                for (invalid,) in cur.fetchall():
+                    cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {invalid}")
+                for statement in statements(sql_text):
+                    cur.execute(statement)
+                cur.execute(
+                    "INSERT INTO SchemaMigrations (Version, Name, Checksum) VALUES (%s, %s, %s)",
+                    (version, name, checksum(sql_text))
+                )
+            finally:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+    return True
+
+
+def pending_migrations(db=None):
+    """(version, name) of the migrations not yet recorded; read-only."""
+    db = db or DatabaseManager()
+    applied = applied_versions(db, create=False)
+    return [(version, name) for version, name, _ in MIGRATIONS if version not in applied]
+
+
+def check_schema(db=None, auto_apply=False):
+    """
+    Pending migrations for the app's database, empty once the schema is current. With
+    `auto_apply` they are applied first. A current schema is remembered per process.
+    """
+    db = db or DatabaseManager()
+    with _current_lock:
+        if db.dsn in _current_dsns:
+            return []
+    pending = pending_migrations(db)
+    if pending and auto_apply:
+        migrate(db)
+        pending = pending_migrations(db)
+    if not pending:
+        with _current_lock:
+            _current_dsns.add(db.dsn)
+    return pending
+
+
+if __name__ == "__main__":
+    db = DatabaseManager()
+    if "--status" in sys.argv:
+        applied = applied_versions(db)
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>4}  {name:<24} {'applied' if version in applied else 'pending'}")
+    else:
+        versions = migrate(db)
+        print(f"Applied {len(versions)} migration(s): {versions}" if versions else "Schema is up to date.")
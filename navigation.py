@@ -0,0 +1,15 @@
+import streamlit as st
+from tracing import span
+
+def lazy_tabs(views, key):
+    """
+    Tab-like navigation that only runs the selected view.
+
+    `st.tabs` executes every tab body on each rerun; here `views` maps a label to a
+    function and just the chosen one is called, so unselected views cost no queries.
+    """
+    labels = list(views.keys())
+    selected = st.radio(key, labels, horizontal=True, label_visibility="collapsed", key=key)
+    selected = selected or labels[0]
+    with span(f"tab:{selected}"):
+        views[selected]()
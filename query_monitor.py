@@ -0,0 +1,227 @@
+import re
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from tracing import span
+
+logger = logging.getLogger("amas.queries")
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(query):
+    """Normalise SQL so statements that differ only in literals/parameters aggregate together."""
+    text = _COMMENTS.sub(" ", query)
+    text = _STRINGS.sub("?", text)
+    text = text.replace("%s", "?")
+    text = _NUMBERS.sub("?", text)
+    text = _PLACEHOLDER_LISTS.sub("(?)", text)
+    return _WHITESPACE.sub(" ", text).strip().rstrip(";")
+
+
+def approx_bytes(rows, sample_size=50):
+    """Rough size of a result set, extrapolated from the first `sample_size` rows."""
+    if not rows:
+        return 0
+    sample = rows[:sample_size]
+    sampled = 0
+    for row in sample:
+        for value in row:
+            if isinstance(value, (bytes, memoryview, str)):
+                sampled += len(value)
+            elif value is not None:
+                sampled += 8
+    return int(sampled * len(rows) / len(sample))
+
+
+def _short_params(params, limit=1000):
+    """Parameters as text for logs: byte strings are summarised, long values truncated."""
+    if params is None:
+        return None
+    values = params.values() if isinstance(params, dict) else params
+    shown = [
+        f"<{len(v)} bytes>" if isinstance(v, (bytes, memoryview)) else v
+        for v in values
+    ]
+    text = repr(shown)
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class QueryProbe:
+    """Filled in by the caller while a statement runs (row count, result size)."""
+
+    def __init__(self):
+        self.rows = 0
+        self.nbytes = 0
+
+    def set_result(self, rows):
+        self.rows = len(rows)
+        self.nbytes = approx_bytes(rows)
+
+
+class QueryMonitor:
+    """
+    In-process statement statistics: every statement is recorded under its SQL
+    fingerprint and the page it ran on, aggregated (count, p50/p95/max) and emitted
+    as a JSON log line on the "amas.queries" logger. Slow statements are logged at
+    WARNING with their parameters and, optionally, an EXPLAIN plan.
+    """
+
+    def __init__(self, slow_ms=500.0, explain_slow=False, samples_per_query=512, slow_log_size=100):
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self.samples_per_query = samples_per_query
+        self._lock = threading.Lock()
+        self._stats = {}  # (page, fingerprint) -> aggregate dict
+        self._slow = deque(maxlen=slow_log_size)
+        self._local = threading.local()
+
+    # ─────────── Per-thread context ───────────
+    def set_page(self, page):
+        """Tag statements issued by this thread with the page being rendered."""
+        self._local.page = page
+
+    @property
+    def current_page(self):
+        return getattr(self._local, "page", None) or "(none)"
+
+    def note_acquire(self, seconds):
+        """Remember how long this thread waited for its connection."""
+        self._local.acquire = seconds
+
+    def take_acquire(self):
+        """Pop the connection wait noted for this thread (0.0 if none)."""
+        seconds = getattr(self._local, "acquire", 0.0)
+        self._local.acquire = 0.0
+        return seconds
+
+    # ─────────── Recording ───────────
+    @contextmanager
+    def track(self, query, params=None, explain_conn=None):
+        """
+        Time one statement. The caller fills the yielded probe; `explain_conn`
+        (an autocommit connection) is used for EXPLAIN when the statement is slow.
+        """
+        probe = QueryProbe()
+        acquire = self.take_acquire()
+        fp = fingerprint(query)
+        start = time.perf_counter()
+        error = None
+        try:
+            with span("sql", query=fp[:200]) as record:
+                yield probe
+                if record is not None:
+                    record["rows"] = probe.rows
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            plan = None
+            if (error is None and explain_conn is not None and self.explain_slow
+                    and elapsed * 1000 >= self.slow_ms):
+                plan = self._explain(explain_conn, query, params)
+            self.record(query, elapsed, acquire, probe.rows, probe.nbytes, params, error, plan, fp)
+
+    @staticmethod
+    def _explain(conn, query, params):
+        try:
+            with conn.cursor() as cur:
+                cur.execute("EXPLAIN " + query, params or ())
+                return "\n".join(row[0] for row in cur.fetchall())
+        except Exception as e:
+            return f"EXPLAIN failed: {e}"
+
+    def record(self, query, seconds, acquire_seconds=0.0, rows=0, nbytes=0, params=None,
+               error=None, plan=None, fp=None):
+        """Add one statement execution to the aggregates and the log stream."""
+        page = self.current_page
+        key = (page, fp or fingerprint(query))
+        slow = seconds * 1000 >= self.slow_ms
+
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = {
+                    "count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                    "acquire_seconds": 0.0, "rows": 0, "bytes": 0, "slow": 0,
+                    "samples": deque(maxlen=self.samples_per_query),
+                }
+            entry["count"] += 1
+            entry["errors"] += 1 if error else 0
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["acquire_seconds"] += acquire_seconds
+            entry["rows"] += rows
+            entry["bytes"] += nbytes
+            entry["slow"] += 1 if slow else 0
+            entry["samples"].append(seconds)
+
+        event = {
+            "ts": time.time(),
+            "page": page,
+            "fingerprint": key[1],
+            "ms": round(seconds * 1000, 3),
+            "acquire_ms": round(acquire_seconds * 1000, 3),
+            "rows": rows,
+            "bytes": nbytes,
+        }
+        if error:
+            event["error"] = error
+        if slow:
+            event["params"] = _short_params(params)
+            if plan:
+                event["plan"] = plan
+            with self._lock:
+                self._slow.append(event)
+            logger.warning(json.dumps(event, default=str))
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(event, default=str))
+
+    # ─────────── Reporting ───────────
+    def summary(self):
+        """One row per (page, fingerprint) with count, p50/p95/max and totals (milliseconds)."""
+        with self._lock:
+            items = [(key, dict(entry, samples=sorted(entry["samples"]))) for key, entry in self._stats.items()]
+        rows = []
+        for (page, fp), entry in items:
+            rows.append({
+                "page": page,
+                "query": fp,
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "slow": entry["slow"],
+                "p50_ms": round(_percentile(entry["samples"], 0.50) * 1000, 2),
+                "p95_ms": round(_percentile(entry["samples"], 0.95) * 1000, 2),
+                "max_ms": round(entry["max_seconds"] * 1000, 2),
+                "total_ms": round(entry["total_seconds"] * 1000, 2),
+                "avg_acquire_ms": round(entry["acquire_seconds"] / entry["count"] * 1000, 2),
+                "avg_rows": round(entry["rows"] / entry["count"], 1),
+                "avg_bytes": int(entry["bytes"] / entry["count"]),
+            })
+        return rows
+
+    def slow_queries(self):
+        """Most recent slow statements, newest first."""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
@@ -15,7 +15,7 @@ def item_location_tab():
         return
 
     # ✅ **Fix: Identify missing store locations properly (Empty OR Null)**
-    items_df["storelocation"] = items_df["storelocation"].replace("", pd.NA)  # Convert empty strings to NaN
+    items_df["storelocation"] = items_df["storelocation"].where(items_df["storelocation"] != "")  # Convert empty strings to NaN
     missing_location_df = items_df[items_df["storelocation"].isna()]  # Detect missing locations
 
     # ✅ Section 1: Items Without Store Location
@@ -38,13 +38,15 @@ def item_location_tab():
             if st.button("Assign Location"):
                 if location_input:
                     for item_name in selected_items:
-                        item_id = int(missing_location_df.loc[
-                            missing_location_df["itemnameenglish"] == item_name, "itemid"
-                        ].values[0])  # ✅ Convert to standard Python int
-                        
-                        expiration_date = missing_location_df.loc[
-                            missing_location_df["itemnameenglish"] == item_name, "expirationdate"
-                        ].values[0]
+                        item_row = missing_location_df.loc[
+                            missing_location_df["itemnameenglish"] == item_name
+                        ].iloc[0]
+                        item_id = int(item_row["itemid"])  # ✅ Convert to standard Python int
+                        # ✅ datetime.date for psycopg2, whether the column is typed or not
+                        expiration_date = (
+                            pd.Timestamp(item_row["expirationdate"]).date()
+                            if pd.notna(item_row["expirationdate"]) else None
+                        )
 
                         receive_handler.update_item_location_specific(item_id, expiration_date, location_input)
                     
@@ -70,9 +72,7 @@ def item_location_tab():
     item_expirations_df = existing_location_df[existing_location_df["itemid"] == selected_item_id].copy()
 
     # ✅ Ensure ExpirationDate is formatted as YYYY-MM-DD
-    item_expirations_df["expirationdate"] = pd.to_datetime(
-        item_expirations_df["expirationdate"], errors='coerce'
-    ).dt.strftime('%Y-%m-%d')
+    item_expirations_df["expirationdate"] = pd.to_datetime(item_expirations_df["expirationdate"]).dt.strftime('%Y-%m-%d')
 
     # ✅ Display current locations and expiration dates clearly
     st.write(f"**Current locations for '{selected_item_name}':**")
@@ -1,4 +1,5 @@
 import streamlit as st
+from navigation import lazy_tabs
 from receive_items.receive_items import receive_items
 from receive_items.received_po import received_po_tab
 from receive_items.item_location import item_location_tab  # ✅ Correct import
@@ -6,14 +7,9 @@ from receive_items.item_location import item_location_tab  # ✅ Correct import
 def main_receive_page():
     st.title("📦 Receive Items Management")
 
-    # ✅ Add "Item Locations" to the tab list
-    tabs = st.tabs(["Manual Receive", "Received PO", "Item Locations"])
-
-    with tabs[0]:
-        receive_items()
-
-    with tabs[1]:
-        received_po_tab()
-
-    with tabs[2]:  # ✅ Corrected index
-        item_location_tab()
+    # ✅ Only the selected tab's queries run
+    lazy_tabs({
+        "Manual Receive": receive_items,
+        "Received PO": received_po_tab,
+        "Item Locations": item_location_tab
+    }, key="receive_tab")
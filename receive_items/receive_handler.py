@@ -1,5 +1,7 @@
 from db_handler import DatabaseManager
+from tracing import trace_methods
 
+@trace_methods
 class ReceiveHandler(DatabaseManager):
     """Handles database interactions for receiving items and item locations."""
 
@@ -23,19 +25,50 @@ class ReceiveHandler(DatabaseManager):
         """
         return self.fetch_data(query, (poid,))
 
+    # DateReceived is filled in by the database, like the original single-row INSERT
+    INVENTORY_COLUMNS = ["ItemID", "Quantity", "ExpirationDate", "StorageLocation", "DateReceived"]
+    INVENTORY_TEMPLATE = "(%s, %s, %s, %s, CURRENT_DATE)"
+
+    def _inventory_rows(self, inventory_items):
+        return [
+            (
+                int(item["item_id"]),
+                int(item["quantity"]),
+                item["expiration_date"],
+                item["storage_location"]
+            )
+            for item in inventory_items
+        ]
+
     def add_items_to_inventory(self, inventory_items):
         """Insert received items into Inventory."""
-        query = """
-        INSERT INTO Inventory (ItemID, Quantity, ExpirationDate, StorageLocation, DateReceived)
-        VALUES (%s, %s, %s, %s, CURRENT_DATE)
+        self.bulk_insert(
+            "Inventory", self.INVENTORY_COLUMNS, self._inventory_rows(inventory_items),
+            template=self.INVENTORY_TEMPLATE
+        )
+        self.invalidate_cache("Inventory")
+
+    def receive_po(self, poid, inventory_items):
         """
-        for item in inventory_items:
-            self.execute_command(query, (
-                item["item_id"],
-                item["quantity"],
-                item["expiration_date"],
-                item["storage_location"]
-            ))
+        Record received quantities, add the items to Inventory and mark the PO
+        completed, all in one transaction.
+        """
+        poid = int(poid)
+        with self.transaction() as tx:
+            tx.bulk_update("PurchaseOrderItems", ["POID", "ItemID"], [
+                {"POID": poid, "ItemID": int(item["item_id"]), "ReceivedQuantity": int(item["quantity"])}
+                for item in inventory_items
+            ])
+            tx.bulk_insert(
+                "Inventory", self.INVENTORY_COLUMNS, self._inventory_rows(inventory_items),
+                template=self.INVENTORY_TEMPLATE
+            )
+            tx.execute("""
+            UPDATE PurchaseOrders
+            SET Status = 'Completed'
+            WHERE POID = %s
+            """, (poid,))
+        self.invalidate_cache("Inventory")
 
     def mark_po_completed(self, poid):
         """Update PO status to Completed after items added to inventory."""
@@ -70,7 +103,7 @@ class ReceiveHandler(DatabaseManager):
         GROUP BY i.ItemID, i.ItemNameEnglish, i.Barcode, inv.StorageLocation, inv.ExpirationDate
         HAVING SUM(inv.Quantity) > 0
         """
-        return self.fetch_data(query)
+        return self.fetch_data(query, schema={"storelocation": "category", "expirationdate": "date"})
 
     def get_items_without_location(self):
         """Fetch items currently in inventory but without an assigned location."""
@@ -94,6 +127,7 @@ class ReceiveHandler(DatabaseManager):
         WHERE ItemID = %s AND (StorageLocation IS NULL OR StorageLocation = '')
         """
         self.execute_command(query, (new_location, int(item_id)))
+        self.invalidate_cache("Inventory")
 
     def update_item_location_specific(self, item_id, expiration_date, new_location):
         """Updates the store location for a specific item with a specific expiration date."""
@@ -103,3 +137,4 @@ class ReceiveHandler(DatabaseManager):
         WHERE ItemID = %s AND ExpirationDate = %s
         """
         self.execute_command(query, (new_location, item_id, expiration_date))
+        self.invalidate_cache("Inventory")
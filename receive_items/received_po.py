@@ -56,11 +56,7 @@ def received_po_tab():
         })
 
     if st.button("Confirm and Add to Inventory"):
-        for entry in inventory_entries:
-            receive_handler.update_received_quantity(selected_poid, entry["item_id"], entry["quantity"])
-
-        receive_handler.add_items_to_inventory(inventory_entries)
-        receive_handler.mark_po_completed(selected_poid)
+        receive_handler.receive_po(selected_poid, inventory_entries)
 
         st.success(f"✅ PO #{selected_poid} items successfully added to inventory!")
         st.rerun()
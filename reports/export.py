@@ -0,0 +1,46 @@
+import io
+import os
+import tempfile
+
+import pandas as pd
+import xlsxwriter
+
+
+def csv_export(chunks, columns):
+    """
+    Encode DataFrame chunks as one CSV file. Each chunk is encoded into the output as it
+    arrives, so only the encoded bytes are held, never the whole result as rows.
+    `columns` maps result columns to export headers.
+    """
+    buffer = io.BytesIO()
+    text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+    pd.DataFrame(columns=list(columns.values())).to_csv(text, index=False)
+    for chunk in chunks:
+        chunk[list(columns.keys())].to_csv(text, header=False, index=False)
+    text.flush()
+    return buffer.getvalue()
+
+
+def xlsx_export(chunks, columns, sheet_name="Report"):
+    """
+    Encode DataFrame chunks as an .xlsx workbook using xlsxwriter's constant-memory mode,
+    which flushes each row to a temporary file as soon as it is written.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+        sheet = workbook.add_worksheet(sheet_name)
+        header = workbook.add_format({"bold": True})
+        sheet.write_row(0, 0, list(columns.values()), header)
+        row = 1
+        for chunk in chunks:
+            for values in chunk[list(columns.keys())].itertuples(index=False, name=None):
+                # NaN, NaT and pd.NA (nullable ints) all become blank cells
+                sheet.write_row(row, 0, [None if pd.isna(value) else value for value in values])
+                row += 1
+        workbook.close()
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
@@ -1,14 +1,13 @@
 import streamlit as st
+from navigation import lazy_tabs
 from reports.sup_performance import sup_performance_tab
 from reports.near_expiry import near_expiry_tab  # ✅ Added near expiry tab
 
 def reports_page():
     st.title("📊 Reports & Analytics")
 
-    tabs = st.tabs(["Supplier Performance", "Items Near Expiry"])  # ✅ Added new tab
-
-    with tabs[0]:
-        sup_performance_tab()
-        
-    with tabs[1]:
-        near_expiry_tab()  # ✅ Handles near expiry items report
+    # ✅ Only the selected report is generated
+    lazy_tabs({
+        "Supplier Performance": sup_performance_tab,
+        "Items Near Expiry": near_expiry_tab  # ✅ Handles near expiry items report
+    }, key="reports_tab")
@@ -1,56 +1,104 @@
 import streamlit as st
-import pandas as pd
 from reports.report_handler import ReportHandler
+from reports.export import csv_export, xlsx_export
+from home_handler import HomeHandler, CATEGORY_COLUMNS
 
 report_handler = ReportHandler()
+home_handler = HomeHandler()
+
+CATEGORY_LABELS = ["Class Category", "Department Category", "Section Category", "Family Category", "Sub-Family Category"]
+PREVIEW_ROWS = 1000
+SEVERITY_ICONS = {"Expired": "⛔ Expired", "Critical": "🔴 Critical", "Warning": "🟠 Warning", "Watch": "🟢 Watch"}
+
+# Result column -> export header
+EXPORT_COLUMNS = {
+    "itemnameenglish": "Item",
+    "barcode": "Barcode",
+    "quantity": "Available Quantity",
+    "expirationdate": "Expiry Date",
+    "daysleft": "Days Left",
+    "severity": "Severity",
+    "storagelocation": "Storage Location",
+}
+
+def near_expiry_filters():
+    """Horizon, location and category filters for the report."""
+    with st.expander("🔎 Report Options", expanded=True):
+        col_horizon, col_expired = st.columns([3, 1])
+        horizon = col_horizon.slider("Expiring within (days)", 1, 365, 30, key="exp_horizon")
+        include_expired = col_expired.checkbox("Include expired", key="exp_include_expired")
+
+        locations = st.multiselect(
+            "Storage Location", home_handler.get_storage_locations(), key="exp_locations"
+        )
+
+        # ✅ Cascading category filters, same tree as the Home page
+        categories = {}
+        tree = home_handler.get_category_tree()
+        category_cols = st.columns(len(CATEGORY_COLUMNS))
+        for col, label, widget_col in zip(CATEGORY_COLUMNS, CATEGORY_LABELS, category_cols):
+            options = sorted(tree[col].dropna().unique().tolist()) if not tree.empty else []
+            choice = widget_col.selectbox(label, [""] + options, key=f"exp_{col}")
+            if choice:
+                categories[col] = choice
+                tree = tree[tree[col] == choice]
+
+    return {
+        "horizon_days": horizon,
+        "locations": locations,
+        "categories": categories,
+        "include_expired": include_expired,
+    }
 
 def near_expiry_tab():
     """Tab displaying items that are near expiry."""
     st.header("⏳ Items Near Expiry")
 
-    # ✅ Fetch near-expiry items (within 30 days)
-    near_expiry_data = report_handler.get_near_expiry_items()
+    options = near_expiry_filters()
 
-    if near_expiry_data.empty:
+    # ✅ Severity totals are aggregated in SQL
+    summary = report_handler.get_near_expiry_summary(**options)
+    if summary.empty:
         st.success("✅ No items are near expiry!")
         return
 
-    # ✅ Format date for better readability
-    near_expiry_data["ExpirationDate"] = pd.to_datetime(near_expiry_data["expirationdate"]).dt.strftime("%Y-%m-%d")
-
-    # ✅ Calculate remaining days
-    near_expiry_data["DaysLeft"] = (
-        pd.to_datetime(near_expiry_data["expirationdate"]) - pd.Timestamp.today()
-    ).dt.days
-
-    # ✅ Select only required columns
-    display_data = near_expiry_data[[
-        "itemnameenglish",
-        "quantity",
-        "ExpirationDate",
-        "DaysLeft",
-        "storagelocation"
-    ]].rename(columns={
-        "itemnameenglish": "Item",
-        "quantity": "Available Quantity",
-        "ExpirationDate": "Expiry Date",
-        "DaysLeft": "Days Left",
-        "storagelocation": "Storage Location"
-    })
-
-    # ✅ Highlight critical expiry items (<7 days)
+    total_lots = int(summary["lots"].sum())
+    metric_cols = st.columns(len(summary))
+    for col, (_, bucket) in zip(metric_cols, summary.iterrows()):
+        col.metric(SEVERITY_ICONS.get(bucket["severity"], bucket["severity"]),
+                   f"{int(bucket['lots'])} lots", f"{int(bucket['quantity'])} units", delta_color="off")
+
+    # ✅ Only the most urgent rows are rendered; the export below has everything
     st.subheader("⚠️ Items Expiring Soon")
-    st.dataframe(display_data.style.apply(
-        lambda row: ["background-color: #ffcccc" if row["Days Left"] < 7 else "" for _ in row],
-        axis=1
-    ), use_container_width=True)
-
-    # ✅ Option to export report
-    st.download_button(
-        label="📥 Download Expiry Report",
-        data=display_data.to_csv(index=False),
-        file_name="Items_Near_Expiry.csv",
-        mime="text/csv"
+    preview = report_handler.get_near_expiry_items(**options, limit=PREVIEW_ROWS)
+    preview["severity"] = preview["severity"].map(SEVERITY_ICONS)
+    st.dataframe(
+        preview[list(EXPORT_COLUMNS.keys())],
+        column_config={
+            "itemnameenglish": "Item",
+            "barcode": "Barcode",
+            "quantity": "Available Quantity",
+            "expirationdate": st.column_config.DateColumn("Expiry Date", format="YYYY-MM-DD"),
+            "daysleft": "Days Left",
+            "severity": "Severity",
+            "storagelocation": "Storage Location",
+        },
+        use_container_width=True,
+        hide_index=True
     )
+    if total_lots > PREVIEW_ROWS:
+        st.caption(f"Showing the {PREVIEW_ROWS} soonest of {total_lots} lots. Export for the full list.")
 
-    st.success("✅ Report generated successfully!")
+    # ✅ Export streams the whole result from a server-side cursor, chunk by chunk
+    col_format, col_prepare = st.columns([1, 1])
+    export_format = col_format.radio("Export format", ["CSV", "Excel"], horizontal=True, key="exp_format")
+    if col_prepare.button("📦 Prepare Export"):
+        with st.spinner(f"Exporting {total_lots} lots..."):
+            chunks = report_handler.iter_near_expiry_chunks(**options)
+            if export_format == "CSV":
+                data, file_name, mime = csv_export(chunks, EXPORT_COLUMNS), "Items_Near_Expiry.csv", "text/csv"
+            else:
+                data = xlsx_export(chunks, EXPORT_COLUMNS, "Near Expiry")
+                file_name = "Items_Near_Expiry.xlsx"
+                mime = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        st.download_button(label="📥 Download Expiry Report", data=data, file_name=file_name, mime=mime)
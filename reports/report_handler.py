@@ -1,6 +1,7 @@
-import streamlit as st
 from db_handler import DatabaseManager
+from tracing import trace_methods
 
+@trace_methods
 class ReportHandler(DatabaseManager):
     """Handles fetching report data from the database."""
 
@@ -25,17 +26,82 @@ class ReportHandler(DatabaseManager):
         """
         return self.fetch_data(query)
 
-    def get_near_expiry_items(self):
-        """Fetch items expiring within the next 30 days."""
-        query = """
-        SELECT 
-            i.ItemNameEnglish, 
-            inv.Quantity, 
-            inv.ExpirationDate, 
-            inv.StorageLocation
+    # Days-left cut-offs for the severity buckets (expired lots are their own bucket)
+    SEVERITY_BUCKETS = [("Critical", 7), ("Warning", 30)]
+    NEAR_EXPIRY_CHUNK_ROWS = 5000
+    NEAR_EXPIRY_SCHEMA = {"expirationdate": "date", "severity": "category", "storagelocation": "category"}
+
+    def _near_expiry_query(self, horizon_days=30, locations=None, categories=None, include_expired=False):
+        """
+        Lots holding stock that expire within `horizon_days`, optionally limited to storage
+        locations and category values ({column: value}). Days left and severity come from SQL.
+        Returns (select statement, params), ordered by expiry date.
+        """
+        clauses = [
+            "inv.Quantity > 0",
+            "inv.ExpirationDate <= CURRENT_DATE + %s",
+        ]
+        params = [int(horizon_days)]
+        if not include_expired:
+            clauses.append("inv.ExpirationDate >= CURRENT_DATE")
+        if locations:
+            clauses.append("inv.StorageLocation = ANY(%s)")
+            params.append(list(locations))
+        for column, value in (categories or {}).items():
+            if value:
+                clauses.append(f"i.{column} = %s")
+                params.append(value)
+
+        severity = "\n".join(
+            f"WHEN inv.ExpirationDate - CURRENT_DATE <= {days} THEN '{label}'"
+            for label, days in self.SEVERITY_BUCKETS
+        )
+        query = f"""
+        SELECT
+            i.ItemNameEnglish AS itemnameenglish,
+            i.Barcode AS barcode,
+            inv.Quantity AS quantity,
+            inv.ExpirationDate AS expirationdate,
+            inv.ExpirationDate - CURRENT_DATE AS daysleft,
+            CASE
+                WHEN inv.ExpirationDate < CURRENT_DATE THEN 'Expired'
+                {severity}
+                ELSE 'Watch'
+            END AS severity,
+            inv.StorageLocation AS storagelocation
         FROM Inventory inv
         JOIN Item i ON inv.ItemID = i.ItemID
-        WHERE inv.ExpirationDate BETWEEN CURRENT_DATE AND CURRENT_DATE + INTERVAL '30 days'
-        ORDER BY inv.ExpirationDate ASC;
+        WHERE {" AND ".join(clauses)}
+        ORDER BY inv.ExpirationDate, i.ItemNameEnglish
         """
-        return self.fetch_data(query)
+        return query, params
+
+    def get_near_expiry_items(self, horizon_days=30, locations=None, categories=None,
+                              include_expired=False, limit=None):
+        """Near-expiry lots (see `_near_expiry_query`), at most `limit` rows."""
+        query, params = self._near_expiry_query(horizon_days, locations, categories, include_expired)
+        if limit:
+            query += "\nLIMIT %s"
+            params.append(int(limit))
+        return self.fetch_data(query, params, schema=self.NEAR_EXPIRY_SCHEMA)
+
+    def get_near_expiry_summary(self, horizon_days=30, locations=None, categories=None,
+                                include_expired=False):
+        """Lot count and quantity per severity bucket, aggregated in SQL."""
+        query, params = self._near_expiry_query(horizon_days, locations, categories, include_expired)
+        return self.fetch_data(f"""
+        SELECT severity, COUNT(*) AS lots, SUM(quantity) AS quantity, MIN(daysleft) AS mindaysleft
+        FROM ({query}) lots
+        GROUP BY severity
+        ORDER BY MIN(daysleft)
+        """, params)
+
+    def iter_near_expiry_chunks(self, horizon_days=30, locations=None, categories=None,
+                                include_expired=False, chunk_size=None):
+        """
+        Yield the full near-expiry result as DataFrames of at most `chunk_size` rows, read
+        through a server-side cursor so the result set is never held in memory at once.
+        """
+        query, params = self._near_expiry_query(horizon_days, locations, categories, include_expired)
+        yield from self.fetch_chunks(query, params, chunk_size or self.NEAR_EXPIRY_CHUNK_ROWS,
+                                     schema=self.NEAR_EXPIRY_SCHEMA)
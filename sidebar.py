@@ -8,7 +8,7 @@ def sidebar():
     pages = ["Home", "Item", "Receive Items", "Purchase Order", "Reports"]
 
     if st.session_state.get("user_role") == "Admin":
-        pages.append("User Management")
+        pages.extend(["User Management", "Query Performance"])
 
     # Initialize selected page if not already set
     if "selected_page" not in st.session_state:
@@ -28,3 +28,28 @@ def sidebar():
         st.logout()
 
     return st.session_state.selected_page
+
+def trace_sidebar(trace):
+    """Admin debug panel: waterfall of the spans timed during this rerun."""
+    import altair as alt
+    import pandas as pd
+
+    with st.sidebar.expander(f"🐞 Render trace · {trace.duration_ms:.0f} ms"):
+        if not trace.spans:
+            st.caption("No spans recorded.")
+            return
+        spans = pd.DataFrame(trace.spans)
+        spans["end_ms"] = spans["start_ms"] + spans["duration_ms"]
+        spans["label"] = [
+            f"{i:03d} {'· ' * depth}{name}" for i, (depth, name) in enumerate(zip(spans["depth"], spans["name"]))
+        ]
+        tooltip = ["name", "duration_ms", "start_ms"] + (["query"] if "query" in spans else [])
+        chart = alt.Chart(spans).mark_bar().encode(
+            x=alt.X("start_ms:Q", title="ms since rerun start"),
+            x2="end_ms:Q",
+            y=alt.Y("label:N", sort=None, title=None, axis=alt.Axis(labelLimit=220)),
+            color=alt.Color("depth:O", legend=None),
+            tooltip=tooltip,
+        )
+        st.altair_chart(chart, use_container_width=True)
+        st.caption(f"Trace {trace.trace_id} · {len(spans)} spans")
@@ -0,0 +1,63 @@
+from db_handler import DatabaseManager
+from tracing import trace_methods
+
+# Recomputes every ItemStock row (the triggers installed by migration 3 keep it current)
+REBUILD_STOCK = """
+DELETE FROM ItemStock;
+INSERT INTO ItemStock (ItemID, Quantity, LotCount, Threshold, AverageRequired)
+SELECT i.ItemID,
+       COALESCE(SUM(inv.Quantity), 0),
+       COUNT(inv.ItemID),
+       i.Threshold,
+       i.AverageRequired
+FROM Item i
+LEFT JOIN Inventory inv ON inv.ItemID = i.ItemID
+GROUP BY i.ItemID, i.Threshold, i.AverageRequired;
+"""
+
+
+@trace_methods
+class StockHandler(DatabaseManager):
+    """Reads the incrementally maintained per-item stock levels."""
+
+    def rebuild_stock_levels(self):
+        """Recompute every ItemStock row from Inventory (repair / after bulk maintenance)."""
+        with self.transaction() as tx:
+            tx.execute(REBUILD_STOCK)
+
+    def get_stock_summary(self):
+        """Total inventory rows (lots) and total quantity, summed over items instead of lots."""
+        df = self.fetch_data("""
+        SELECT COALESCE(SUM(LotCount), 0) AS total_items, COALESCE(SUM(Quantity), 0) AS total_quantity
+        FROM ItemStock
+        """)
+        if df.empty:
+            return {"total_items": 0, "total_quantity": 0}
+        return {
+            "total_items": int(df.iloc[0]["total_items"]),
+            "total_quantity": int(df.iloc[0]["total_quantity"]),
+        }
+
+    def get_below_threshold(self, in_stock_only=False):
+        """
+        Items whose stock is below their threshold (served by the partial index).
+        `in_stock_only` limits the result to items with at least one inventory lot.
+        """
+        return self.fetch_data(f"""
+        SELECT
+            s.ItemID AS itemid,
+            i.ItemNameEnglish AS itemnameenglish,
+            i.ImageHash AS imagehash,
+            s.Quantity AS quantity,
+            s.Threshold AS threshold,
+            s.AverageRequired AS averagerequired,
+            s.Shortfall AS shortfall
+        FROM ItemStock s
+        JOIN Item i ON i.ItemID = s.ItemID
+        WHERE s.Quantity < s.Threshold
+        {"AND s.LotCount > 0" if in_stock_only else ""}
+        ORDER BY s.Shortfall DESC, i.ItemNameEnglish
+        """, schema={
+            "itemid": "int32", "quantity": "int64", "threshold": "int32",
+            "averagerequired": "int32", "shortfall": "int64",
+        })
@@ -0,0 +1,56 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+from db_handler import apply_schema
+
+
+@pytest.fixture
+def rows():
+    # Object columns, the way psycopg2 tuples land in a DataFrame
+    return pd.DataFrame({
+        "itemid": [1, 2, None],
+        "price": [Decimal("1.50"), None, Decimal("2")],
+        "expirationdate": [datetime.date(2026, 1, 2), None, datetime.date(2026, 3, 4)],
+        "storagelocation": ["A", "A", None],
+        "note": ["x", None, ""],
+    }, dtype=object)
+
+
+def test_declared_columns_get_compact_dtypes(rows):
+    df = apply_schema(rows, {
+        "itemid": "int32", "price": "decimal", "expirationdate": "date", "storagelocation": "category",
+    })
+    assert str(df["itemid"].dtype) == "Int32"
+    assert df["price"].dtype == "float64"
+    assert df["expirationdate"].dtype.kind == "M"
+    assert str(df["storagelocation"].dtype) == "category"
+    assert df["note"].dtype == object
+
+
+def test_nulls_stay_missing(rows):
+    df = apply_schema(rows, {"itemid": "int32", "price": "decimal", "expirationdate": "date"})
+    assert df["itemid"].isna().tolist() == [False, False, True]
+    assert df["price"].isna().tolist() == [False, True, False]
+    assert pd.isna(df.loc[1, "expirationdate"])
+
+
+def test_dates_read_back_as_python_dates_for_psycopg2(rows):
+    df = apply_schema(rows, {"expirationdate": "date"})
+    value = df["expirationdate"].iloc[0].date()
+    assert type(value) is datetime.date and value == datetime.date(2026, 1, 2)
+
+
+def test_columns_missing_from_the_result_are_skipped(rows):
+    df = apply_schema(rows, {"quantity": "int64", "itemid": "int32"})
+    assert "quantity" not in df.columns
+    assert str(df["itemid"].dtype) == "Int32"
+
+
+def test_no_schema_leaves_the_frame_alone(rows):
+    assert apply_schema(rows, None).dtypes.tolist() == [object] * 5
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+from db_handler import copy_buffer
+
+
+def test_values_are_quoted_and_none_is_a_bare_empty_field():
+    buffer = copy_buffer([(1, "a", None, "")])
+    assert buffer.read() == '"1","a",,""\n'
+
+
+def test_embedded_quotes_commas_and_newlines_survive():
+    buffer = copy_buffer([('say "hi", then\nleave',)])
+    assert buffer.read() == '"say ""hi"", then\nleave"\n'
+
+
+def test_bytes_are_written_in_bytea_hex_form():
+    buffer = copy_buffer([(b"\x00\xff", memoryview(b"ab"))])
+    assert buffer.read() == '"\\x00ff","\\x6162"\n'
+
+
+def test_buffer_is_rewound_and_holds_one_line_per_row():
+    buffer = copy_buffer([(1,), (2,), (3,)])
+    assert buffer.tell() == 0
+    assert buffer.read().splitlines() == ['"1"', '"2"', '"3"']
+
+
+def test_pandas_missing_values_become_null():
+    pd = pytest.importorskip("pandas")
+    buffer = copy_buffer([(float("nan"), pd.NaT, pd.NA, "x")])
+    assert buffer.read() == ',,,"x"\n'
+
+
+def test_whole_number_floats_are_written_as_integers():
+    np = pytest.importorskip("numpy")
+    buffer = copy_buffer([(5.0, np.float64(7.0), np.float32(2.0), 2.5)])
+    assert buffer.read() == '"5","7","2","2.5"\n'
+
+
+def test_rows_from_a_dataframe_with_gaps_copy_cleanly():
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame({"itemid": [1, None], "name": ["Rice", None]})  # itemid turns float64
+    buffer = copy_buffer(df.itertuples(index=False, name=None))
+    assert buffer.read() == '"1","Rice"\n,\n'
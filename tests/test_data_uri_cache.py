@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+pytest.importorskip("PIL")
+
+from image_handler import DataUriCache, data_uri
+
+
+def test_get_many_splits_hits_and_misses():
+    cache = DataUriCache(max_bytes=100)
+    cache.put(("a", "thumb"), "x" * 10)
+
+    found, missing = cache.get_many([("a", "thumb"), ("b", "thumb")])
+
+    assert found == {("a", "thumb"): "x" * 10}
+    assert missing == [("b", "thumb")]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = DataUriCache(max_bytes=25)
+    cache.put("a", "a" * 10)
+    cache.put("b", "b" * 10)
+    cache.get_many(["a"])  # "b" is now the oldest
+    cache.put("c", "c" * 10)
+
+    found, missing = cache.get_many(["a", "b", "c"])
+    assert set(found) == {"a", "c"}
+    assert missing == ["b"]
+    assert cache.stats()["bytes"] == 20
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_larger_than_the_budget_are_not_stored():
+    cache = DataUriCache(max_bytes=5)
+    cache.put("big", "x" * 6)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_put_of_an_existing_key_does_not_double_count():
+    cache = DataUriCache(max_bytes=100)
+    cache.put("a", "x" * 10)
+    cache.put("a", "x" * 10)
+    assert cache.stats()["bytes"] == 10
+
+
+def test_data_uri_uses_the_image_signature_for_the_mime_type():
+    png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+    assert data_uri(png).startswith("data:image/png;base64,")
+    assert data_uri(b"\xff\xd8\xff").startswith("data:image/jpeg;base64,")
@@ -0,0 +1,52 @@
+from item.dropdown_catalog import CATEGORY_HIERARCHY, DROPDOWN_SECTIONS, DropdownCatalog
+
+ROWS = [
+    ("Brand", "Acme", None),
+    ("ClassCat", "Food", None),
+    ("ClassCat", "Household", None),
+    ("DepartmentCat", "Cleaning", "Household"),
+    ("DepartmentCat", "Dairy", "Food"),
+    ("DepartmentCat", "Seasonal", None),
+    ("SectionCat", "Milk", ""),
+]
+
+
+def test_hierarchy_sections_are_dropdown_sections():
+    assert DROPDOWN_SECTIONS[:len(CATEGORY_HIERARCHY)] == CATEGORY_HIERARCHY
+
+
+def test_parent_and_child_sections():
+    assert DropdownCatalog.parent_section("ClassCat") is None
+    assert DropdownCatalog.parent_section("DepartmentCat") == "ClassCat"
+    assert DropdownCatalog.parent_section("SubFamilyCat") == "FamilyCat"
+    assert DropdownCatalog.child_section("FamilyCat") == "SubFamilyCat"
+    assert DropdownCatalog.child_section("SubFamilyCat") is None
+    assert DropdownCatalog.parent_section("Brand") is None
+    assert DropdownCatalog.child_section("Brand") is None
+
+
+def test_values_keep_row_order_per_section():
+    catalog = DropdownCatalog(ROWS)
+    assert catalog.sections() == ["Brand", "ClassCat", "DepartmentCat", "SectionCat"]
+    assert catalog.values("DepartmentCat") == ["Cleaning", "Dairy", "Seasonal"]
+    assert catalog.values("FamilyCat") == []
+
+
+def test_values_under_a_parent_include_unlinked_values():
+    catalog = DropdownCatalog(ROWS)
+    assert catalog.values("DepartmentCat", parent="Food") == ["Dairy", "Seasonal"]
+    assert catalog.values("DepartmentCat", parent="Household") == ["Cleaning", "Seasonal"]
+    assert catalog.values("DepartmentCat", parent="") == ["Cleaning", "Dairy", "Seasonal"]
+
+
+def test_parent_of_treats_blank_as_no_parent():
+    catalog = DropdownCatalog(ROWS)
+    assert catalog.parent_of("DepartmentCat", "Dairy") == "Food"
+    assert catalog.parent_of("SectionCat", "Milk") is None
+    assert catalog.parent_of("SectionCat", "Unknown") is None
+
+
+def test_values_returns_a_copy():
+    catalog = DropdownCatalog(ROWS)
+    catalog.values("ClassCat").append("Toys")
+    assert catalog.values("ClassCat") == ["Food", "Household"]
@@ -0,0 +1,49 @@
+import io
+import zipfile
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("xlsxwriter")
+
+from reports.export import csv_export, xlsx_export
+
+COLUMNS = {"itemnameenglish": "Item", "expirationdate": "Expiry Date", "quantity": "Quantity"}
+
+
+@pytest.fixture
+def chunks():
+    # Two chunks, typed the way fetch_chunks applies NEAR_EXPIRY_SCHEMA-style dtypes
+    lots = pd.DataFrame({
+        "quantity": pd.array([5, 12, None], dtype="Int32"),
+        "itemnameenglish": ["Milk, 1L", "Rice", "Salt"],
+        "expirationdate": pd.to_datetime(["2026-01-02", None, "2026-02-03"]),
+        "storagelocation": ["Cold room", "Dry store", "Dry store"],
+    })
+    return [lots.iloc[:2], lots.iloc[2:]]
+
+
+def test_csv_writes_every_chunk_under_the_export_headers(chunks):
+    text = csv_export(iter(chunks), COLUMNS).decode("utf-8")
+    assert text.splitlines() == [
+        "Item,Expiry Date,Quantity",
+        '"Milk, 1L",2026-01-02,5',
+        "Rice,,12",
+        "Salt,2026-02-03,",
+    ]
+
+
+def test_csv_of_an_empty_result_is_just_the_header():
+    assert csv_export(iter([]), COLUMNS).decode("utf-8").splitlines() == ["Item,Expiry Date,Quantity"]
+
+
+def test_xlsx_holds_header_and_rows_of_every_chunk(chunks):
+    data = xlsx_export(iter(chunks), COLUMNS, "Near Expiry")
+
+    with zipfile.ZipFile(io.BytesIO(data)) as workbook:
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode("utf-8")
+        names = workbook.read("xl/workbook.xml").decode("utf-8")
+    assert 'name="Near Expiry"' in names
+    assert sheet.count("<row ") == 4
+    assert "Milk, 1L" in sheet and "Salt" in sheet  # constant-memory mode writes inline strings
+    assert "Cold room" not in sheet
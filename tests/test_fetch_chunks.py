@@ -0,0 +1,117 @@
+import datetime
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+from db_handler import DatabaseManager
+
+ROWS = [(i, datetime.date(2026, 1, i)) for i in range(1, 6)]
+
+
+class FakeCursor:
+    """Named-cursor stand-in: hands out ROWS through fetchmany."""
+
+    description = [("itemid",), ("expirationdate",)]
+
+    def __init__(self, conn, name):
+        self.conn, self.name = conn, name
+        self.itersize = None
+        self.rows = list(ROWS)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.conn.closed_cursors.append(self.name)
+
+    def execute(self, query, params):
+        self.conn.queries.append((query, params))
+
+    def fetchmany(self, size):
+        self.conn.fetch_sizes.append(size)
+        chunk, self.rows = self.rows[:size], self.rows[size:]
+        return chunk
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = True
+        self.queries, self.fetch_sizes, self.closed_cursors = [], [], []
+        self.commits = self.rollbacks = 0
+
+    def cursor(self, name=None):
+        return FakeCursor(self, name)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+        self.checked_out = 0
+        self.returned = []
+
+    def getconn(self):
+        self.checked_out += 1
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        self.checked_out -= 1
+        self.returned.append((conn, close))
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("AMAS_DSN", "postgresql://fake/amas")
+    fake = FakePool()
+    monkeypatch.setattr(DatabaseManager, "pool", property(lambda self: fake))
+    return fake
+
+
+SCHEMA = {"itemid": "int32", "expirationdate": "date"}
+
+
+def test_chunks_are_bounded_and_typed_one_by_one(pool):
+    chunks = list(DatabaseManager().fetch_chunks("SELECT ...", chunk_size=2, schema=SCHEMA))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    for chunk in chunks:
+        assert str(chunk["itemid"].dtype) == "Int32"
+        assert chunk["expirationdate"].dtype.kind == "M"
+    assert pd.concat(chunks)["itemid"].tolist() == [1, 2, 3, 4, 5]
+    assert set(pool.conn.fetch_sizes) == {2}
+    assert pool.conn.commits == 1
+    assert pool.checked_out == 0 and pool.returned == [(pool.conn, False)]
+
+
+def test_untyped_results_keep_object_chunks(pool):
+    db = DatabaseManager()
+    db.typed_results = False
+    chunk = next(iter(db.fetch_chunks("SELECT ...", chunk_size=5, schema=SCHEMA)))
+    assert chunk["expirationdate"].tolist() == [row[1] for row in ROWS]
+    assert chunk["expirationdate"].dtype == object
+
+
+def test_connection_goes_back_when_the_consumer_stops_early(pool):
+    chunks = DatabaseManager().fetch_chunks("SELECT ...", chunk_size=2)
+    next(chunks)
+    assert pool.checked_out == 1  # the open transaction holds its connection
+
+    chunks.close()
+    assert pool.checked_out == 0
+    assert pool.conn.rollbacks == 1 and pool.conn.commits == 0
+    assert pool.conn.closed_cursors and pool.conn.closed_cursors[0].startswith("amas_stream_")
+
+
+def test_fetch_iter_yields_rows_fetched_itersize_at_a_time(pool):
+    rows = list(DatabaseManager().fetch_iter("SELECT ...", itersize=3))
+    assert rows == ROWS
+    assert set(pool.conn.fetch_sizes) == {3}
+    assert pool.checked_out == 0
@@ -0,0 +1,66 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+import migrations
+from migrations import MIGRATIONS, CONCURRENT, check_schema, statements
+
+
+class FakeDatabase:
+    """Answers the read-only schema check from a set of applied versions."""
+
+    def __init__(self, applied, dsn="postgresql://fake/amas"):
+        self.dsn = dsn
+        self.applied = set(applied)
+        self.migrated = 0
+
+    def fetch_data(self, query, params=None):
+        if "to_regclass" in query:
+            return pd.DataFrame({"present": [bool(self.applied)]})
+        rows = [(version, migrations.checksum(sql)) for version, _, sql in MIGRATIONS if version in self.applied]
+        return pd.DataFrame(rows, columns=["version", "checksum"])
+
+
+@pytest.fixture(autouse=True)
+def fresh_process(monkeypatch):
+    monkeypatch.setattr(migrations, "_current_dsns", set())
+
+
+def test_versions_are_unique_and_ascending():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert CONCURRENT <= set(versions)
+
+
+def test_pending_migrations_are_reported_not_applied(monkeypatch):
+    db = FakeDatabase(applied={1, 2, 3})
+    monkeypatch.setattr(migrations, "migrate", lambda db: pytest.fail("must not migrate"))
+    assert [version for version, _ in check_schema(db)] == [4, 5, 6]
+
+
+def test_a_missing_migrations_table_means_everything_is_pending():
+    assert len(check_schema(FakeDatabase(applied=()))) == len(MIGRATIONS)
+
+
+def test_auto_apply_migrates_then_remembers_the_current_schema(monkeypatch):
+    db = FakeDatabase(applied={1})
+
+    def migrate(db):
+        db.migrated += 1
+        db.applied = {version for version, _, _ in MIGRATIONS}
+
+    monkeypatch.setattr(migrations, "migrate", migrate)
+    assert check_schema(db, auto_apply=True) == []
+    db.applied = set()  # a current schema is not checked again in this process
+    assert check_schema(db) == []
+    assert db.migrated == 1
+
+
+def test_concurrent_migrations_split_into_single_statements():
+    for version, _, sql_text in MIGRATIONS:
+        if version in CONCURRENT:
+            parts = statements(sql_text)
+            assert parts and all(";" not in part for part in parts)
+            assert all("CREATE INDEX CONCURRENTLY" in part for part in parts if "CREATE INDEX" in part)
@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from query_monitor import QueryMonitor, approx_bytes, fingerprint, _short_params
+
+
+def test_fingerprint_replaces_literals_and_parameters():
+    assert fingerprint("SELECT * FROM Item WHERE ItemID = 42 AND Name = 'x''y'") == \
+        "SELECT * FROM Item WHERE ItemID = ? AND Name = ?"
+    assert fingerprint("SELECT * FROM Item WHERE ItemID = %s") == "SELECT * FROM Item WHERE ItemID = ?"
+
+
+def test_fingerprint_strips_comments_whitespace_and_trailing_semicolon():
+    query = """
+        -- leading comment
+        SELECT a,   b /* inline */
+        FROM t;
+    """
+    assert fingerprint(query) == "SELECT a, b FROM t"
+
+
+def test_fingerprint_collapses_in_lists_of_any_length():
+    assert fingerprint("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == fingerprint("SELECT 1 FROM t WHERE id IN (%s)")
+
+
+def test_fingerprint_keeps_digits_inside_identifiers():
+    assert fingerprint("SELECT col1 FROM t2") == "SELECT col1 FROM t2"
+
+
+def test_approx_bytes_extrapolates_from_a_sample():
+    rows = [("abcd", 1, None)] * 200
+    assert approx_bytes(rows, sample_size=10) == 200 * (4 + 8)
+    assert approx_bytes([]) == 0
+
+
+def test_short_params_summarises_bytes_and_truncates():
+    assert _short_params(None) is None
+    assert _short_params([b"\x00" * 10, 1]) == "['<10 bytes>', 1]"
+    assert _short_params(["x" * 50], limit=10).endswith("…")
+
+
+def test_record_aggregates_per_page_and_fingerprint():
+    monitor = QueryMonitor(slow_ms=100)
+    monitor.set_page("Home")
+    monitor.record("SELECT * FROM t WHERE id = 1", 0.010, rows=5, nbytes=50)
+    monitor.record("SELECT * FROM t WHERE id = 2", 0.030, rows=1, nbytes=10)
+    monitor.record("SELECT * FROM t WHERE id = 3", 0.200, error="QueryCanceled")
+
+    (row,) = monitor.summary()
+    assert row["page"] == "Home"
+    assert row["query"] == "SELECT * FROM t WHERE id = ?"
+    assert row["count"] == 3
+    assert row["errors"] == 1
+    assert row["slow"] == 1
+    assert row["p50_ms"] == pytest.approx(30.0)
+    assert row["max_ms"] == pytest.approx(200.0)
+    assert row["avg_rows"] == 2.0
+
+
+def test_slow_statements_are_kept_newest_first_with_params():
+    monitor = QueryMonitor(slow_ms=50, slow_log_size=2)
+    for i in range(3):
+        monitor.record(f"SELECT {i}", 0.100, params=(i,))
+    monitor.record("SELECT fast", 0.001)
+
+    slow = monitor.slow_queries()
+    assert [event["params"] for event in slow] == ["[2]", "[1]"]
+
+
+def test_page_and_acquire_time_are_per_thread():
+    monitor = QueryMonitor()
+    monitor.set_page("Home")
+    monitor.note_acquire(0.5)
+    seen = {}
+
+    def worker():
+        seen["page"] = monitor.current_page
+        seen["acquire"] = monitor.take_acquire()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen == {"page": "(none)", "acquire": 0.0}
+    assert monitor.take_acquire() == 0.5
+    assert monitor.take_acquire() == 0.0
+
+
+def test_track_records_errors_and_reraises():
+    monitor = QueryMonitor()
+    with pytest.raises(ValueError):
+        with monitor.track("SELECT 1") as probe:
+            probe.rows = 3
+            raise ValueError
+    (row,) = monitor.summary()
+    assert row["errors"] == 1
+    assert row["avg_rows"] == 3.0
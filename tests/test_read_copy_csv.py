@@ -0,0 +1,87 @@
+import io
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+from db_handler import read_copy_csv
+
+# What COPY (...) TO STDOUT WITH (FORMAT csv, HEADER, NULL '\N') writes
+COPY_OUTPUT = (
+    "poid,code,note,received,orderdate,price\n"
+    '1,007,,t,2026-03-01 09:30:00,"1,5"\n'
+    "2,\\N,\\N,f,\\N,\\N\n"
+    '3,42,"a ""quoted"" note",\\N,2026-03-02 10:00:00,2.25\n'
+).encode()
+
+
+def read(schema=None):
+    return read_copy_csv(io.BytesIO(COPY_OUTPUT), schema)
+
+
+def test_null_and_empty_string_stay_distinct():
+    df = read()
+    assert df.loc[0, "note"] == ""
+    assert pd.isna(df.loc[1, "note"])
+    assert df.loc[2, "note"] == 'a "quoted" note'
+
+
+def test_undeclared_columns_are_read_as_text():
+    df = read({"poid": "int32"})
+    assert df.loc[0, "code"] == "007"
+    assert df.loc[2, "code"] == "42"
+    assert df.loc[0, "price"] == "1,5"
+
+
+def test_declared_columns_get_their_dtypes():
+    df = read({"poid": "int32", "received": "bool", "orderdate": "timestamp"})
+    assert str(df["poid"].dtype) == "Int32"
+    assert str(df["received"].dtype) == "boolean"
+    assert df["received"].tolist()[:2] == [True, False] and pd.isna(df.loc[2, "received"])
+    assert df.loc[0, "orderdate"] == pd.Timestamp("2026-03-01 09:30:00")
+    assert pd.isna(df.loc[1, "orderdate"])
+
+
+def test_empty_result_keeps_its_columns():
+    df = read_copy_csv(io.BytesIO(b"poid,note\n"), {"poid": "int32"})
+    assert df.empty
+    assert list(df.columns) == ["poid", "note"]
+
+
+class CopyCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def copy_expert(self, statement, buffer):
+        assert "NULL '\\N'" in statement
+        buffer.write(COPY_OUTPUT)
+
+
+class CopyPool:
+    def getconn(self):
+        return self
+
+    def putconn(self, conn, close=False):
+        pass
+
+    def cursor(self):
+        return CopyCursor()
+
+
+@pytest.mark.parametrize("typed", [True, False])
+def test_fetch_copy_follows_typed_results(monkeypatch, typed):
+    from db_handler import DatabaseManager
+
+    monkeypatch.setenv("AMAS_DSN", "postgresql://fake/amas")
+    monkeypatch.setattr(DatabaseManager, "pool", property(lambda self: CopyPool()))
+    db = DatabaseManager()
+    db.typed_results = typed
+
+    df = db.fetch_copy("SELECT ...", schema={"poid": "int32"})
+    assert str(df["poid"].dtype) == ("Int32" if typed else "object")
+    assert df.loc[0, "code"] == "007"
@@ -0,0 +1,120 @@
+import pytest
+
+pytest.importorskip("pandas")
+pytest.importorskip("psycopg2")
+pytest.importorskip("streamlit")
+
+import db_handler
+from db_handler import ReferenceCache
+
+
+class Loader:
+    """Counts calls; returns a fresh list each time so copies can be told apart."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.value)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(db_handler.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_hit_returns_a_copy_without_reloading():
+    cache = ReferenceCache()
+    loader = Loader([1, 2])
+
+    first = cache.get_or_load(["Supplier"], "k", loader)
+    first.append(3)
+    second = cache.get_or_load(["Supplier"], "k", loader)
+
+    assert loader.calls == 1
+    assert second == [1, 2]
+    assert cache.stats()["hits"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ReferenceCache(ttl_seconds=10)
+    loader = Loader([1])
+
+    cache.get_or_load(["Supplier"], "k", loader)
+    clock[0] += 9
+    cache.get_or_load(["Supplier"], "k", loader)
+    assert loader.calls == 1
+
+    clock[0] += 2
+    cache.get_or_load(["Supplier"], "k", loader)
+    assert loader.calls == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReferenceCache(max_entries=2)
+    loaders = {key: Loader([key]) for key in "abc"}
+
+    cache.get_or_load(["t"], "a", loaders["a"])
+    cache.get_or_load(["t"], "b", loaders["b"])
+    cache.get_or_load(["t"], "a", loaders["a"])  # "b" is now the oldest
+    cache.get_or_load(["t"], "c", loaders["c"])
+
+    cache.get_or_load(["t"], "a", loaders["a"])
+    cache.get_or_load(["t"], "b", loaders["b"])
+    assert loaders["a"].calls == 1
+    assert loaders["b"].calls == 2
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_invalidate_drops_dependent_entries_only():
+    cache = ReferenceCache()
+    suppliers, dropdowns = Loader([1]), Loader([2])
+    cache.get_or_load(["Supplier"], "s", suppliers)
+    cache.get_or_load(["Dropdowns"], "d", dropdowns)
+
+    cache.invalidate("supplier")  # table names are case-insensitive
+    cache.get_or_load(["Supplier"], "s", suppliers)
+    cache.get_or_load(["Dropdowns"], "d", dropdowns)
+
+    assert suppliers.calls == 2
+    assert dropdowns.calls == 1
+    assert cache.generation("SUPPLIER") == 1
+    assert cache.generation("Dropdowns") == 0
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = ReferenceCache()
+    calls = []
+
+    def stale_loader():
+        calls.append(1)
+        if len(calls) == 1:
+            cache.invalidate("Supplier")  # a writer commits while the read is in flight
+        return ["stale" if len(calls) == 1 else "fresh"]
+
+    assert cache.get_or_load(["Supplier"], "k", stale_loader) == ["stale"]
+    assert cache.get_or_load(["Supplier"], "k", stale_loader) == ["fresh"]
+    assert cache.get_or_load(["Supplier"], "k", stale_loader) == ["fresh"]
+    assert len(calls) == 2
+
+
+def test_missing_results_are_not_cached():
+    cache = ReferenceCache()
+    assert cache.get_or_load(["t"], "k", lambda: None) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_fetch_accepts_list_params(monkeypatch):
+    monkeypatch.setenv("AMAS_DSN", "postgresql://fake/amas")
+    db = db_handler.DatabaseManager()
+    calls = []
+    monkeypatch.setattr(db, "fetch_data", lambda query, params=None, schema=None: calls.append(params) or ["row"])
+    db.reference_cache.clear()
+
+    for _ in range(2):
+        assert db.cached_fetch(["Inventory"], "SELECT ... ANY(%s)", [["A1", "B2"]]) == ["row"]
+    assert calls == [[["A1", "B2"]]]
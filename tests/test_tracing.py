@@ -0,0 +1,119 @@
+import json
+import threading
+
+from tracing import (
+    attach_trace, current_trace, finish_trace, span, start_trace, trace_context, trace_methods, traced,
+)
+
+
+def test_spans_outside_a_trace_are_not_recorded():
+    finish_trace()
+    with span("orphan") as record:
+        assert record is None
+    assert current_trace() is None
+
+
+def test_spans_nest_under_the_innermost_open_span():
+    trace = start_trace("rerun", page="Home")
+    with span("page:Home"):
+        with span("sql", query="SELECT ?"):
+            pass
+        with span("tab:Items"):
+            pass
+    finish_trace()
+
+    assert [(s["name"], s["parent"], s["depth"]) for s in trace.spans] == [
+        ("page:Home", None, 0),
+        ("sql", "page:Home", 1),
+        ("tab:Items", "page:Home", 1),
+    ]
+    assert trace.spans[1]["query"] == "SELECT ?"
+    assert all(s["duration_ms"] >= 0 for s in trace.spans)
+    assert trace.as_dict()["page"] == "Home"
+
+
+def test_span_records_the_error_type_and_reraises():
+    trace = start_trace("rerun")
+    try:
+        with span("boom"):
+            raise KeyError("x")
+    except KeyError:
+        pass
+    finish_trace()
+    assert trace.spans[0]["error"] == "KeyError"
+
+
+def test_worker_threads_join_the_callers_trace_under_its_open_span():
+    trace = start_trace("rerun")
+    with span("fetch_many"):
+        context = trace_context()
+
+        def worker():
+            with attach_trace(context), span("fetch:items"):
+                pass
+            assert current_trace() is None  # attach_trace restores the worker's own state
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    finish_trace()
+
+    fetch = [s for s in trace.spans if s["name"] == "fetch:items"][0]
+    assert fetch["parent"] == "fetch_many"
+    assert fetch["depth"] == 1
+
+
+def test_traced_generators_record_each_step_while_iterated():
+    @traced("chunks")
+    def chunks():
+        yield 1
+        yield 2
+
+    trace = start_trace("rerun")
+    result = chunks()
+    assert trace.spans == []  # nothing ran yet
+    assert list(result) == [1, 2]
+    finish_trace()
+
+    assert [s["name"] for s in trace.spans] == ["chunks"] * 3  # two items and the final step
+    assert all("duration_ms" in s for s in trace.spans)
+
+
+def test_trace_methods_wraps_public_methods_only():
+    @trace_methods
+    class Handler:
+        def read(self):
+            return "read"
+
+        def _helper(self):
+            return "helper"
+
+        @staticmethod
+        def util():
+            return "util"
+
+    trace = start_trace("rerun")
+    handler = Handler()
+    assert (handler.read(), handler._helper(), Handler.util()) == ("read", "helper", "util")
+    finish_trace()
+    assert [s["name"] for s in trace.spans] == ["Handler.read"]
+
+
+def test_finish_trace_appends_json_lines_and_rotates(tmp_path):
+    path = str(tmp_path / "traces.jsonl")
+    for _ in range(2):
+        start_trace("rerun")
+        finish_trace(path, max_bytes=10**6)
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == ["rerun", "rerun"]
+
+    start_trace("rerun")
+    finish_trace(path, max_bytes=1)
+    assert sum(1 for _ in open(path + ".1", encoding="utf-8")) == 2
+    assert sum(1 for _ in open(path, encoding="utf-8")) == 1
+
+
+def test_finish_trace_without_a_path_writes_nothing(tmp_path):
+    start_trace("rerun")
+    assert finish_trace() is not None
+    assert list(tmp_path.iterdir()) == []
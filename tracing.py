@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import uuid
+import inspect
+import functools
+import threading
+from contextlib import contextmanager
+
+# One trace per script rerun; spans opened outside a trace are not recorded.
+# Worker threads join their caller's trace through `trace_context`/`attach_trace`.
+_local = threading.local()
+_export_lock = threading.Lock()
+
+
+class Trace:
+    """Nested span timings collected during one rerun."""
+
+    def __init__(self, name, **attrs):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.attrs = attrs
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []  # spans in the order they started; list.append is safe across threads
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms if self.duration_ms is not None else self.elapsed_ms(), 3),
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+
+def _open_spans():
+    """Spans open on this thread, innermost last."""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def start_trace(name, **attrs):
+    """Begin collecting spans for this thread (call at the top of a rerun)."""
+    _local.trace = Trace(name, **attrs)
+    _local.stack = []
+    return _local.trace
+
+
+def finish_trace(export_path=None, max_bytes=50 * 2**20):
+    """
+    Close the current trace and return it. With `export_path` it is also appended there
+    as one JSON line; once the file reaches `max_bytes` it is rotated to `<path>.1`
+    (replacing the previous one), so at most two files are kept.
+    """
+    trace = current_trace()
+    _local.trace = None
+    _local.stack = []
+    if trace is None:
+        return None
+    trace.duration_ms = trace.elapsed_ms()
+    if export_path:
+        line = json.dumps(trace.as_dict(), default=str)
+        with _export_lock:
+            if os.path.exists(export_path) and os.path.getsize(export_path) >= max_bytes:
+                os.replace(export_path, export_path + ".1")
+            with open(export_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    return trace
+
+
+def trace_context():
+    """The current trace and innermost open span, to hand to a worker thread (see `attach_trace`)."""
+    stack = _open_spans()
+    return current_trace(), stack[-1] if stack else None
+
+
+@contextmanager
+def attach_trace(context):
+    """Record this thread's spans into another thread's trace, under the span it had open."""
+    trace, parent = context
+    saved = current_trace(), _open_spans()
+    _local.trace, _local.stack = trace, [parent] if parent else []
+    try:
+        yield trace
+    finally:
+        _local.trace, _local.stack = saved
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block as a child of the innermost open span of the current trace."""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    stack = _open_spans()
+    record = {
+        "name": name,
+        "parent": stack[-1]["name"] if stack else None,
+        "depth": stack[-1]["depth"] + 1 if stack else 0,
+        "start_ms": round(trace.elapsed_ms(), 3),
+        **attrs,
+    }
+    trace.spans.append(record)
+    stack.append(record)
+    try:
+        yield record
+    except Exception as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        stack.pop()
+        record["duration_ms"] = round(trace.elapsed_ms() - record["start_ms"], 3)
+
+
+def traced(name=None):
+    """
+    Decorator form of `span`; the span is named after the function by default.
+    Generator functions do their work while being iterated, so each step of the
+    iteration is recorded as its own span instead of the (instant) call.
+    """
+    def decorator(func):
+        label = name or func.__qualname__
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                steps = func(*args, **kwargs)
+                try:
+                    while True:
+                        with span(label):
+                            try:
+                                value = next(steps)
+                            except StopIteration:
+                                return
+                        yield value
+                finally:
+                    steps.close()
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_methods(cls):
+    """Class decorator: trace every public method defined on `cls` itself."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and callable(value) and not isinstance(value, (staticmethod, classmethod, type)):
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}")(value))
+    return cls